@@ -25,12 +25,15 @@ def generic_exception_handler(error):
 
 @app.after_request
 def format_response(response):
-    response.headers["Cache-Control"] = "no-cache"
+    # Artifacts set their own since they never change.
+    if "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = "no-cache"
 
     if response.status_code == 404:
         response = response_map.create_404()
 
-    if response.headers["Content-Type"] == "application/json":
+    # Streamed responses (like _glob) would be read into memory here.
+    if response.headers["Content-Type"] == "application/json" and not response.is_streamed:
         data = response.get_data()
         data += "\n"
         response.set_data(data)
@@ -0,0 +1,211 @@
+import calendar
+import itertools
+import os.path
+import tarfile
+import time
+import zlib
+from werkzeug.http import parse_date
+from pyshelf import artifact_key_filter
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError
+
+
+class ArchiveIterator(object):
+    """
+        Streams every artifact in a directory (recursively) as a single
+        tar archive which is built as it is sent.  Nothing is held in
+        memory beyond the chunk being sent.
+
+        The next few artifacts are opened while the current one is
+        being sent so that the time to first byte of each is hidden.
+        At most "window" artifacts are open at the same time.
+    """
+    CONTENT_TYPE_MAP = {
+        "tar": "application/x-tar",
+        "tar.gz": "application/gzip"
+    }
+
+    def __init__(self, storage, path, name, archive_format, worker_pool, window=None, can_read=None):
+        """
+            Args:
+                storage(pyshelf.cloud.base_storage.BaseStorage): Not yet
+                    connected.  The iterator connects it when opened and
+                    closes it once the archive is sent.
+                path(basestring): The directory being archived.
+                name(basestring): Directory every artifact is put in inside
+                    of the archive.
+                archive_format(basestring): One of CONTENT_TYPE_MAP.
+                worker_pool(pyshelf.worker_pool.WorkerPool): Opens artifacts
+                    ahead of time.
+                window(int|None): The most artifacts open at the same time.
+                    Defaults to the size of worker_pool.
+                can_read(function|None): Given the path of an artifact (with a
+                    leading "/") it returns False if it must be left out.
+        """
+        self.storage = storage
+        self.path = path
+        self.prefix = path.strip("/")
+        if self.prefix:
+            self.prefix += "/"
+
+        self.name = name
+        self.archive_format = archive_format
+        self.worker_pool = worker_pool
+        self.window = window
+        self.can_read = can_read
+        self._chunks = None
+        self._connected = False
+
+    @property
+    def content_type(self):
+        return ArchiveIterator.CONTENT_TYPE_MAP[self.archive_format]
+
+    @property
+    def file_name(self):
+        """
+            Returns:
+                basestring: What the archive should be saved as.
+        """
+        return "{0}.{1}".format(self.name, self.archive_format)
+
+    def open(self):
+        """
+            Connects to storage and finds the first artifact.  Calling it
+            more than once does nothing.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError: If there
+                    is nothing to archive.
+        """
+        if self._chunks is None:
+            self.storage.connect()
+            self._connected = True
+            try:
+                key_list = self._iter_keys()
+                first = next(key_list, None)
+                if first is None:
+                    raise ArtifactNotFoundError(self.path)
+            except Exception:
+                self.close()
+                raise
+
+            self._chunks = self._generate(itertools.chain([first], key_list))
+            if self.archive_format == "tar.gz":
+                self._chunks = self._compress(self._chunks)
+
+    def next(self):
+        self.open()
+        return next(self._chunks)
+
+    def close(self):
+        """
+            Called once the response is finished, even if the client
+            went away part way through.
+        """
+        if self._chunks is not None:
+            self._chunks.close()
+
+        if self._connected:
+            self._connected = False
+            self.storage.close()
+
+    def __iter__(self):
+        return self
+
+    def _iter_keys(self):
+        """
+            Generator of the keys of everything to archive.  Private
+            artifacts and metadata are left out, just like in listings,
+            and so is anything that cannot be read.
+        """
+        for key in self.storage.iter_directory_contents(self.prefix, True):
+            if key.name.endswith("/") or artifact_key_filter.is_reserved(key.name):
+                continue
+
+            if self.can_read and not self.can_read("/" + key.name):
+                continue
+
+            yield key
+
+    def _open(self, key):
+        # It was just listed so there is no need to look it up again.
+        stream = self.storage.get_artifact(key.name, key=key)
+        stream.open()
+        return stream
+
+    def _generate(self, key_list):
+        written = 0
+        # Artifacts opened ahead of time which will never be sent (the
+        # client went away or one of them failed) are closed as well.
+        stream_list = self.worker_pool.imap(self._open, key_list, self.window, discard=self._discard)
+        try:
+            for stream in stream_list:
+                try:
+                    name = os.path.join(self.name, stream.key.name[len(self.prefix):])
+                    header = self._header(name, stream)
+                    yield header
+                    size = 0
+                    for chunk in stream:
+                        size += len(chunk)
+                        yield chunk
+                finally:
+                    stream.close()
+
+                if size != stream.key.size:
+                    # Carrying on would only send a corrupt archive.
+                    raise IOError("Expected {0} bytes of {1} but got {2}".format(stream.key.size, name, size))
+
+                # Members are padded out to a whole block.
+                remainder = size % tarfile.BLOCKSIZE
+                if remainder:
+                    yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+                    size += tarfile.BLOCKSIZE - remainder
+
+                written += len(header) + size
+        finally:
+            stream_list.close()
+
+        # Two empty blocks end the archive, which is then padded out to
+        # a whole record like tarfile does.
+        written += 2 * tarfile.BLOCKSIZE
+        end = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+        remainder = written % tarfile.RECORDSIZE
+        if remainder:
+            end += tarfile.NUL * (tarfile.RECORDSIZE - remainder)
+
+        yield end
+
+    def _discard(self, stream):
+        stream.close()
+
+    def _header(self, name, stream):
+        """
+            Args:
+                name(basestring): Name of the member in the archive.
+                stream(pyshelf.cloud.stream_iterator.StreamIterator)
+
+            Returns:
+                basestring: The tar header for the member.
+        """
+        info = tarfile.TarInfo(name)
+        info.size = stream.key.size
+        info.mode = 0644
+        info.mtime = time.time()
+        last_modified = stream.last_modified and parse_date(stream.last_modified)
+        if last_modified:
+            info.mtime = calendar.timegm(last_modified.utctimetuple())
+
+        # PAX allows any length of name and any size.
+        return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "strict")
+
+    def _compress(self, chunks):
+        # 31 makes zlib write a gzip header and trailer.
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        try:
+            for chunk in chunks:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+        finally:
+            chunks.close()
+
+        yield compressor.flush()
@@ -1,45 +1,614 @@
+import os.path
+import re
+from uuid import uuid4
+from pyshelf import byte_range
+from pyshelf import utils
+from pyshelf import artifact_key_filter
+import pyshelf.response_map as response_map
+from pyshelf.error_code import ErrorCode
+from pyshelf.archive_iterator import ArchiveIterator
+from pyshelf.glob_iterator import GlobIterator
+from pyshelf.resource_identity import ResourceIdentity
+from pyshelf.metadata.keys import Keys as MetadataKeys
+from pyshelf.worker_pool import WorkerPool
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, CloudStorageException, DuplicateArtifactError, \
+    InvalidNameError, UploadMismatchError
+
+
 class ArtifactManager(object):
+    # Where direct uploads wait to be finalized.  It is private so
+    # nothing in it can be listed or downloaded.
+    UPLOAD_DIRECTORY = "_uploads"
+
     def __init__(self, container):
         self.container = container
         self.link_manager = self.container.link_manager
+        # Artifacts already looked up while answering this request (None
+        # if there was nothing at the path) so they are not looked up again.
+        self._key_map = {}
 
-    def get_artifact(self, path):
+    def get_artifact(self, path, range_header=None, if_range=None, limit=None, cursor=None):
         """
             Gets artifact or artifact list information.
 
             Args:
                 path(string): path or name of artifact.
+                range_header(basestring|None): Value of the Range header, if
+                    only part of the artifact is wanted.
+                if_range(basestring|None): Value of the If-Range header.
+                limit(int|None): If provided a directory is listed a page of
+                    this many entries at a time.
+                cursor(basestring|None): Where the previous page of the
+                    listing left off.
 
             Returns:
                 pyshelf.cloud.StreamIterator|None
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.RangeNotSatisfiableError
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
         """
         content = None
+        existence_filter = self._get_existence_filter()
         with self.container.create_bucket_storage() as storage:
-            if path[-1] != "/":
-                directory_path = path + "/"
-            else:
-                directory_path = path
+            known = not existence_filter or cursor or existence_filter.might_exist(path)
+            if not known:
+                # It was either never uploaded or uploaded since the filter
+                # was built (by another process for instance).  A single
+                # listing tells which.
+                if not self._is_listed(storage, path):
+                    raise ArtifactNotFoundError(path)
 
-            artifact_list = storage.get_directory_contents(directory_path, recursive=False)
-            if len(artifact_list) > 0:
-                self.container.logger.debug("Resource {0} is assumed to be a directory.".format(directory_path))
-                artifact_path_list = [artifact.name for artifact in artifact_list]
-                self.link_manager.assign_listing(artifact_path_list)
+                existence_filter.add_unknown(path)
+
+            key = None
+            # Most requests are for artifacts so they are looked up first.
+            # Listing is a lot slower (and more expensive) than a HEAD.
+            if path[-1] != "/" and not limit and not cursor:
+                if path in self._key_map:
+                    key = self._key_map[path]
+                else:
+                    try:
+                        key = storage.get_key(path)
+                    except ArtifactNotFoundError:
+                        pass
+
+            if key:
+                byte_range_list = None
+                if range_header and byte_range.if_range_matches(if_range, key.etag, key.last_modified):
+                    byte_range_list = byte_range.parse(range_header, key.size)
+
+                content = storage.get_artifact(path, byte_range_list, key)
+                self.link_manager.assign_single(key.name)
             else:
-                content = storage.get_artifact(path)
-                self.link_manager.assign_single(content.key.name)
+                try:
+                    self._list_directory(storage, path, limit, cursor)
+                except ArtifactNotFoundError:
+                    if existence_filter and known and not cursor:
+                        existence_filter.add_false_positive(path)
+
+                    raise
 
         return content
 
-    def upload_artifact(self, path, file_storage):
+    def get_archive(self, path, archive_format):
+        """
+            Gets an archive of everything in a directory.
+
+            Args:
+                path(string): path of the directory.
+                archive_format(string): One of
+                    pyshelf.archive_iterator.ArchiveIterator.CONTENT_TYPE_MAP.
+
+            Returns:
+                pyshelf.archive_iterator.ArchiveIterator: Already opened.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        # Named after the directory so it does not spill all over
+        # wherever it is extracted.
+        name = os.path.basename(path.rstrip("/")) or self.container.bucket_name
+        archive_config = self.container.app.config.get("archive", {})
+        # Artifacts are looked up while the archive is being sent, long
+        # after the budget for answering the request matters.
+        storage = self.container.cloud_factory.create_storage(self.container.bucket_name)
+        archive = ArchiveIterator(
+            storage,
+            path,
+            name,
+            archive_format,
+            WorkerPool(archive_config.get("concurrency", 4)),
+            can_read=self.container.permissions_validator.can_read
+        )
+        archive.open()
+        return archive
+
+    def get_glob(self, path, segment_list):
+        """
+            Gets every artifact under a directory which matches a glob
+            pattern.
+
+            Args:
+                path(string): path of the directory.
+                segment_list(List(string)): The pattern, from
+                    pyshelf.glob_iterator.GlobIterator.split_pattern.
+
+            Returns:
+                pyshelf.glob_iterator.GlobIterator: Already opened.
+        """
+        # Like an archive the matches are found while they are sent.
+        storage = self.container.cloud_factory.create_storage(self.container.bucket_name)
+        glob = GlobIterator(
+            storage,
+            path,
+            segment_list,
+            self.container.path_converter,
+            can_read=self.container.permissions_validator.can_read
+        )
+        glob.open()
+        return glob
+
+    def get_download_url(self, path):
+        """
+            Gets a short lived URL the artifact can be downloaded from
+            directly, if its bucket is configured with presignedDownloads.
+
+            Args:
+                path(string): path or name of artifact.
+
+            Returns:
+                string|None: None if the bucket does not redirect downloads,
+                    its backend cannot or path is not an artifact.
+        """
+        url = None
+        presign_config = self._get_bucket_config().get("presignedDownloads")
+        existence_filter = self._get_existence_filter()
+        # Whatever the filter does not know about is left to get_artifact,
+        # which looks for it with one listing instead of a HEAD and a listing.
+        if existence_filter and not existence_filter.might_exist(path, record=False):
+            presign_config = None
+
+        if presign_config is not None and path[-1] != "/":
+            with self.container.create_bucket_storage() as storage:
+                try:
+                    key = storage.get_key(path)
+                except ArtifactNotFoundError:
+                    # Probably a directory, which get_artifact lists without
+                    # looking it up again.
+                    key = None
+
+                self._key_map[path] = key
+                if key:
+                    url = storage.get_download_url(key.name, presign_config.get("expiresIn", 300))
+
+            if url:
+                self.link_manager.assign_single(path)
+
+        return url
+
+    def reserve_upload(self, path):
+        """
+            Starts an upload which the client sends straight to the cloud,
+            if the bucket is configured with presignedUploads.  It goes to
+            a private staging path until finalize_upload moves it into place.
+
+            Args:
+                path(string): path or name of artifact.
+
+            Returns:
+                dict|None: The "url" to PUT the artifact to, how many seconds
+                    it works for ("expiresIn") and the "token" to finalize it
+                    with.  None if the bucket does not take direct uploads or
+                    its backend cannot.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+        """
+        reservation = None
+        presign_config = self._get_bucket_config().get("presignedUploads")
+        if presign_config is not None:
+            expires_in = presign_config.get("expiresIn", 900)
+            token = uuid4().hex
+            with self.container.create_bucket_storage() as storage:
+                key = None
+                try:
+                    key = storage.get_key(path)
+                except ArtifactNotFoundError:
+                    pass
+
+                if key:
+                    raise DuplicateArtifactError(path)
+
+                url = storage.get_upload_url(self._get_staging_path(path, token), expires_in)
+
+            if url:
+                reservation = {
+                    "url": url,
+                    "method": "PUT",
+                    "expiresIn": expires_in,
+                    "token": token
+                }
+
+        return reservation
+
+    def finalize_upload(self, path, token, size=None, md5=None):
+        """
+            Moves an artifact uploaded after reserve_upload into place and
+            creates its metadata, just like upload_artifact would have.
+
+            Args:
+                path(string): path or name of artifact.
+                token(string): From reserve_upload.
+                size(int|None): If provided the upload must be this many bytes.
+                md5(string|None): If provided the upload must have this md5.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError: If nothing
+                    was uploaded for the token.
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+                pyshelf.cloud.cloud_exceptions.UploadMismatchError
+        """
+        if not re.match("^[0-9a-f]{32}$", token):
+            raise ArtifactNotFoundError(path)
+
+        staging_path = self._get_staging_path(path, token)
+        with self.container.create_bucket_storage() as storage:
+            try:
+                key = storage.get_key(staging_path)
+            except ArtifactNotFoundError:
+                raise ArtifactNotFoundError(path)
+
+            # A single PUT always has its md5 as its etag.
+            etag = key.etag.strip("\"")
+            if (size is not None and size != key.size) or (md5 and md5 != etag):
+                storage.delete_artifact(staging_path)
+                raise UploadMismatchError(path)
+
+            # If anything else goes wrong the upload is kept so that
+            # finalizing it can be tried again.
+            self._add_to_existence_filter(path)
+            storage.copy_artifact(staging_path, path)
+            storage.delete_artifact(staging_path)
+
+        self.container.metadata.manager.create(etag, None)
+        self.link_manager.assign_single(path)
+
+    def deduplicate_upload(self, path, md5=None, sha256=None):
+        """
+            Looks for an artifact in the bucket with the same contents as
+            one about to be uploaded.  If one is found it is copied inside
+            of the cloud instead, so the upload can be skipped.
+
+            Only artifacts which can be read are copied, otherwise this
+            would be a way to get a copy of anything.
+
+            Args:
+                path(string): path or name of artifact.
+                md5(string|None): At least one hash has to be provided.
+                sha256(string|None)
+
+            Returns:
+                boolean: False if no artifact with the same contents was found.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+        """
+        search_list = ["{0}=/{1}/artifact/*".format(MetadataKeys.PATH, self.container.bucket_name)]
+        if md5:
+            search_list.append("{0}={1}".format(MetadataKeys.MD5, md5))
+
+        if sha256:
+            search_list.append("{0}={1}".format(MetadataKeys.SHA256, sha256))
+
+        criteria = self.container.search_parser.from_request({"search": search_list, "sort": []})
+        key_list = [MetadataKeys.PATH, MetadataKeys.MD5, MetadataKeys.SHA256]
+        result_list = self.container.search.manager.search(criteria, key_list)
+        permissions_validator = self.container.permissions_validator
+        with self.container.create_bucket_storage() as storage:
+            for result in result_list:
+                source_path = ResourceIdentity(result[MetadataKeys.PATH]["value"]).cloud
+                if artifact_key_filter.is_reserved(source_path) or not permissions_validator.can_read(source_path):
+                    continue
+
+                self._add_to_existence_filter(path)
+                try:
+                    storage.copy_artifact(source_path[1:], path)
+                except ArtifactNotFoundError:
+                    # The search index is behind.
+                    continue
+
+                # Whichever hash was not provided is known from the
+                # artifact that was copied, if it has it.  Search results
+                # have every key asked for, set to None if it is missing.
+                md5 = md5 or (result.get(MetadataKeys.MD5) or {}).get("value")
+                sha256 = sha256 or (result.get(MetadataKeys.SHA256) or {}).get("value")
+                self.container.metadata.manager.create(md5, sha256)
+                self.link_manager.assign_single(path)
+                return True
+
+        return False
+
+    def copy_artifact(self, path, source_url):
+        """
+            Copies an artifact into place from anywhere the key can read,
+            including other configured buckets.  It is copied inside of the
+            cloud so nothing is downloaded.  Its metadata comes along and
+            is indexed for the copy.
+
+            Args:
+                path(string): path or name of the copy.
+                source_url(string): Resource url of the artifact to copy, for
+                    instance /bucket-name/artifact/path/to/artifact.
+
+            Returns:
+                boolean: False if the key cannot read the artifact to copy.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+                pyshelf.cloud.cloud_exceptions.BucketConfigurationNotFound
+                pyshelf.cloud.cloud_exceptions.CopyNotSupportedError
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+                pyshelf.cloud.cloud_exceptions.InvalidNameError
+        """
+        source_container = self.container.create_resource_container(source_url)
+        source_identity = source_container.resource_identity
+        source_name = source_identity.cloud
+        if source_identity.type or artifact_key_filter.is_reserved(source_name):
+            raise InvalidNameError(source_name)
+
+        if not source_container.permissions_validator.can_read(source_name):
+            return False
+
+        # Loaded before copying so a copy is never left without metadata.
+        metadata = source_container.metadata.manager.metadata
+        self._add_to_existence_filter(path)
+        with source_container.create_bucket_storage() as source_storage:
+            with self.container.create_bucket_storage() as storage:
+                storage.copy_artifact(source_name[1:], path, source_storage)
+
+        self.container.metadata.manager.create_copy(metadata)
+        self.link_manager.assign_single(path)
+        return True
+
+    def _get_existence_filter(self):
+        """
+            Returns:
+                pyshelf.cloud.existence_filter.ExistenceFilter|None: Of the
+                    bucket of the request, if it has one.
+        """
+        return self.container.cloud_factory.get_existence_filter(self.container.bucket_name)
+
+    def _is_listed(self, storage, path):
+        """
+            Looks for an artifact at path, or a directory, with a single
+            listing.  Everything starting with path is listed in order so
+            an artifact named path comes first and the contents of its
+            directory come right after names like path.md5.
+
+            Args:
+                storage(pyshelf.cloud.base_storage.BaseStorage)
+                path(string)
+
+            Returns:
+                boolean
+        """
+        name = path.strip("/")
+        directory = name + "/"
+        for entry in storage.iter_directory_contents(name, False):
+            if entry.name == name or entry.name.startswith(directory):
+                return True
+
+            if entry.name > directory:
+                break
+
+        return False
+
+    def _add_to_existence_filter(self, path):
+        """
+            Called before an artifact is uploaded (or copied) so that it is
+            never turned away once it exists.
+
+            Args:
+                path(string): path or name of artifact.
+        """
+        existence_filter = self._get_existence_filter()
+        if existence_filter:
+            existence_filter.add(path)
+
+    def _get_staging_path(self, path, token):
+        return "{0}/{1}/{2}".format(ArtifactManager.UPLOAD_DIRECTORY, token, path.lstrip("/"))
+
+    def _get_bucket_config(self):
+        """
+            Returns:
+                dict: Config of the bucket of the request.
+        """
+        return utils.get_bucket_config(self.container.app.config, self.container.bucket_name) or {}
+
+    def _list_directory(self, storage, path, limit, cursor):
+        """
+            Assigns links for the contents of a directory.
+
+            Args:
+                storage(pyshelf.cloud.storage.Storage)
+                path(string)
+                limit(int|None)
+                cursor(basestring|None)
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError: If there
+                    is nothing in the directory.
+        """
+        if path[-1] != "/":
+            directory_path = path + "/"
+        else:
+            directory_path = path
+
+        next_cursor = None
+        if limit:
+            artifact_path_list, next_cursor = storage.get_directory_page(directory_path, limit, cursor)
+        else:
+            iterator = storage.iter_directory_contents(directory_path, False, cursor)
+            artifact_path_list = [artifact.name for artifact in iterator]
+
+        # Paging past the end of a directory leaves nothing to list
+        # but it is still a directory.
+        if len(artifact_path_list) == 0 and not cursor:
+            raise ArtifactNotFoundError(path)
+
+        self.container.logger.debug("Resource {0} is assumed to be a directory.".format(directory_path))
+        self.link_manager.assign_listing(artifact_path_list)
+        if next_cursor:
+            self.link_manager.assign_next_page(limit, next_cursor)
+
+    def upload_artifact(self, path, fp, size=None):
         """
             Uploads artifact and assigns links to context.
 
             Args:
                 path(string): path or name of artifact.
-                file_storage(werkzeug.datastructures.FileStorage): file from request.
+                fp(file): Either the file from the request
+                    (werkzeug.datastructures.FileStorage) or the request stream.
+                size(int|None): Size of the artifact in bytes if it is known.
         """
+        self._add_to_existence_filter(path)
         with self.container.create_bucket_storage() as storage:
-            storage.upload_artifact(path, file_storage)
-            self.container.metadata.manager.write()
+            stream = storage.upload_artifact(path, fp, size)
+            self.container.metadata.manager.create(stream.md5, stream.sha256)
             self.link_manager.assign_single(path)
+
+    def upload_artifacts(self, path, file_storage_list):
+        """
+            Uploads many artifacts into a directory in a single request.
+            They are uploaded at the same time (up to batchUpload.concurrency)
+            and their metadata is indexed in a single bulk request.
+
+            Args:
+                path(string): path of the directory.
+                file_storage_list(List(werkzeug.datastructures.FileStorage)):
+                    The filename of each is the name of the artifact relative
+                    to the directory.
+
+            Returns:
+                List(dict): A result for each file, in the same order.  Each
+                    has the "path" of the artifact and the "status" code that
+                    uploading it alone would have returned.  Failures also have
+                    a "code" and "message".
+        """
+        directory = path.strip("/")
+        permissions_validator = self.container.permissions_validator
+        result_list = []
+        task_list = []
+        name_set = set()
+        for file_storage in file_storage_list:
+            artifact_path = self._get_batch_path(directory, file_storage.filename)
+            error = None
+            if artifact_path is None or artifact_key_filter.is_reserved(artifact_path):
+                artifact_path = file_storage.filename or ""
+                error = InvalidNameError(artifact_path)
+            elif artifact_path in name_set:
+                error = DuplicateArtifactError(artifact_path)
+            elif not permissions_validator.can_write("/" + artifact_path):
+                result_list.append(self._create_batch_result(
+                    artifact_path, 401, ErrorCode.PERMISSION_DENIED, "Permission denied"))
+                continue
+
+            if error:
+                result_list.append(self._create_exception_result(artifact_path, error))
+            else:
+                result_list.append(None)
+                name_set.add(artifact_path)
+                task_list.append((len(result_list) - 1, artifact_path, file_storage))
+
+        # These are lazy so they are created before any worker needs them.
+        bucket_container = self.container.metadata.bucket_container
+        identity_factory = self.container.resource_identity_factory
+        cloud_factory = self.container.cloud_factory
+        existence_filter = self._get_existence_filter()
+
+        def upload(task):
+            index, artifact_path, file_storage = task
+            metadata = None
+            identity = None
+            try:
+                if existence_filter:
+                    existence_filter.add(artifact_path)
+
+                with cloud_factory.create_storage(self.container.bucket_name) as storage:
+                    stream = storage.upload_artifact(artifact_path, file_storage)
+
+                identity = identity_factory.from_cloud_identifier(artifact_path)
+                metadata = bucket_container.initializer.create(identity, stream.md5, stream.sha256)
+                bucket_container.cloud_portal.update(identity.cloud_metadata, metadata)
+                result = self._create_batch_result(artifact_path, 201)
+            except CloudStorageException as e:
+                result = self._create_exception_result(artifact_path, e)
+            except Exception:
+                # One broken upload should not lose the results of the others.
+                self.container.logger.exception("Failed to upload {0}".format(artifact_path))
+                result = self._create_exception_result(artifact_path, None)
+
+            return (index, result, identity, metadata)
+
+        batch_config = self.container.app.config.get("batchUpload", {})
+        worker_pool = WorkerPool(batch_config.get("concurrency", 4))
+        search_data = {}
+        for index, result, identity, metadata in worker_pool.map(upload, task_list):
+            result_list[index] = result
+            if metadata:
+                search_data[identity.search] = metadata
+
+        if search_data:
+            self.container.search.update_manager.bulk_update(search_data)
+
+        return result_list
+
+    def _get_batch_path(self, directory, name):
+        """
+            Args:
+                directory(string): Directory being uploaded to, without
+                    leading or trailing slashes.
+                name(string|None): Name of the artifact relative to it.
+
+            Returns:
+                string|None: Cloud path of the artifact.  None if the name
+                    is empty or leads outside of the directory.
+        """
+        artifact_path = None
+        if name and not name.startswith("/"):
+            artifact_path = os.path.normpath(os.path.join(directory, name))
+            if directory and not artifact_path.startswith(directory + "/"):
+                artifact_path = None
+            elif artifact_path == "." or artifact_path.startswith("../") or artifact_path == "..":
+                artifact_path = None
+
+        return artifact_path
+
+    def _create_exception_result(self, artifact_path, e):
+        """
+            Args:
+                artifact_path(string)
+                e(pyshelf.cloud.cloud_exceptions.CloudStorageException|None):
+                    None for anything unexpected.
+
+            Returns:
+                dict
+        """
+        if e is None:
+            return self._create_batch_result(
+                artifact_path, 500, ErrorCode.INTERNAL_SERVER_ERROR, "Internal server error")
+
+        status_code = response_map.map_exception(e).status_code
+        return self._create_batch_result(artifact_path, status_code, e.error_code, e.message)
+
+    def _create_batch_result(self, artifact_path, status_code, code=None, message=None):
+        result = {
+            "path": self.container.path_converter.from_cloud(artifact_path),
+            "status": status_code
+        }
+        if code:
+            result["code"] = code
+            result["message"] = message
+
+        return result
@@ -56,7 +56,8 @@ class Container(object):
             config = {
                 "buckets": [
                     self.config
-                ]
+                ],
+                "bucketListing": self.config.get("bucketListing", {})
             }
             self._cloud_factory = CloudFactory(config, self.logger)
 
@@ -33,6 +33,9 @@ class Runner(object):
                 "chunkSize": self.config["chunkSize"],
                 "bulkUpdateLogDirectory": self.config["bulkUpdateLogDirectory"]
             })
+            if "bucketListing" in self.config:
+                bucket_config["bucketListing"] = self.config["bucketListing"]
+
             self.container.logger.info("Starting process for bucket {0}".format(bucket_config["referenceName"]))
             self._run_process(bucket_config)
 
@@ -0,0 +1,101 @@
+"""
+    Helpers for HTTP Range requests (RFC 7233).  Ranges are represented
+    as tuples of (first byte, last byte), both inclusive, just like the
+    Range and Content-Range headers themselves.
+"""
+from werkzeug.http import parse_range_header, parse_date
+from pyshelf.cloud.cloud_exceptions import RangeNotSatisfiableError
+
+
+# Anything asking for more ranges than this is served in full.  Lots
+# of tiny ranges cost more than just sending the artifact.
+MAX_RANGE_COUNT = 32
+
+
+def parse(range_header, size):
+    """
+        Resolves a Range header against an artifact of the provided size.
+
+        Args:
+            range_header(basestring|None)
+            size(int): Size of the artifact in bytes.
+
+        Returns:
+            List(tuple(int, int))|None: None if the header should be ignored
+                and the whole artifact sent.
+
+        Raises:
+            pyshelf.cloud.cloud_exceptions.RangeNotSatisfiableError: If none of
+                the ranges overlap the artifact.
+    """
+    parsed = parse_range_header(range_header)
+    if parsed is None or parsed.units != "bytes" or len(parsed.ranges) > MAX_RANGE_COUNT:
+        return None
+
+    byte_range_list = []
+    for start, stop in parsed.ranges:
+        if start < 0:
+            # Suffix range, for instance "bytes=-500" is the last 500 bytes.
+            start = max(size + start, 0)
+            end = size - 1
+        elif stop is None:
+            end = size - 1
+        else:
+            # werkzeug gives us an exclusive stop.
+            end = min(stop - 1, size - 1)
+
+        if start <= end:
+            byte_range_list.append((start, end))
+
+    if not byte_range_list:
+        raise RangeNotSatisfiableError(size)
+
+    return byte_range_list
+
+
+def if_range_matches(if_range, etag, last_modified):
+    """
+        Determines if a Range should be honored given the If-Range header.
+        If the artifact changed the client would get a mix of two
+        versions, so it must be sent in full instead.
+
+        Args:
+            if_range(basestring|None): Either an entity tag or an HTTP date.
+            etag(basestring): The quoted etag of the artifact.
+            last_modified(basestring|None): HTTP date the artifact was modified.
+
+        Returns:
+            boolean
+    """
+    if not if_range:
+        return True
+
+    if if_range.startswith("\"") or if_range.startswith("W/"):
+        # Requires a strong comparison, so weak tags never match.
+        return if_range == etag
+
+    if_range_date = parse_date(if_range)
+    return if_range_date is not None and if_range_date == parse_date(last_modified)
+
+
+def content_range(byte_range, size):
+    """
+        Args:
+            byte_range(tuple(int, int))
+            size(int)
+
+        Returns:
+            basestring: Value for a Content-Range header.
+    """
+    return "bytes {0}-{1}/{2}".format(byte_range[0], byte_range[1], size)
+
+
+def to_header(byte_range):
+    """
+        Args:
+            byte_range(tuple(int, int))
+
+        Returns:
+            basestring: Value for a Range header.
+    """
+    return "bytes={0}-{1}".format(byte_range[0], byte_range[1])
@@ -0,0 +1,241 @@
+import itertools
+from pyshelf.cloud.cloud_exceptions import CloudStorageException
+
+
+class BaseStorage(object):
+    """
+        What every storage backend (S3, the local file system, etc)
+        provides.  The rest of pyshelf only talks to a backend through
+        these methods and is handed one by pyshelf.cloud.factory.Factory.
+
+        Backends hand out objects that look like boto.s3.key.Key.  They
+        must have at least name, size, etag (quoted), last_modified (an
+        HTTP date) and content_type.
+    """
+    # The most entries listed at once.
+    PAGE_SIZE = 1000
+
+    def connect(self):
+        """
+            Gets ready to be used.  Called when the "with" block starts.
+        """
+        pass
+
+    def close(self, discard=False):
+        """
+            Args:
+                discard(boolean): True if the "with" block ended because
+                    of an error which the backend did not raise itself.
+        """
+        pass
+
+    def get_artifact(self, artifact_name, byte_range_list=None, key=None):
+        """
+            Args:
+                artifact_name(string): Full path to the artifact.
+                byte_range_list(List(tuple(int, int))|None): If provided only
+                    these ranges of bytes (inclusive) are streamed.  See
+                    pyshelf.byte_range.
+                key(boto.s3.key.Key|None): If the artifact was already looked
+                    up (by get_key) it is not looked up again.
+
+            Returns:
+                pyshelf.cloud.stream_iterator.StreamIterator
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        raise NotImplementedError()
+
+    def get_key(self, artifact_name):
+        """
+            Gets information about an artifact (size, etag, etc)
+            without downloading it.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+
+            Returns:
+                boto.s3.key.Key: Or something that looks like one.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        raise NotImplementedError()
+
+    def get_download_url(self, artifact_name, expires_in):
+        """
+            Creates a URL the artifact can be downloaded from directly,
+            without going through pyshelf.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+                expires_in(int): Seconds the URL works for.
+
+            Returns:
+                string|None: None if the backend cannot do this.
+        """
+        return None
+
+    def get_upload_url(self, artifact_name, expires_in):
+        """
+            Creates a URL the artifact can be uploaded to directly (with a
+            PUT), without going through pyshelf.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+                expires_in(int): Seconds the URL works for.
+
+            Returns:
+                string|None: None if the backend cannot do this.
+        """
+        return None
+
+    def upload_artifact(self, artifact_name, fp, size=None):
+        """
+            Uploads an artifact.  fp is read exactly once.
+
+            Args:
+                artifact_name(string): Full path to upload artifact to.
+                fp(file): File like object to be uploaded.
+                size(int|None): Size of the artifact in bytes if it is known.
+
+            Returns:
+                pyshelf.cloud.hashing_stream.HashingStream: Holds the hashes of
+                    what was uploaded.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+        """
+        raise NotImplementedError()
+
+    def copy_artifact(self, source_name, artifact_name, source=None):
+        """
+            Copies an artifact without downloading it.
+
+            Args:
+                source_name(string): Full path to the artifact to copy.
+                artifact_name(string): Full path to copy it to.
+                source(pyshelf.cloud.base_storage.BaseStorage|None): Storage of
+                    the bucket to copy from, if it is not this one.  It must be
+                    connected and use the same backend.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+                pyshelf.cloud.cloud_exceptions.CopyNotSupportedError
+        """
+        raise NotImplementedError()
+
+    def delete_artifact(self, artifact_name):
+        """
+            Args:
+                artifact_name(string): Full path to the artifact.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        raise NotImplementedError()
+
+    def get_artifact_as_string(self, path):
+        """
+            Args:
+                path(string): The path to the artifact you want to get.
+
+            Returns:
+                string
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        raise NotImplementedError()
+
+    def set_artifact_from_string(self, path, data):
+        """
+            Creates or replaces an artifact.
+
+            Args:
+                path(string): The path to the artifact to update/create.
+                data(string): Data to set contents of artifact from.
+        """
+        raise NotImplementedError()
+
+    def iter_directory_contents(self, path, recursive, cursor=None, page_size=None):
+        """
+            Generator of the contents of a directory in the same order S3
+            lists them.  When not recursive, directories are included and
+            their names end with a "/".
+
+            Args:
+                path(string): The path of the directory.
+                recursive(boolean):
+                cursor(string|None): Only what comes after this (the name of
+                    an artifact or a directory) is listed.
+                page_size(int|None): A hint of how many entries will be used.
+
+            Returns:
+                generator of boto.s3.key.Key (or something that has a name)
+        """
+        raise NotImplementedError()
+
+    def get_etag(self, path):
+        """
+            Gets md5Hash of file.
+
+            Args:
+                path(string): The path to the artifact.
+
+            Returns:
+                string: md5Hash of artifact.
+        """
+        key = self.get_key(path)
+        return key.etag[1:-1]
+
+    def get_directory_contents(self, path, recursive):
+        """
+            Gets the contents of a directory.
+
+            Args:
+                path(string): The path of the directory.
+                recursive(boolean):
+
+            Returns:
+                list of s3.boto.key.Key
+        """
+        return list(self.iter_directory_contents(path, recursive))
+
+    def get_directory_page(self, path, limit, cursor=None):
+        """
+            Gets a single page of the contents of a directory (not recursive).
+
+            Args:
+                path(string): The path of the directory.
+                limit(int): The most entries returned.
+                cursor(string|None): Where the previous page left off.
+
+            Returns:
+                tuple(List(string), string|None): The names of the entries and
+                    the cursor for the next page, if there is one.
+        """
+        # One more than asked for tells us if there is another page.
+        iterator = self.iter_directory_contents(path, False, cursor, min(limit + 1, BaseStorage.PAGE_SIZE))
+        name_list = [key.name for key in itertools.islice(iterator, limit + 1)]
+        next_cursor = None
+        if len(name_list) > limit:
+            name_list = name_list[:limit]
+            next_cursor = name_list[-1]
+
+        return (name_list, next_cursor)
+
+    def __enter__(self):
+        """ For use in "with" syntax"""
+        self.connect()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """ For use in "with" syntax"""
+        # Errors we raise ourselves say nothing about the health of
+        # the connection, anything else (socket errors, etc) might.
+        discard = exception_type is not None and not issubclass(exception_type, CloudStorageException)
+        self.close(discard)
+        return False
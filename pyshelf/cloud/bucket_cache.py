@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class BucketCache(object):
+    """
+        Remembers which buckets are known to exist so that a bucket
+        handle can be built without asking S3 (conn.lookup is a HEAD
+        request) on every storage operation.
+
+        Only the fact that a bucket exists is cached.  The handle itself
+        belongs to a connection and connections are not shared.
+    """
+    def __init__(self, ttl=300):
+        """
+            Args:
+                ttl(int|float): Seconds a bucket is trusted to exist before
+                    it is looked up again.
+        """
+        self.ttl = ttl
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def exists(self, access_key, bucket_name):
+        """
+            Args:
+                access_key(basestring): Existence is cached per set of
+                    credentials since lookup fails for buckets you cannot see.
+                bucket_name(basestring)
+
+            Returns:
+                boolean: True if the bucket was seen recently.
+        """
+        cache_key = (access_key, bucket_name)
+        with self._lock:
+            expires = self._expires.get(cache_key)
+            if expires is None:
+                return False
+
+            if expires < time.time():
+                del self._expires[cache_key]
+                return False
+
+        return True
+
+    def add(self, access_key, bucket_name):
+        """
+            Args:
+                access_key(basestring)
+                bucket_name(basestring)
+        """
+        with self._lock:
+            self._expires[(access_key, bucket_name)] = time.time() + self.ttl
+
+    def invalidate(self, access_key, bucket_name):
+        """
+            Args:
+                access_key(basestring)
+                bucket_name(basestring)
+        """
+        with self._lock:
+            self._expires.pop((access_key, bucket_name), None)
@@ -0,0 +1,35 @@
+import threading
+
+
+class CallBudget(object):
+    """
+        How long a single request is allowed to spend waiting on S3, all
+        together.  Every call is only waited on for whatever is left of
+        it so a few slow calls cannot hold up a worker forever.
+
+        Only time spent waiting on calls counts, not time spent receiving
+        an upload or sending a download.
+    """
+    def __init__(self, seconds):
+        """
+            Args:
+                seconds(int|float)
+        """
+        self.seconds = seconds
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """
+            Returns:
+                float: Seconds left, never less than 0.
+        """
+        return max(self.seconds - self.spent, 0)
+
+    def spend(self, seconds):
+        """
+            Args:
+                seconds(float): Time spent waiting on a call.
+        """
+        with self._lock:
+            self.spent += seconds
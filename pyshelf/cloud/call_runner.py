@@ -0,0 +1,209 @@
+import httplib
+import random
+import socket
+import sys
+import threading
+import time
+from Queue import Queue, Empty
+from boto.exception import BotoServerError
+from pyshelf.cloud.cloud_exceptions import DeadlineExceededError
+
+
+class CallRunner(object):
+    """
+        Makes the calls to S3 that a request is waiting on so that a
+        single slow answer cannot stall it:
+
+        * Each call is only waited on for operation_timeout seconds, or
+          whatever is left of the request's budget if that is less.
+        * Calls that time out or fail in a way that could be temporary
+          (a socket error, a 5xx) are retried up to "retries" times.
+          Retries are spread out by a random (jittered) backoff.
+        * If hedge_percentile is set a call which is taking longer than
+          that percentile of the recent calls of the same kind is sent a
+          second time and whichever answers first is used.
+
+        Calls are made on workers (threads, which are greenlets under
+        gunicorn's gevent workers) so they can be given up on.  A call
+        which is given up on keeps running until it finishes on its own,
+        after which it is cleaned up.
+    """
+    def __init__(self, logger, call_budget, operation_timeout=10, retries=2, backoff=0.1, latency_tracker=None,
+                 hedge_percentile=None):
+        """
+            Args:
+                logger(logging.Logger)
+                call_budget(pyshelf.cloud.call_budget.CallBudget)
+                operation_timeout(int|float): Seconds a single call is waited on.
+                retries(int): The most times a call is retried.
+                backoff(int|float): Seconds the first retry waits at most.  It
+                    doubles for every retry after.
+                latency_tracker(pyshelf.cloud.latency_tracker.LatencyTracker|None):
+                    Needed to hedge.
+                hedge_percentile(int|float|None): If provided calls which allow
+                    it are hedged.
+        """
+        self.logger = logger
+        self.call_budget = call_budget
+        self.operation_timeout = operation_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.latency_tracker = latency_tracker
+        self.hedge_percentile = hedge_percentile
+
+    def call(self, name, attempt, discard=None, hedge=False):
+        """
+            Args:
+                name(basestring): Kind of call, for instance "HEAD".
+                attempt(function): Makes the call.  It can be run more than
+                    once, even at the same time, so every run must use a
+                    connection of its own.
+                discard(function|None): Given what a run returned which is not
+                    going to be used it cleans up after it.
+                hedge(boolean): If False the call is never sent twice at once.
+
+            Returns:
+                Whatever attempt returned.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.DeadlineExceededError
+                Whatever attempt raised if it is not worth retrying.
+        """
+        start = time.time()
+        try:
+            try_number = 0
+            while True:
+                timeout = min(self.operation_timeout, self.call_budget.remaining() - (time.time() - start))
+                if timeout <= 0:
+                    raise DeadlineExceededError(name)
+
+                try:
+                    return self._race(name, attempt, discard, hedge, timeout)
+                except Exception as e:
+                    if try_number >= self.retries or not self._should_retry(e):
+                        raise
+
+                    try_number += 1
+                    # Full jitter so that the retries of many workers do
+                    # not all land at once.
+                    delay = random.uniform(0, self.backoff * 2 ** try_number)
+                    self.logger.warning("Retrying {0} in {1:.3f} seconds after {2!r}".format(name, delay, e))
+                    time.sleep(max(min(delay, self.call_budget.remaining() - (time.time() - start)), 0))
+        finally:
+            self.call_budget.spend(time.time() - start)
+
+    def _race(self, name, attempt, discard, hedge, timeout):
+        """
+            Runs attempt (twice if it is hedged) and returns the first
+            thing it returns.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.DeadlineExceededError: If
+                    nothing came back within timeout.
+                Whatever attempt raised if every run failed.
+        """
+        result_queue = Queue()
+        lock = threading.Lock()
+        state = {"done": False}
+
+        def run():
+            start = time.time()
+            try:
+                result = (True, attempt())
+            except Exception:
+                result = (False, sys.exc_info())
+
+            if result[0] and self.latency_tracker:
+                # Late answers are counted too, otherwise the stragglers
+                # would never show up in the percentiles.
+                self.latency_tracker.add(name, time.time() - start)
+
+            with lock:
+                late = state["done"]
+                if not late:
+                    result_queue.put(result)
+
+            if late:
+                self._discard(discard, result)
+
+        start = time.time()
+        expires = start + timeout
+        hedge_at = None
+        if hedge:
+            delay = self._get_hedge_delay(name)
+            if delay is not None:
+                hedge_at = start + delay
+
+        self._start(run)
+        running = 1
+        failure = None
+        try:
+            while running:
+                if hedge_at is not None and time.time() >= hedge_at:
+                    self.logger.debug("Hedging {0} after {1:.3f} seconds".format(name, time.time() - start))
+                    hedge_at = None
+                    self._start(run)
+                    running += 1
+
+                wait_until = expires
+                if hedge_at is not None:
+                    wait_until = min(expires, hedge_at)
+
+                try:
+                    success, value = result_queue.get(timeout=max(wait_until - time.time(), 0))
+                except Empty:
+                    if time.time() >= expires:
+                        raise DeadlineExceededError(name)
+
+                    continue
+
+                running -= 1
+                if success:
+                    return value
+
+                # The other run (if there is one) may still answer.
+                failure = value
+
+            raise failure[0], failure[1], failure[2]
+        finally:
+            with lock:
+                state["done"] = True
+                leftover_list = []
+                while not result_queue.empty():
+                    leftover_list.append(result_queue.get_nowait())
+
+            for result in leftover_list:
+                self._discard(discard, result)
+
+    def _get_hedge_delay(self, name):
+        """
+            Returns:
+                float|None: Seconds to wait before hedging, None to not hedge.
+        """
+        if self.hedge_percentile is None or not self.latency_tracker:
+            return None
+
+        return self.latency_tracker.percentile(name, self.hedge_percentile)
+
+    def _start(self, run):
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+
+    def _discard(self, discard, result):
+        success, value = result
+        if success and discard:
+            try:
+                discard(value)
+            except Exception as e:
+                self.logger.warning("Could not clean up after an unused call: {0!r}".format(e))
+
+    def _should_retry(self, e):
+        """
+            Returns:
+                boolean: True if e could be temporary.
+        """
+        if isinstance(e, (DeadlineExceededError, socket.error, httplib.HTTPException)):
+            return True
+
+        return isinstance(e, BotoServerError) and e.status >= 500
@@ -35,3 +35,29 @@ class BucketConfigurationNotFound(CloudStorageException):
     def __init__(self, bucket_name):
         message = "Could not find configuration for bucket {0}".format(bucket_name)
         super(BucketConfigurationNotFound, self).__init__(message, ErrorCode.RESOURCE_NOT_FOUND)
+
+
+class RangeNotSatisfiableError(CloudStorageException):
+    def __init__(self, size):
+        message = "None of the requested ranges overlap the artifact"
+        super(RangeNotSatisfiableError, self).__init__(message, ErrorCode.RANGE_NOT_SATISFIABLE)
+        self.size = size
+
+
+class UploadMismatchError(CloudStorageException):
+    def __init__(self, artifact_name):
+        message = "What was uploaded for {0} does not match the size or md5 it was finalized with".format(artifact_name)
+        super(UploadMismatchError, self).__init__(message, ErrorCode.BAD_REQUEST)
+
+
+class CopyNotSupportedError(CloudStorageException):
+    def __init__(self, source_bucket_name, bucket_name):
+        message = "Artifacts cannot be copied from {0} to {1} without downloading them".format(
+            source_bucket_name, bucket_name)
+        super(CopyNotSupportedError, self).__init__(message, ErrorCode.BAD_REQUEST)
+
+
+class DeadlineExceededError(CloudStorageException):
+    def __init__(self, operation):
+        message = "Gave up on {0} since S3 did not answer in time".format(operation)
+        super(DeadlineExceededError, self).__init__(message, ErrorCode.GATEWAY_TIMEOUT)
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from boto.s3.connection import S3Connection
+
+
+class ConnectionPool(object):
+    """
+        A process wide pool of S3 connections keyed by the credentials
+        used to create them.  boto keeps the underlying HTTP(S) sockets
+        of an S3Connection alive, so handing the same connection to the
+        next caller skips the TCP and TLS handshakes.
+
+        A connection is only ever leased to one caller at a time since
+        an S3Connection is not safe to share between threads (or greenlets).
+    """
+    def __init__(self, max_size=10, idle_timeout=60):
+        """
+            Args:
+                max_size(int): The most idle connections kept per set of credentials.
+                idle_timeout(int|float): Seconds an idle connection is kept before
+                    it is evicted.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def acquire(self, access_key, secret_key):
+        """
+            Leases a connection for the provided credentials.  An idle
+            connection is reused if one exists, otherwise a new one is made.
+
+            Args:
+                access_key(basestring)
+                secret_key(basestring)
+
+            Returns:
+                boto.s3.connection.S3Connection
+        """
+        pool_key = (access_key, secret_key)
+        with self._lock:
+            self._check_fork()
+            self._evict()
+            idle_list = self._idle.get(pool_key)
+            if idle_list:
+                # Most recently used first so that the connections that
+                # are not needed age out.
+                conn, last_used = idle_list.pop()
+                return conn
+
+        return self._create_connection(access_key, secret_key)
+
+    def release(self, access_key, secret_key, conn):
+        """
+            Returns a leased connection to the pool.  If the pool is
+            already full the connection is closed instead.
+
+            Args:
+                access_key(basestring)
+                secret_key(basestring)
+                conn(boto.s3.connection.S3Connection)
+        """
+        pool_key = (access_key, secret_key)
+        with self._lock:
+            self._check_fork()
+            idle_list = self._idle.setdefault(pool_key, [])
+            if len(idle_list) < self.max_size:
+                idle_list.append((conn, time.time()))
+                return
+
+        conn.close()
+
+    def discard(self, conn):
+        """
+            Closes a leased connection without returning it to the pool.
+            This should be used when the connection is in a state that
+            cannot be trusted, for instance after a socket error.
+
+            Args:
+                conn(boto.s3.connection.S3Connection)
+        """
+        conn.close()
+
+    def clear(self):
+        """
+            Closes and forgets every idle connection.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+
+        for idle_list in idle.values():
+            for conn, last_used in idle_list:
+                conn.close()
+
+    def _evict(self):
+        """
+            Drops idle connections that have not been used within
+            idle_timeout.  Expects the lock to be held.
+        """
+        cutoff = time.time() - self.idle_timeout
+        for pool_key in self._idle.keys():
+            idle_list = self._idle[pool_key]
+            while idle_list and idle_list[0][1] < cutoff:
+                conn, last_used = idle_list.pop(0)
+                conn.close()
+
+            if not idle_list:
+                del self._idle[pool_key]
+
+    def _check_fork(self):
+        """
+            A forked child (bulk update runs buckets in their own process)
+            must not write to sockets owned by its parent.  Expects the
+            lock to be held.
+        """
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._idle = {}
+
+    def _create_connection(self, access_key, secret_key):
+        """
+            This method exists mostly for mocking.
+        """
+        return S3Connection(access_key, secret_key)
+
+
+def acquire(connection_pool, access_key, secret_key):
+    """
+        Leases a connection from the pool or, without one, creates a
+        connection of its own.
+
+        Args:
+            connection_pool(pyshelf.cloud.connection_pool.ConnectionPool|None)
+            access_key(basestring)
+            secret_key(basestring)
+
+        Returns:
+            boto.s3.connection.S3Connection
+    """
+    if connection_pool:
+        return connection_pool.acquire(access_key, secret_key)
+
+    return S3Connection(access_key, secret_key)
+
+
+def release(connection_pool, access_key, secret_key, conn, discard=False):
+    """
+        Gives back a connection from acquire.
+
+        Args:
+            connection_pool(pyshelf.cloud.connection_pool.ConnectionPool|None)
+            access_key(basestring)
+            secret_key(basestring)
+            conn(boto.s3.connection.S3Connection)
+            discard(boolean): If True a pooled connection will not be
+                reused.
+    """
+    if not connection_pool:
+        conn.close()
+    elif discard:
+        connection_pool.discard(conn)
+    else:
+        connection_pool.release(access_key, secret_key, conn)
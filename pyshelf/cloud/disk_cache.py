@@ -0,0 +1,258 @@
+import errno
+import fcntl
+import hashlib
+import os
+import threading
+import time
+
+
+class DiskCache(object):
+    """
+        Keeps whole artifacts on local disk so that popular ones do
+        not have to be downloaded from S3 over and over again.
+
+        Artifacts can never be overwritten so an entry (keyed by bucket,
+        path and etag) never goes stale, it is only ever evicted.  The
+        least recently used entries are removed once the cache grows
+        beyond max_size bytes.
+
+        Everything is coordinated through the file system so the cache
+        can be shared by every gunicorn worker on the host:
+
+        * Entries are written to a ".fill" file and renamed into place
+          once complete, so a partial entry is never read.
+        * Whoever holds the lock on the ".fill" file is the only one
+          filling that entry.  Everyone else streams from S3 instead of
+          waiting on it.
+        * Reading an entry touches it which is how the LRU is tracked.
+
+        Listing the directory to find what to evict is slow once it
+        holds many entries, so the size is tracked as entries are added
+        and the directory is only listed once it looks too big.  Other
+        workers add entries too so it is also listed every scan_interval
+        seconds.
+    """
+    FILL_SUFFIX = ".fill"
+
+    def __init__(self, directory, max_size, logger, scan_interval=60):
+        """
+            Args:
+                directory(basestring): Where entries are kept.  It is
+                    created if it does not exist.
+                max_size(int): Bytes the cache is allowed to use.
+                logger(logging.Logger)
+                scan_interval(int|float): Most seconds between listings
+                    of the directory.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.logger = logger
+        self.scan_interval = scan_interval
+        # Bytes used when the directory was last listed plus whatever
+        # this process added since.  None until it is first listed.
+        self._size = None
+        self._last_scan = None
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def open(self, bucket_name, key_name, etag):
+        """
+            Args:
+                bucket_name(basestring)
+                key_name(basestring)
+                etag(basestring)
+
+            Returns:
+                file|None: The cached artifact opened for reading or None
+                    if it is not in the cache.
+        """
+        path = self._get_path(bucket_name, key_name, etag)
+        try:
+            fp = open(path, "rb")
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            # Evicted between opening and touching it.  The file we
+            # already have open is still good.
+            pass
+
+        self.logger.debug("Disk cache hit for {0}".format(key_name))
+        return fp
+
+    def create_writer(self, bucket_name, key_name, etag, size):
+        """
+            Args:
+                bucket_name(basestring)
+                key_name(basestring)
+                etag(basestring)
+                size(int): Size of the artifact in bytes.
+
+            Returns:
+                pyshelf.cloud.disk_cache.CacheWriter|None: None if the
+                    artifact should not be cached or another worker is
+                    already caching it.
+        """
+        if size > self.max_size:
+            return None
+
+        path = self._get_path(bucket_name, key_name, etag)
+        fill_path = path + DiskCache.FILL_SUFFIX
+        fd = None
+        try:
+            fd = os.open(fill_path, os.O_WRONLY | os.O_CREAT, 0644)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # Whoever held the lock before us may have renamed the file
+            # into place after we opened it, in which case we are holding
+            # a lock on a finished entry and must not touch it.
+            is_fill_file = os.fstat(fd).st_ino == os.stat(fill_path).st_ino
+            if is_fill_file and not os.path.exists(path):
+                os.ftruncate(fd, 0)
+                return CacheWriter(self, fd, fill_path, path)
+        except (IOError, OSError) as e:
+            # Once it is open these mean another worker is filling it or
+            # has just renamed it into place.  Anything else is a broken
+            # cache (permissions, full disk, out of file descriptors, etc)
+            # which should never break a download.
+            if fd is None or e.errno not in (errno.EAGAIN, errno.EACCES, errno.ENOENT):
+                self.logger.exception("Failed to start adding {0} to the disk cache".format(key_name))
+
+        if fd is not None:
+            os.close(fd)
+
+        return None
+
+    def add(self, size):
+        """
+            Records that an entry was added, evicting entries if the cache
+            might have grown beyond max_size.
+
+            Args:
+                size(int): Size of the entry in bytes.
+        """
+        with self._lock:
+            is_stale = self._size is None or time.time() - self._last_scan >= self.scan_interval
+            if not is_stale:
+                self._size += size
+                if self._size <= self.max_size:
+                    return
+
+        self.evict()
+
+    def evict(self):
+        """
+            Removes the least recently used entries until the cache is
+            no larger than max_size.
+        """
+        entry_list = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(DiskCache.FILL_SUFFIX):
+                continue
+
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entry_list.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entry_list.sort()
+        for mtime, size, path in entry_list:
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+                self.logger.debug("Evicted {0} from the disk cache".format(path))
+            except OSError:
+                # Another worker beat us to it.
+                pass
+
+            total -= size
+
+        with self._lock:
+            self._size = total
+            self._last_scan = time.time()
+
+    def _get_path(self, bucket_name, key_name, etag):
+        name = hashlib.sha1("{0}\n{1}\n{2}".format(bucket_name, key_name, etag)).hexdigest()
+        return os.path.join(self.directory, name)
+
+
+class CacheWriter(object):
+    """
+        Fills a single entry of a DiskCache.  Either commit or abort
+        must be called once the artifact has been written.
+
+        A broken cache (full disk, etc) should never break a download,
+        so errors are logged and the entry is thrown away instead.
+    """
+    def __init__(self, disk_cache, fd, fill_path, path):
+        """
+            Args:
+                disk_cache(pyshelf.cloud.disk_cache.DiskCache)
+                fd(int): Locked file descriptor of the fill file.
+                fill_path(basestring)
+                path(basestring): Where the entry belongs once complete.
+        """
+        self.disk_cache = disk_cache
+        self.fp = os.fdopen(fd, "wb")
+        self.fill_path = fill_path
+        self.path = path
+        self.failed = False
+        self.size = 0
+
+    def write(self, data):
+        if self.failed:
+            return
+
+        try:
+            self.fp.write(data)
+            self.size += len(data)
+        except (IOError, OSError):
+            self.disk_cache.logger.exception("Failed to write {0} to the disk cache".format(self.path))
+            self.failed = True
+
+    def commit(self):
+        """
+            Makes the entry available.  The rename happens before the
+            lock is released so nobody else can start on it in between.
+        """
+        if self.failed:
+            self.abort()
+            return
+
+        try:
+            self.fp.flush()
+            os.rename(self.fill_path, self.path)
+            self.fp.close()
+            self.disk_cache.add(self.size)
+        except (IOError, OSError):
+            self.disk_cache.logger.exception("Failed to add {0} to the disk cache".format(self.path))
+            self.abort()
+
+    def abort(self):
+        """
+            Throws away whatever was written.
+        """
+        try:
+            os.remove(self.fill_path)
+        except OSError:
+            pass
+
+        try:
+            self.fp.close()
+        except (IOError, OSError):
+            pass
@@ -0,0 +1,353 @@
+import hashlib
+import math
+import struct
+import threading
+from pyshelf import artifact_key_filter
+
+
+class BloomFilter(object):
+    """
+        A set of names which can say for certain that a name was never
+        added, using a few bits per name however long the names are.
+        It can be wrong the other way around: a name that was never
+        added can be thought to be there (a false positive).
+    """
+    def __init__(self, capacity, false_positive_rate=0.01):
+        """
+            Args:
+                capacity(int): How many names it is sized for.  More can be
+                    added but the false positive rate goes up.
+                false_positive_rate(float): Rate wanted once it holds capacity
+                    names.
+        """
+        self.capacity = max(capacity, 1)
+        self.size = int(math.ceil(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(float(self.size) / self.capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, name):
+        """
+            Args:
+                name(basestring)
+        """
+        for position in self._get_positions(name):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, name):
+        for position in self._get_positions(name):
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
+
+    @property
+    def false_positive_rate(self):
+        """
+            Returns:
+                float: Estimated from how many names were added.
+        """
+        return (1 - math.exp(-float(self.hash_count) * self.count / self.size)) ** self.hash_count
+
+    def _get_positions(self, name):
+        if isinstance(name, unicode):
+            name = name.encode("utf-8")
+
+        # Every position is derived from two hashes (double hashing)
+        # instead of hashing the name once per position.
+        first, second = struct.unpack("<QQ", hashlib.md5(name).digest())
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+
+class ScalableBloomFilter(object):
+    """
+        A BloomFilter which does not need to know how many names it
+        will hold.  Once its newest filter holds as many names as it
+        was sized for another twice as large is started.  Each one is
+        sized for a smaller rate than the one before so that together
+        they stay under the rate wanted.
+    """
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, capacity, false_positive_rate=0.01):
+        """
+            Args:
+                capacity(int): How many names the first filter is sized for.
+                false_positive_rate(float): Rate wanted however many names
+                    are added.
+        """
+        self.target_rate = false_positive_rate
+        self._filter_list = [BloomFilter(capacity, false_positive_rate * (1 - ScalableBloomFilter.TIGHTENING))]
+
+    def add(self, name):
+        """
+            Args:
+                name(basestring)
+        """
+        bloom_filter = self._filter_list[-1]
+        if bloom_filter.count >= bloom_filter.capacity:
+            rate = self.target_rate * (1 - ScalableBloomFilter.TIGHTENING) * \
+                ScalableBloomFilter.TIGHTENING ** len(self._filter_list)
+            bloom_filter = BloomFilter(bloom_filter.capacity * ScalableBloomFilter.GROWTH, rate)
+            self._filter_list.append(bloom_filter)
+
+        bloom_filter.add(name)
+
+    def __contains__(self, name):
+        for bloom_filter in self._filter_list:
+            if name in bloom_filter:
+                return True
+
+        return False
+
+    @property
+    def count(self):
+        return sum(bloom_filter.count for bloom_filter in self._filter_list)
+
+    @property
+    def false_positive_rate(self):
+        """
+            Returns:
+                float: Estimated from how many names were added.
+        """
+        miss_rate = 1.0
+        for bloom_filter in self._filter_list:
+            miss_rate *= 1 - bloom_filter.false_positive_rate
+
+        return 1 - miss_rate
+
+
+class ExistenceFilter(object):
+    """
+        Knows which artifacts and directories existed in a bucket when
+        it was last built, so that a request for one that is not known
+        can be answered with a single listing instead of a HEAD and
+        then a listing.
+
+        It is built from a listing of the whole bucket in a background
+        thread and rebuilt every refresh_interval seconds.  Uploads made
+        by this process are added as they happen.  Anything uploaded
+        some other way (another process for instance) is unknown until
+        the next rebuild, which is why what it does not know is still
+        looked for (see add_unknown).  Until the first build is finished
+        everything might exist.
+    """
+    # Room for what is uploaded before the next rebuild.
+    HEADROOM = 2
+    MIN_CAPACITY = 1024
+
+    def __init__(self, bucket_name, create_lister, logger, refresh_interval=300, false_positive_rate=0.01):
+        """
+            Args:
+                bucket_name(basestring): Only used for logging.
+                create_lister(function): Creates a
+                    pyshelf.cloud.partitioned_lister.PartitionedLister of the
+                    bucket.
+                logger(logging.Logger)
+                refresh_interval(int|float): Seconds between rebuilds.
+                false_positive_rate(float): Rate the filter is sized for.
+        """
+        self.bucket_name = bucket_name
+        self.create_lister = create_lister
+        self.logger = logger
+        self.refresh_interval = refresh_interval
+        self.false_positive_rate = false_positive_rate
+        self._bloom_filter = None
+        # Names added while a rebuild is listing the bucket, which it
+        # may or may not have seen.
+        self._pending = None
+        self._lookups = 0
+        self._misses = 0
+        self._unknown = 0
+        self._false_positives = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+            Starts building and rebuilding in the background.  Calling it
+            more than once does nothing.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def close(self):
+        """
+            Stops rebuilding once the current rebuild (if any) is done.
+        """
+        self._stopped.set()
+
+    def refresh(self):
+        """
+            Builds the filter from a listing of the whole bucket and
+            replaces the one in use once it is done.  Names are added as
+            they are listed so they are never all held in memory.
+        """
+        with self._lock:
+            self._pending = []
+            capacity = ExistenceFilter.MIN_CAPACITY
+            if self._bloom_filter is not None:
+                capacity = max(self._bloom_filter.count * ExistenceFilter.HEADROOM, capacity)
+
+        try:
+            bloom_filter = ScalableBloomFilter(capacity, self.false_positive_rate)
+            previous_name = ""
+            lister = self.create_lister()
+            for key in lister.iter_keys("", skip=artifact_key_filter.is_reserved):
+                name = key.name.strip("/")
+                if key.name.endswith("/") or artifact_key_filter.is_reserved(name):
+                    continue
+
+                bloom_filter.add(name)
+                # Keys are listed in lexical order so everything in a
+                # directory comes one after the other.  Directories the
+                # previous key was in are already added.
+                for directory in self._iter_directories(name):
+                    if previous_name.startswith(directory + "/"):
+                        break
+
+                    bloom_filter.add(directory)
+
+                previous_name = name
+        except Exception:
+            with self._lock:
+                self._pending = None
+
+            raise
+
+        with self._lock:
+            for name in self._pending:
+                bloom_filter.add(name)
+
+            self._pending = None
+            self._bloom_filter = bloom_filter
+
+        self.logger.info("Existence filter of {0} rebuilt: {1}".format(self.bucket_name, self.get_stats()))
+
+    def add(self, path):
+        """
+            Remembers an artifact (and the directories it is in).  It
+            should be added before it is uploaded so that nothing asking
+            for it afterwards is turned away.
+
+            Args:
+                path(basestring): path or name of artifact.
+        """
+        name = path.strip("/")
+        name_list = [name] + list(self._iter_directories(name))
+        with self._lock:
+            for name in name_list:
+                if self._bloom_filter is not None:
+                    self._bloom_filter.add(name)
+
+                if self._pending is not None:
+                    self._pending.append(name)
+
+    def might_exist(self, path, record=True):
+        """
+            Args:
+                path(basestring): path of an artifact or directory.
+                record(boolean): Whether to count the lookup in the stats.
+
+            Returns:
+                boolean: False only if there was nothing at path when the
+                    filter was built and it was not uploaded by this process
+                    since.
+        """
+        name = path.strip("/")
+        if not name or artifact_key_filter.is_reserved(name):
+            return True
+
+        with self._lock:
+            if self._bloom_filter is None:
+                return True
+
+            exists = name in self._bloom_filter
+            if record:
+                self._lookups += 1
+                if not exists:
+                    self._misses += 1
+
+        return exists
+
+    def add_unknown(self, path):
+        """
+            Records that something which was not known to exist did, so
+            it was uploaded after the filter was built and not by this
+            process.  It is remembered from now on.
+
+            Args:
+                path(basestring): path of an artifact or directory.
+        """
+        self.add(path)
+        with self._lock:
+            self._unknown += 1
+
+    def add_false_positive(self, path):
+        """
+            Records that there was nothing at path even though it
+            might_exist.
+
+            Args:
+                path(basestring): path of an artifact or directory.
+        """
+        name = path.strip("/")
+        if not name or artifact_key_filter.is_reserved(name):
+            return
+
+        with self._lock:
+            if self._bloom_filter is not None:
+                self._false_positives += 1
+
+    def get_stats(self):
+        """
+            Returns:
+                dict: "ready" is False until the first build is finished.  The
+                    "estimatedFalsePositiveRate" comes from how full the filter
+                    is and the "observedFalsePositiveRate" is the share of
+                    lookups for something missing which the filter did not
+                    know was missing (None until there were any).  "unknown"
+                    counts the misses which turned out to exist.
+        """
+        with self._lock:
+            stats = {
+                "ready": self._bloom_filter is not None,
+                "names": self._bloom_filter.count if self._bloom_filter else 0,
+                "estimatedFalsePositiveRate": self._bloom_filter.false_positive_rate if self._bloom_filter else None,
+                "observedFalsePositiveRate": None,
+                "lookups": self._lookups,
+                "misses": self._misses,
+                "unknown": self._unknown,
+                "falsePositives": self._false_positives
+            }
+
+            missing = self._misses - self._unknown + self._false_positives
+            if missing > 0:
+                stats["observedFalsePositiveRate"] = float(self._false_positives) / missing
+
+        return stats
+
+    def _iter_directories(self, name):
+        """
+            Generator of every directory name is in, innermost first.
+        """
+        index = name.rfind("/")
+        while index > 0:
+            yield name[:index]
+            index = name.rfind("/", 0, index)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                self.logger.exception("Failed to rebuild the existence filter of {0}".format(self.bucket_name))
+
+            self._stopped.wait(self.refresh_interval)
@@ -1,14 +1,251 @@
+import threading
 from pyshelf.cloud.storage import Storage
+from pyshelf.cloud.filesystem_storage import FilesystemStorage
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+from pyshelf.cloud.connection_pool import ConnectionPool
+from pyshelf.cloud.bucket_cache import BucketCache
+from pyshelf.cloud.key_cache import KeyCache
+from pyshelf.cloud.multipart_uploader import MultipartUploader
+from pyshelf.cloud.disk_cache import DiskCache
+from pyshelf.cloud.parallel_downloader import ParallelDownloader
+from pyshelf.cloud.read_ahead import ReadAhead
+from pyshelf.cloud.call_runner import CallRunner
+from pyshelf.cloud.latency_tracker import LatencyTracker
+from pyshelf.cloud.partitioned_lister import PartitionedLister
+from pyshelf.cloud.existence_filter import ExistenceFilter
 from pyshelf import utils
 from pyshelf.cloud.cloud_exceptions import BucketConfigurationNotFound
 
 
 class Factory(object):
+    # These are shared by every Factory in the process.  A Factory
+    # only lives as long as a request but the connections should not.
+    _connection_pool = None
+    _bucket_cache = None
+    _key_cache = None
+    _disk_cache = None
+    _memory_store = None
+    _latency_tracker = None
+    _existence_filters = None
+    _lock = threading.Lock()
+
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
 
-    def create_storage(self, bucket_name):
+    @classmethod
+    def reset_shared(cls):
+        """
+            Forgets everything shared by the process.  This exists
+            mostly for tests.
+        """
+        cls._connection_pool = None
+        cls._bucket_cache = None
+        cls._key_cache = None
+        cls._disk_cache = None
+        cls._memory_store = None
+        cls._latency_tracker = None
+        for existence_filter in (cls._existence_filters or {}).values():
+            existence_filter.close()
+
+        cls._existence_filters = None
+
+    @property
+    def connection_pool(self):
+        """
+            Returns:
+                pyshelf.cloud.connection_pool.ConnectionPool
+        """
+        def create():
+            pool_config = self.config.get("connectionPool", {})
+            return ConnectionPool(pool_config.get("maxSize", 10), pool_config.get("idleTimeout", 60))
+
+        return self._get_shared("_connection_pool", create)
+
+    @property
+    def bucket_cache(self):
+        """
+            Returns:
+                pyshelf.cloud.bucket_cache.BucketCache
+        """
+        def create():
+            return BucketCache(self.config.get("bucketCacheTtl", 300))
+
+        return self._get_shared("_bucket_cache", create)
+
+    @property
+    def key_cache(self):
+        """
+            Returns:
+                pyshelf.cloud.key_cache.KeyCache
+        """
+        def create():
+            cache_config = self.config.get("keyCache", {})
+            return KeyCache(cache_config.get("maxSize", 10000), cache_config.get("ttl", 300))
+
+        return self._get_shared("_key_cache", create)
+
+    @property
+    def disk_cache(self):
+        """
+            Returns:
+                pyshelf.cloud.disk_cache.DiskCache|None: None unless diskCache
+                    is configured.
+        """
+        cache_config = self.config.get("diskCache")
+        if not cache_config:
+            return None
+
+        def create():
+            return DiskCache(cache_config["directory"], cache_config.get("maxSize", 1024 * 1024 * 1024), self.logger)
+
+        return self._get_shared("_disk_cache", create)
+
+    @property
+    def memory_store(self):
+        """
+            Returns:
+                pyshelf.cloud.memory_storage.MemoryStore
+        """
+        return self._get_shared("_memory_store", MemoryStore)
+
+    @property
+    def latency_tracker(self):
+        """
+            Returns:
+                pyshelf.cloud.latency_tracker.LatencyTracker
+        """
+        return self._get_shared("_latency_tracker", LatencyTracker)
+
+    def get_existence_filter(self, bucket_name):
+        """
+            The filter is shared by every request for the bucket and is
+            started (built in the background) the first time it is asked
+            for.
+
+            Args:
+                bucket_name(basestring): Name (or reference name) of the bucket.
+
+            Returns:
+                pyshelf.cloud.existence_filter.ExistenceFilter|None: None
+                    unless the bucket is configured with existenceFilter.
+        """
+        bc = utils.get_bucket_config(self.config, bucket_name)
+        filter_config = bc and bc.get("existenceFilter")
+        if filter_config is None:
+            return None
+
+        existence_filters = self._get_shared("_existence_filters", dict)
+        existence_filter = existence_filters.get(bucket_name)
+        if not existence_filter:
+            with Factory._lock:
+                existence_filter = existence_filters.get(bucket_name)
+                if not existence_filter:
+                    existence_filter = ExistenceFilter(
+                        bucket_name,
+                        lambda: self.create_partitioned_lister(bucket_name),
+                        self.logger,
+                        filter_config.get("refreshInterval", 300),
+                        filter_config.get("falsePositiveRate", 0.01)
+                    )
+                    existence_filter.start()
+                    existence_filters[bucket_name] = existence_filter
+
+        return existence_filter
+
+    def create_call_runner(self, call_budget):
+        """
+            Args:
+                call_budget(pyshelf.cloud.call_budget.CallBudget)
+
+            Returns:
+                pyshelf.cloud.call_runner.CallRunner
+        """
+        call_config = self.config.get("s3Calls", {})
+        runner = CallRunner(
+            self.logger,
+            call_budget,
+            call_config.get("operationTimeout", 10),
+            call_config.get("retries", 2),
+            call_config.get("retryBackoff", 0.1),
+            self.latency_tracker,
+            call_config.get("hedgePercentile")
+        )
+
+        return runner
+
+    def create_multipart_uploader(self):
+        """
+            Returns:
+                pyshelf.cloud.multipart_uploader.MultipartUploader
+        """
+        upload_config = self.config.get("multipartUpload", {})
+        uploader = MultipartUploader(
+            self.logger,
+            self.connection_pool,
+            upload_config.get("threshold", 64 * 1024 * 1024),
+            upload_config.get("partSize", 16 * 1024 * 1024),
+            upload_config.get("concurrency", 4),
+            upload_config.get("copyPartSize", 128 * 1024 * 1024)
+        )
+
+        return uploader
+
+    def create_parallel_downloader(self):
+        """
+            Returns:
+                pyshelf.cloud.parallel_downloader.ParallelDownloader
+        """
+        download_config = self.config.get("parallelDownload", {})
+        downloader = ParallelDownloader(
+            self.logger,
+            self.connection_pool,
+            download_config.get("threshold", 256 * 1024 * 1024),
+            download_config.get("chunkSize", 8 * 1024 * 1024),
+            download_config.get("concurrency", 4)
+        )
+
+        return downloader
+
+    def create_read_ahead(self):
+        """
+            Returns:
+                pyshelf.cloud.read_ahead.ReadAhead
+        """
+        stream_config = self.config.get("streaming", {})
+        return ReadAhead(stream_config.get("chunkSize", 64 * 1024), stream_config.get("readAhead", 4))
+
+    def create_partitioned_lister(self, bucket_name):
+        """
+            For listing everything in a bucket, like a bulk update does.
+
+            Args:
+                bucket_name(basestring): Name (or reference name) of the bucket.
+
+            Returns:
+                pyshelf.cloud.partitioned_lister.PartitionedLister
+        """
+        listing_config = self.config.get("bucketListing", {})
+        lister = PartitionedLister(
+            lambda: self.create_storage(bucket_name),
+            listing_config.get("concurrency", 8),
+            listing_config.get("depth", 1)
+        )
+
+        return lister
+
+    def create_storage(self, bucket_name, call_budget=None):
+        """
+            Args:
+                bucket_name(basestring): Name (or reference name) of the bucket.
+                call_budget(pyshelf.cloud.call_budget.CallBudget|None): If
+                    provided the S3 calls a request waits on are made through a
+                    pyshelf.cloud.call_runner.CallRunner limited by it.
+
+            Returns:
+                pyshelf.cloud.base_storage.BaseStorage: The backend the bucket
+                    is configured to use.
+        """
         # Although bucketName exists in the config provided it is not
         # required and is not used because we want the ability to change
         # buckets when we want.
@@ -18,6 +255,41 @@ class Factory(object):
             self.logger.warning("Access keys for {0} are not in your config.".format(bucket_name))
             raise BucketConfigurationNotFound(bucket_name)
 
-        storage = Storage(bc["accessKey"], bc["secretKey"], bc["name"], self.logger)
+        if bc.get("backend") == "filesystem":
+            storage = FilesystemStorage(bc["directory"], bc["name"], self.logger)
+        elif bc.get("backend") == "memory":
+            storage = MemoryStorage(self.memory_store, bc["name"], self.logger, bc.get("latency", 0))
+        else:
+            storage = Storage(
+                bc["accessKey"],
+                bc["secretKey"],
+                bc["name"],
+                self.logger,
+                self.connection_pool,
+                self.bucket_cache,
+                self.create_multipart_uploader(),
+                self.disk_cache,
+                self.create_parallel_downloader(),
+                self.config.get("conditionalWrites", True),
+                self.key_cache,
+                self.create_read_ahead(),
+                call_budget and self.create_call_runner(call_budget)
+            )
 
         return storage
+
+    def _get_shared(self, name, create):
+        """
+            Lazily creates an object shared by every Factory.  The first
+            Factory to ask for it decides its configuration.
+
+            Args:
+                name(basestring): Name of the class attribute to store it in.
+                create(function): Creates the object.
+        """
+        if getattr(Factory, name) is None:
+            with Factory._lock:
+                if getattr(Factory, name) is None:
+                    setattr(Factory, name, create())
+
+        return getattr(Factory, name)
@@ -0,0 +1,292 @@
+import errno
+import hashlib
+import os
+import stat
+import tempfile
+from StringIO import StringIO
+from werkzeug.http import http_date
+from pyshelf.cloud.base_storage import BaseStorage
+from pyshelf.cloud.hashing_stream import HashingStream
+from pyshelf.cloud.stream_iterator import FileStreamIterator, MultiRangeIterator
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, BucketNotFoundError, CopyNotSupportedError, \
+    DuplicateArtifactError
+
+
+class FileKey(object):
+    """
+        Looks enough like a boto.s3.key.Key for the rest of pyshelf.
+    """
+    def __init__(self, name, file_stat=None):
+        """
+            Args:
+                name(basestring): Name of the artifact.
+                file_stat(posix.stat_result|None): Not provided for directories.
+        """
+        self.name = name
+        self.content_type = "application/octet-stream"
+        self.size = None
+        self.etag = None
+        self.last_modified = None
+        if file_stat:
+            self.size = file_stat.st_size
+            # Reading the whole file to find its md5 is too expensive to do
+            # for every request.  An artifact is never overwritten so this
+            # only changes if someone changes the file behind our back.
+            self.etag = "\"{0:x}-{1:x}\"".format(file_stat.st_size, int(file_stat.st_mtime * 1000000))
+            self.last_modified = http_date(file_stat.st_mtime)
+
+
+class FilesystemStorage(BaseStorage):
+    """
+        Stores artifacts as files in a directory on local disk.  The
+        directory acts as the bucket and the name of an artifact is its
+        path inside of it.
+
+        Uploads are written to a temporary file which is then linked into
+        place, so a partial artifact is never seen and an existing one is
+        never overwritten.
+    """
+    # Kept in the bucket so renames never cross file systems.  It starts
+    # with an underscore so it is private like anything else that does.
+    TEMP_DIRECTORY = "_pyshelf_tmp"
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, directory, bucket_name, logger):
+        """
+            Args:
+                directory(basestring): Where the artifacts of this bucket are.
+                bucket_name(basestring)
+                logger(logging.Logger)
+        """
+        self.root = os.path.realpath(directory)
+        self.bucket_name = bucket_name
+        self.logger = logger
+
+    def connect(self):
+        if not os.path.isdir(self.root):
+            self.logger.error("Bucket {0} does not exist at {1}".format(self.bucket_name, self.root))
+            raise BucketNotFoundError(self.bucket_name)
+
+    def get_artifact(self, artifact_name, byte_range_list=None, key=None):
+        key = key or self.get_key(artifact_name)
+        path = self._get_path(artifact_name)
+        if byte_range_list and len(byte_range_list) > 1:
+            def open_range(byte_range):
+                return FileStreamIterator(key, open(path, "rb"), byte_range)
+
+            return MultiRangeIterator(key, byte_range_list, open_range)
+
+        byte_range = None
+        if byte_range_list:
+            byte_range = byte_range_list[0]
+
+        return FileStreamIterator(key, open(path, "rb"), byte_range)
+
+    def get_key(self, artifact_name):
+        path = self._get_path(artifact_name)
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            file_stat = None
+
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            self.logger.debug("Artifact {0} does not exist in bucket {1}".format(artifact_name, self.bucket_name))
+            raise ArtifactNotFoundError(artifact_name)
+
+        return FileKey(artifact_name, file_stat)
+
+    def upload_artifact(self, artifact_name, fp, size=None):
+        path = self._get_path(artifact_name)
+        # Not needed for correctness, it just saves reading the upload.
+        if os.path.exists(path):
+            raise DuplicateArtifactError(artifact_name)
+
+        self.logger.debug("Commencing upload of {0}".format(artifact_name))
+        stream = HashingStream(fp)
+        temp_path = self._write_temp(stream)
+        try:
+            self._make_directory(os.path.dirname(path))
+            # Unlike a rename, a link refuses to replace an existing file.
+            os.link(temp_path, path)
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                raise DuplicateArtifactError(artifact_name)
+
+            raise
+        finally:
+            os.remove(temp_path)
+
+        return stream
+
+    def copy_artifact(self, source_name, artifact_name, source=None):
+        source = source or self
+        if not isinstance(source, FilesystemStorage):
+            raise CopyNotSupportedError(source.bucket_name, self.bucket_name)
+
+        source_path = source._get_path(source_name)
+        path = self._get_path(artifact_name)
+        if not os.path.isfile(source_path):
+            raise ArtifactNotFoundError(source_name)
+
+        try:
+            self._make_directory(os.path.dirname(path))
+            # Artifacts never change so they can share the same file.
+            os.link(source_path, path)
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                raise DuplicateArtifactError(artifact_name)
+            elif e.errno == errno.ENOENT:
+                raise ArtifactNotFoundError(source_name)
+            elif e.errno == errno.EXDEV:
+                # The buckets are on different file systems.
+                raise CopyNotSupportedError(source.bucket_name, self.bucket_name)
+
+            raise
+
+    def delete_artifact(self, artifact_name):
+        try:
+            os.remove(self._get_path(artifact_name))
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.EISDIR):
+                raise ArtifactNotFoundError(artifact_name)
+
+            raise
+
+    def get_artifact_as_string(self, path):
+        try:
+            with open(self._get_path(path), "rb") as f:
+                return f.read()
+        except IOError as e:
+            if e.errno in (errno.ENOENT, errno.EISDIR):
+                raise ArtifactNotFoundError(path)
+
+            raise
+
+    def set_artifact_from_string(self, path, data):
+        full_path = self._get_path(path)
+        temp_path = self._write_temp(StringIO(data))
+        try:
+            self._make_directory(os.path.dirname(full_path))
+            os.rename(temp_path, full_path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def get_etag(self, path):
+        md5 = hashlib.md5()
+        with open(self._get_path(path), "rb") as f:
+            for chunk in iter(lambda: f.read(FilesystemStorage.CHUNK_SIZE), ""):
+                md5.update(chunk)
+
+        return md5.hexdigest()
+
+    def iter_directory_contents(self, path, recursive, cursor=None, page_size=None):
+        if path == "/":
+            path = ""
+
+        # Unlike S3 a prefix can only be a directory, so whatever comes
+        # after its last "/" is matched against the names instead.
+        directory_path = path[:path.rfind("/") + 1]
+        directory = self._get_path(directory_path)
+        if not os.path.isdir(directory):
+            return
+
+        if recursive:
+            name_list = self._walk(directory, directory_path)
+        else:
+            name_list = self._list(directory, directory_path)
+
+        for name in sorted(name_list):
+            if (cursor and name <= cursor) or not name.startswith(path):
+                continue
+
+            if name.endswith("/"):
+                yield FileKey(name)
+                continue
+
+            try:
+                file_stat = os.stat(self._get_path(name))
+            except OSError:
+                # Removed since it was listed.
+                continue
+
+            yield FileKey(name, file_stat)
+
+    def _list(self, directory, prefix):
+        name_list = []
+        for entry in os.listdir(directory):
+            if directory == self.root and entry == FilesystemStorage.TEMP_DIRECTORY:
+                continue
+
+            if os.path.isdir(os.path.join(directory, entry)):
+                name_list.append(prefix + entry + "/")
+            else:
+                name_list.append(prefix + entry)
+
+        return name_list
+
+    def _walk(self, directory, prefix):
+        name_list = []
+        for parent, directory_list, file_list in os.walk(directory):
+            if parent == self.root and FilesystemStorage.TEMP_DIRECTORY in directory_list:
+                directory_list.remove(FilesystemStorage.TEMP_DIRECTORY)
+
+            relative = os.path.relpath(parent, directory)
+            for name in file_list:
+                if relative != ".":
+                    name = os.path.join(relative, name)
+
+                name_list.append(prefix + name)
+
+        return name_list
+
+    def _write_temp(self, stream):
+        """
+            Writes everything in stream to a new temporary file.
+
+            Args:
+                stream(file)
+
+            Returns:
+                basestring: Path of the temporary file.
+        """
+        temp_directory = os.path.join(self.root, FilesystemStorage.TEMP_DIRECTORY)
+        self._make_directory(temp_directory)
+        fd, temp_path = tempfile.mkstemp(dir=temp_directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: stream.read(FilesystemStorage.CHUNK_SIZE), ""):
+                    f.write(chunk)
+
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        return temp_path
+
+    def _make_directory(self, directory):
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _get_path(self, artifact_name):
+        """
+            Args:
+                artifact_name(basestring)
+
+            Returns:
+                basestring: Where the artifact is on disk.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError: If the
+                    name points outside of the bucket (for instance "../").
+        """
+        path = os.path.realpath(os.path.join(self.root, artifact_name.lstrip("/")))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            raise ArtifactNotFoundError(artifact_name)
+
+        return path
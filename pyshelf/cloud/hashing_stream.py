@@ -0,0 +1,64 @@
+import hashlib
+
+
+class HashingStream(object):
+    """
+        Wraps a file like object and hashes everything read from it,
+        so the hashes of an upload are known without reading it twice.
+    """
+    def __init__(self, fp):
+        """
+            Args:
+                fp(file): Only needs to support read.
+        """
+        self.fp = fp
+        self.size = 0
+        self._md5 = hashlib.md5()
+        self._sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.fp.read(size)
+        self._md5.update(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        return data
+
+    def read_fully(self, size):
+        """
+            Same as read except it keeps reading until size bytes have
+            been read or there is nothing left.  Streams (like a request
+            body) are allowed to return less than was asked for.
+
+            Args:
+                size(int)
+
+            Returns:
+                basestring
+        """
+        chunk_list = []
+        remaining = size
+        while remaining > 0:
+            data = self.read(remaining)
+            if not data:
+                break
+
+            chunk_list.append(data)
+            remaining -= len(data)
+
+        return "".join(chunk_list)
+
+    @property
+    def md5(self):
+        """
+            Returns:
+                basestring: Hex digest of what has been read so far.
+        """
+        return self._md5.hexdigest()
+
+    @property
+    def sha256(self):
+        """
+            Returns:
+                basestring: Hex digest of what has been read so far.
+        """
+        return self._sha256.hexdigest()
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from pyshelf import artifact_key_filter
+
+
+class CachedKey(object):
+    """
+        What is remembered about an artifact.  It is everything a HEAD
+        returns that pyshelf uses.
+    """
+    def __init__(self, name, size, etag, last_modified, content_type):
+        self.name = name
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+
+
+class KeyCache(object):
+    """
+        Remembers what S3 said about artifacts (size, etag, etc) so that
+        an artifact does not need a HEAD request every time it is asked
+        for.  Artifacts can never be overwritten so an entry only goes
+        stale if the artifact is deleted, which only pyshelf itself does
+        (see invalidate).  The ttl bounds how long another process can
+        be fooled by that.
+
+        Only artifacts which exist are cached, since one that does not
+        can be uploaded at any time.  Reserved names (_keys, metadata)
+        are never cached since they are written over.  The least
+        recently used entries are dropped once there are more than
+        max_size.
+    """
+    def __init__(self, max_size=10000, ttl=300):
+        """
+            Args:
+                max_size(int): The most artifacts remembered.
+                ttl(int|float): Seconds an entry is trusted.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket_name, key_name):
+        """
+            Args:
+                bucket_name(basestring)
+                key_name(basestring)
+
+            Returns:
+                pyshelf.cloud.key_cache.CachedKey|None
+        """
+        if artifact_key_filter.is_reserved(key_name):
+            return None
+
+        cache_key = (bucket_name, key_name)
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is None:
+                return None
+
+            expires, cached_key = entry
+            if expires < time.time():
+                return None
+
+            # Put back at the end as the most recently used.
+            self._entries[cache_key] = entry
+
+        return cached_key
+
+    def add(self, bucket_name, key):
+        """
+            Args:
+                bucket_name(basestring)
+                key(boto.s3.key.Key): Must have been looked up (HEAD).
+        """
+        if artifact_key_filter.is_reserved(key.name):
+            return
+
+        cached_key = CachedKey(key.name, key.size, key.etag, key.last_modified, key.content_type)
+        cache_key = (bucket_name, key.name)
+        with self._lock:
+            self._entries.pop(cache_key, None)
+            self._entries[cache_key] = (time.time() + self.ttl, cached_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, bucket_name, key_name):
+        """
+            Args:
+                bucket_name(basestring)
+                key_name(basestring)
+        """
+        with self._lock:
+            self._entries.pop((bucket_name, key_name), None)
@@ -0,0 +1,54 @@
+import threading
+from collections import deque
+
+
+class LatencyTracker(object):
+    """
+        Remembers how long the most recent calls of each kind took so
+        that a slow call can be told apart from a normal one.  It is
+        shared by every request in the process.
+    """
+    def __init__(self, size=1000, min_samples=20):
+        """
+            Args:
+                size(int): How many of the most recent calls of each kind
+                    are remembered.
+                min_samples(int): Percentiles are not trusted until this
+                    many calls have been seen.
+        """
+        self.size = size
+        self.min_samples = min_samples
+        self._sample_map = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        """
+            Args:
+                name(basestring): Kind of call, for instance "HEAD".
+                seconds(float): How long it took.
+        """
+        with self._lock:
+            sample_list = self._sample_map.get(name)
+            if sample_list is None:
+                sample_list = self._sample_map[name] = deque(maxlen=self.size)
+
+            sample_list.append(seconds)
+
+    def percentile(self, name, percent):
+        """
+            Args:
+                name(basestring): Kind of call.
+                percent(int|float): Between 0 and 100.
+
+            Returns:
+                float|None: Seconds that percent of the recent calls took at
+                    most.  None if not enough calls have been seen.
+        """
+        with self._lock:
+            sample_list = sorted(self._sample_map.get(name, []))
+
+        if len(sample_list) < max(self.min_samples, 1):
+            return None
+
+        index = int(round(percent / 100.0 * (len(sample_list) - 1)))
+        return sample_list[min(max(index, 0), len(sample_list) - 1)]
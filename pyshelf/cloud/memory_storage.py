@@ -0,0 +1,185 @@
+import hashlib
+import threading
+import time
+from StringIO import StringIO
+from werkzeug.http import http_date
+from pyshelf.cloud.base_storage import BaseStorage
+from pyshelf.cloud.hashing_stream import HashingStream
+from pyshelf.cloud.stream_iterator import FileStreamIterator, MultiRangeIterator
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, CopyNotSupportedError, DuplicateArtifactError
+
+
+class MemoryKey(object):
+    """
+        Looks enough like a boto.s3.key.Key for the rest of pyshelf.
+    """
+    def __init__(self, name, data=None):
+        """
+            Args:
+                name(basestring): Name of the artifact.
+                data(basestring|None): Not provided for directories.
+        """
+        self.name = name
+        self.data = data
+        self.content_type = "application/octet-stream"
+        self.size = None
+        self.etag = None
+        self.last_modified = None
+        if data is not None:
+            self.size = len(data)
+            self.etag = "\"{0}\"".format(hashlib.md5(data).hexdigest())
+            self.last_modified = http_date(time.time())
+
+
+class MemoryStore(object):
+    """
+        Holds the artifacts of every bucket kept in memory.  It is shared
+        by every request in the process.
+    """
+    def __init__(self):
+        self.bucket_map = {}
+        self.lock = threading.Lock()
+
+    def get(self, bucket_name, name):
+        """
+            Returns:
+                pyshelf.cloud.memory_storage.MemoryKey|None
+        """
+        with self.lock:
+            return self.bucket_map.get(bucket_name, {}).get(name)
+
+    def set(self, bucket_name, key, overwrite=True):
+        """
+            Args:
+                bucket_name(basestring)
+                key(pyshelf.cloud.memory_storage.MemoryKey)
+                overwrite(boolean)
+
+            Returns:
+                boolean: False if the key already existed and overwrite is False.
+        """
+        with self.lock:
+            bucket = self.bucket_map.setdefault(bucket_name, {})
+            if not overwrite and key.name in bucket:
+                return False
+
+            bucket[key.name] = key
+            return True
+
+    def delete(self, bucket_name, name):
+        """
+            Returns:
+                boolean: False if there was nothing to delete.
+        """
+        with self.lock:
+            return self.bucket_map.get(bucket_name, {}).pop(name, None) is not None
+
+    def name_list(self, bucket_name, prefix):
+        """
+            Returns:
+                List(basestring): Names of the keys which start with prefix.
+        """
+        with self.lock:
+            return [name for name in self.bucket_map.get(bucket_name, {}) if name.startswith(prefix)]
+
+
+class MemoryStorage(BaseStorage):
+    """
+        Keeps artifacts in memory.  It is meant for benchmarking pyshelf
+        itself and for fast tests, everything is lost when the process
+        exits.
+    """
+    def __init__(self, store, bucket_name, logger, latency=0):
+        """
+            Args:
+                store(pyshelf.cloud.memory_storage.MemoryStore)
+                bucket_name(basestring)
+                logger(logging.Logger)
+                latency(float): Seconds every operation waits, to act a bit
+                    more like a remote store.
+        """
+        self.store = store
+        self.bucket_name = bucket_name
+        self.logger = logger
+        self.latency = latency
+
+    def get_artifact(self, artifact_name, byte_range_list=None, key=None):
+        key = key or self.get_key(artifact_name)
+        if byte_range_list and len(byte_range_list) > 1:
+            def open_range(byte_range):
+                return FileStreamIterator(key, StringIO(key.data), byte_range)
+
+            return MultiRangeIterator(key, byte_range_list, open_range)
+
+        byte_range = None
+        if byte_range_list:
+            byte_range = byte_range_list[0]
+
+        return FileStreamIterator(key, StringIO(key.data), byte_range)
+
+    def get_key(self, artifact_name):
+        self._wait()
+        key = self.store.get(self.bucket_name, artifact_name)
+        if key is None:
+            raise ArtifactNotFoundError(artifact_name)
+
+        return key
+
+    def upload_artifact(self, artifact_name, fp, size=None):
+        self._wait()
+        stream = HashingStream(fp)
+        key = MemoryKey(artifact_name, stream.read())
+        if not self.store.set(self.bucket_name, key, overwrite=False):
+            raise DuplicateArtifactError(artifact_name)
+
+        return stream
+
+    def copy_artifact(self, source_name, artifact_name, source=None):
+        source = source or self
+        if not isinstance(source, MemoryStorage):
+            raise CopyNotSupportedError(source.bucket_name, self.bucket_name)
+
+        key = MemoryKey(artifact_name, source.get_key(source_name).data)
+        if not self.store.set(self.bucket_name, key, overwrite=False):
+            raise DuplicateArtifactError(artifact_name)
+
+    def delete_artifact(self, artifact_name):
+        self._wait()
+        if not self.store.delete(self.bucket_name, artifact_name):
+            raise ArtifactNotFoundError(artifact_name)
+
+    def get_artifact_as_string(self, path):
+        return self.get_key(path).data
+
+    def set_artifact_from_string(self, path, data):
+        self._wait()
+        self.store.set(self.bucket_name, MemoryKey(path, data))
+
+    def iter_directory_contents(self, path, recursive, cursor=None, page_size=None):
+        if path == "/":
+            path = ""
+
+        self._wait()
+        name_set = set()
+        for name in self.store.name_list(self.bucket_name, path):
+            if not recursive:
+                # Same as S3 does with a "/" delimiter.
+                separator = name.find("/", len(path))
+                if separator != -1:
+                    name = name[:separator + 1]
+
+            name_set.add(name)
+
+        for name in sorted(name_set):
+            if cursor and name <= cursor:
+                continue
+
+            key = None
+            if not name.endswith("/") or recursive:
+                key = self.store.get(self.bucket_name, name)
+
+            yield key or MemoryKey(name)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
@@ -0,0 +1,249 @@
+from StringIO import StringIO
+from xml.sax.saxutils import escape
+from boto.s3.multipart import MultiPartUpload
+from pyshelf.cloud import connection_pool as connection_pools
+from pyshelf.worker_pool import WorkerPool
+
+
+class MultipartUploader(object):
+    """
+        Uploads large artifacts using an S3 multipart upload.
+
+        Parts are read from the file one after another (a request body
+        cannot be read in parallel) and handed to a bounded pool of
+        workers which send them to S3 concurrently, each over its own
+        connection.  At most "concurrency" parts are in flight, so the
+        memory used per upload is roughly (concurrency + 1) * part_size.
+    """
+    # S3 refuses parts smaller than this, except for the last one.
+    MIN_PART_SIZE = 5 * 1024 * 1024
+    MAX_PART_COUNT = 10000
+
+    def __init__(self, logger, connection_pool=None, threshold=64 * 1024 * 1024,
+                 part_size=16 * 1024 * 1024, concurrency=4, copy_part_size=128 * 1024 * 1024):
+        """
+            Args:
+                logger(logging.Logger)
+                connection_pool(pyshelf.cloud.connection_pool.ConnectionPool|None)
+                threshold(int): Artifacts of this many bytes or more are uploaded
+                    (or copied) in parts.
+                part_size(int): Size in bytes of each part.
+                concurrency(int): The most parts uploaded at the same time.
+                copy_part_size(int): Size in bytes of each part when copying.
+                    Nothing passes through pyshelf so they can be a lot larger.
+        """
+        self.logger = logger
+        self.connection_pool = connection_pool
+        self.threshold = threshold
+        self.part_size = max(part_size, MultipartUploader.MIN_PART_SIZE)
+        self.copy_part_size = max(copy_part_size, MultipartUploader.MIN_PART_SIZE)
+        self.worker_pool = WorkerPool(concurrency)
+
+    def should_upload(self, size):
+        """
+            Args:
+                size(int|None): Size of the artifact in bytes if it is known.
+
+            Returns:
+                boolean: True if the artifact should be uploaded in parts.
+        """
+        return size is not None and size >= self.threshold
+
+    def upload(self, access_key, secret_key, bucket, key_name, fp, size=None, head="", headers=None):
+        """
+            Uploads the entire contents of fp.  If anything goes wrong the
+            multipart upload is aborted so that S3 does not hold onto
+            (and charge for) the parts that made it.
+
+            Args:
+                access_key(basestring): Credentials for the connections used
+                    to upload parts.
+                secret_key(basestring)
+                bucket(boto.s3.bucket.Bucket)
+                key_name(basestring)
+                fp(pyshelf.cloud.hashing_stream.HashingStream): What to upload.
+                size(int|None): Size of the artifact in bytes if it is known.
+                head(basestring): Bytes that were already read from fp.  They
+                    come first.
+                headers(dict|None): Sent when completing the upload, for
+                    instance If-None-Match.
+
+            Returns:
+                boto.s3.multipart.CompleteMultiPartUpload
+        """
+        part_size = self._get_part_size(self.part_size, size)
+        mp = bucket.initiate_multipart_upload(key_name)
+        self.logger.debug("Started multipart upload {0} of {1}".format(mp.id, key_name))
+
+        def upload_part(part):
+            part_num, data = part
+
+            def send(mp):
+                return mp.upload_part_from_file(StringIO(data), part_num)
+
+            return self._send_part(access_key, secret_key, bucket.name, key_name, mp.id, part_num, send)
+
+        return self._complete(bucket, key_name, mp, upload_part, self._read_parts(fp, part_size, head), headers)
+
+    def copy(self, access_key, secret_key, bucket, key_name, source_key, headers=None):
+        """
+            Copies an artifact in parts concurrently, all inside of S3.
+            This is the only way to copy artifacts larger than 5GB and
+            is a lot faster than a single copy for anything large.
+
+            Args:
+                access_key(basestring): Credentials for the connections used
+                    to copy parts.  They must be able to read source_key.
+                secret_key(basestring)
+                bucket(boto.s3.bucket.Bucket): Bucket to copy to.
+                key_name(basestring)
+                source_key(boto.s3.key.Key): Artifact to copy, which may be in
+                    another bucket.
+                headers(dict|None): Sent when completing the copy, for
+                    instance If-None-Match.
+
+            Returns:
+                boto.s3.multipart.CompleteMultiPartUpload
+        """
+        part_size = self._get_part_size(self.copy_part_size, source_key.size)
+        # Unlike a single copy the parts do not bring the content type
+        # (or any other metadata) along.
+        initiate_headers = None
+        if source_key.content_type:
+            initiate_headers = {"Content-Type": source_key.content_type}
+
+        mp = bucket.initiate_multipart_upload(key_name, initiate_headers, metadata=source_key.metadata)
+        self.logger.debug("Started multipart copy {0} of {1} to {2}".format(mp.id, source_key.name, key_name))
+        source_bucket_name = source_key.bucket.name
+
+        def copy_part(part):
+            part_num, start, end = part
+
+            def send(mp):
+                return mp.copy_part_from_key(source_bucket_name, source_key.name, part_num, start, end)
+
+            return self._send_part(access_key, secret_key, bucket.name, key_name, mp.id, part_num, send)
+
+        part_iter = self._get_ranges(source_key.size, part_size)
+        return self._complete(bucket, key_name, mp, copy_part, part_iter, headers)
+
+    def _get_part_size(self, part_size, size):
+        if size:
+            # S3 allows at most 10,000 parts.
+            max_count = MultipartUploader.MAX_PART_COUNT
+            part_size = max(part_size, (size + max_count - 1) // max_count)
+
+        return part_size
+
+    def _complete(self, bucket, key_name, mp, send_part, part_iter, headers):
+        """
+            Sends every part and completes the upload.  If anything goes
+            wrong it is aborted instead.
+
+            Args:
+                bucket(boto.s3.bucket.Bucket)
+                key_name(basestring)
+                mp(boto.s3.multipart.MultiPartUpload)
+                send_part(function): Given a part it sends it and returns
+                    its number and etag.
+                part_iter(iterable): Every part, in order.
+                headers(dict|None)
+
+            Returns:
+                boto.s3.multipart.CompleteMultiPartUpload
+        """
+        try:
+            part_list = self.worker_pool.map(send_part, part_iter)
+            result = bucket.complete_multipart_upload(key_name, mp.id, self._to_xml(part_list), headers)
+        except Exception:
+            self.logger.exception("Multipart upload {0} of {1} failed. Aborting.".format(mp.id, key_name))
+            mp.cancel_upload()
+            raise
+
+        self.logger.debug("Completed multipart upload {0} of {1} in {2} parts".format(
+            mp.id, key_name, len(part_list)))
+
+        return result
+
+    def _get_ranges(self, size, part_size):
+        """
+            Generator of the byte ranges (inclusive) of each part to copy.
+            An empty artifact is still one (empty) part.
+        """
+        if not size:
+            yield (1, None, None)
+            return
+
+        part_num = 1
+        for start in xrange(0, size, part_size):
+            yield (part_num, start, min(start + part_size, size) - 1)
+            part_num += 1
+
+    def _read_parts(self, fp, part_size, head=""):
+        """
+            Generator which reads one part at a time.  S3 requires at
+            least one part, even if it is empty, and every part but the
+            last must be a full part_size.
+        """
+        part_num = 1
+        while True:
+            if len(head) < part_size:
+                data = head + fp.read_fully(part_size - len(head))
+                head = ""
+            else:
+                data = head[:part_size]
+                head = head[part_size:]
+
+            if not data and part_num > 1:
+                break
+
+            yield (part_num, data)
+            if len(data) < part_size:
+                break
+
+            part_num += 1
+
+    def _send_part(self, access_key, secret_key, bucket_name, key_name, upload_id, part_num, send):
+        """
+            Sends a single part over a connection of its own.
+
+            Args:
+                send(function): Given the boto.s3.multipart.MultiPartUpload
+                    on that connection it sends the part and returns its key.
+
+            Returns:
+                tuple(int, basestring): The part number and its etag.
+        """
+        conn = connection_pools.acquire(self.connection_pool, access_key, secret_key)
+        try:
+            mp = MultiPartUpload(conn.get_bucket(bucket_name, validate=False))
+            mp.key_name = key_name
+            mp.id = upload_id
+            key = send(mp)
+        except Exception:
+            connection_pools.release(self.connection_pool, access_key, secret_key, conn, discard=True)
+            raise
+
+        connection_pools.release(self.connection_pool, access_key, secret_key, conn)
+        return (part_num, key.etag)
+
+    def _to_xml(self, part_list):
+        """
+            Builds the body for completing the upload from the etags S3
+            gave us, which saves listing the parts.
+
+            Args:
+                part_list(List(tuple(int, basestring)))
+
+            Returns:
+                basestring
+        """
+        xml = "<CompleteMultipartUpload>\n"
+        for part_num, etag in part_list:
+            xml += "  <Part>\n"
+            xml += "    <PartNumber>{0}</PartNumber>\n".format(part_num)
+            xml += "    <ETag>{0}</ETag>\n".format(escape(etag))
+            xml += "  </Part>\n"
+
+        xml += "</CompleteMultipartUpload>"
+        return xml
@@ -0,0 +1,86 @@
+from pyshelf import byte_range as byte_ranges
+from pyshelf.cloud import connection_pool as connection_pools
+from pyshelf.worker_pool import WorkerPool
+
+
+class ParallelDownloader(object):
+    """
+        Downloads large artifacts as many ranged GETs at the same time.
+        A single connection to S3 is only so fast, several of them can
+        fill the pipe.
+
+        Chunks are handed back in order.  At most "concurrency" chunks
+        are being downloaded or waiting to be sent, so the memory used
+        per download is roughly (concurrency + 1) * chunk_size.
+    """
+    def __init__(self, logger, connection_pool=None, threshold=256 * 1024 * 1024,
+                 chunk_size=8 * 1024 * 1024, concurrency=4):
+        """
+            Args:
+                logger(logging.Logger)
+                connection_pool(pyshelf.cloud.connection_pool.ConnectionPool|None)
+                threshold(int): Downloads of this many bytes or more are done
+                    in parallel.
+                chunk_size(int): Size in bytes of each ranged GET.
+                concurrency(int): The most chunks downloaded at the same time.
+        """
+        self.logger = logger
+        self.connection_pool = connection_pool
+        self.threshold = threshold
+        self.chunk_size = max(chunk_size, 1)
+        self.worker_pool = WorkerPool(concurrency)
+
+    def should_download(self, size):
+        """
+            Args:
+                size(int): Bytes that are going to be sent.
+
+            Returns:
+                boolean: True if they should be downloaded in parallel.
+        """
+        return size >= self.threshold
+
+    def download(self, access_key, secret_key, key, byte_range):
+        """
+            Generator of the chunks of byte_range, in order.  Closing it
+            early stops the chunks that have not been started.
+
+            Args:
+                access_key(basestring): Credentials for the connections used
+                    to download chunks.
+                secret_key(basestring)
+                key(boto.s3.key.Key): A key which has already been looked up.
+                byte_range(tuple(int, int)): Bytes (inclusive) to download.
+
+            Returns:
+                generator
+        """
+        start, end = byte_range
+        chunk_list = []
+        for chunk_start in xrange(start, end + 1, self.chunk_size):
+            chunk_list.append((chunk_start, min(chunk_start + self.chunk_size - 1, end)))
+
+        self.logger.debug("Downloading {0} in {1} chunks".format(key.name, len(chunk_list)))
+
+        def download_chunk(chunk):
+            return self._download_chunk(access_key, secret_key, key.bucket.name, key.name, chunk)
+
+        return self.worker_pool.imap(download_chunk, chunk_list)
+
+    def _download_chunk(self, access_key, secret_key, bucket_name, key_name, chunk):
+        """
+            Downloads a single chunk over a connection of its own.
+
+            Returns:
+                basestring
+        """
+        conn = connection_pools.acquire(self.connection_pool, access_key, secret_key)
+        try:
+            key = conn.get_bucket(bucket_name, validate=False).new_key(key_name)
+            data = key.get_contents_as_string(headers={"Range": byte_ranges.to_header(chunk)})
+        except Exception:
+            connection_pools.release(self.connection_pool, access_key, secret_key, conn, discard=True)
+            raise
+
+        connection_pools.release(self.connection_pool, access_key, secret_key, conn)
+        return data
@@ -0,0 +1,282 @@
+import itertools
+import sys
+import threading
+from collections import deque
+from Queue import Queue, Full
+from pyshelf.worker_pool import WorkerPool
+
+
+class PartitionedLister(object):
+    """
+        Lists everything under a prefix (recursively) a lot faster than a
+        single listing can for buckets with millions of keys.  A single
+        listing can only ask S3 for one page after another.
+
+        The directories "depth" levels down are found with "/" delimited
+        listings and each one (a partition) is then listed recursively
+        on a connection of its own, up to "concurrency" pages being asked
+        for at the same time.  The keys are still yielded in the same
+        (lexical) order a single listing would have: everything under a
+        directory sorts right where the directory itself does.
+
+        At most "window" partitions are listed ahead of the one being
+        yielded, and each only gets a few pages ahead of it, so nothing
+        more than that is held in memory however large a partition is.
+        A partition which turns out to be more than a page is split into
+        the directories in it (if it has few enough entries of its own
+        to find them with a single page) so that those are listed at the
+        same time as well.
+    """
+    PAGE_SIZE = 1000
+    # How many pages of a partition are listed ahead of the one being yielded.
+    QUEUED_PAGES = 2
+
+    def __init__(self, create_storage, concurrency=8, depth=1, window=None):
+        """
+            Args:
+                create_storage(function): Creates a (not yet connected)
+                    pyshelf.cloud.base_storage.BaseStorage of the bucket.
+                concurrency(int): The most listings made at the same time.
+                depth(int): How many levels of directories to split into
+                    partitions.  More levels mean smaller partitions but more
+                    listings to find them.
+                window(int|None): Defaults to twice the concurrency.
+        """
+        self.create_storage = create_storage
+        self.worker_pool = WorkerPool(concurrency)
+        self.depth = max(depth, 1)
+        self.window = window or self.worker_pool.size * 2
+
+    def iter_keys(self, prefix="", skip=None):
+        """
+            Generator of every key under prefix, in lexical order.  Just
+            like a recursive iter_directory_contents.
+
+            Args:
+                prefix(basestring): Directory to list, ending in a "/" (or ""
+                    for the whole bucket).
+                skip(function|None): Given the name of a directory (ending in
+                    a "/") it returns True if nothing under it is wanted, so it
+                    is not listed as a partition of its own.  What is in it can
+                    still be listed along with the directory it is in, if that
+                    is too large to split, so it must be filtered out as well.
+
+            Returns:
+                generator of boto.s3.key.Key (or whatever the backend has)
+        """
+        entry_list = self._find_partitions(prefix, skip, self.depth)
+        # Only held while a page is asked for, never while waiting for room
+        # in a queue, so the partition being yielded always gets its turn.
+        semaphore = threading.Semaphore(self.worker_pool.size)
+        return self._iter_entries(entry_list, skip, semaphore)
+
+    def _find_partitions(self, prefix, skip, depth):
+        """
+            Returns:
+                List(boto.s3.key.Key|pyshelf.cloud.partitioned_lister._Partition):
+                    Keys found along the way and the directories to list
+                    recursively, sorted by name.
+        """
+        entry_list = []
+        directory_list = [prefix]
+        for level in range(depth):
+            next_directory_list = []
+            listing_list = self.worker_pool.imap(self._list_level, directory_list)
+            for directory, listing in itertools.izip(directory_list, listing_list):
+                if listing is None:
+                    # Too much in it to split, so it is listed as a whole.
+                    entry_list.append(_Partition(directory))
+                    continue
+
+                key_list, name_list = self._sort_level(directory, listing, skip)
+                entry_list.extend(key_list)
+                next_directory_list.extend(name_list)
+
+            directory_list = next_directory_list
+
+        entry_list.extend(_Partition(name) for name in directory_list)
+        return sorted(entry_list, key=lambda entry: entry.name)
+
+    def _list_level(self, prefix):
+        """
+            Returns:
+                List|None: Everything directly in prefix, or None if that is
+                    more than a page.
+        """
+        with self.create_storage() as storage:
+            entry_list = list(itertools.islice(
+                storage.iter_directory_contents(prefix, False, page_size=PartitionedLister.PAGE_SIZE + 1),
+                PartitionedLister.PAGE_SIZE + 1))
+
+        if len(entry_list) > PartitionedLister.PAGE_SIZE:
+            return None
+
+        return entry_list
+
+    def _iter_entries(self, entry_list, skip, semaphore):
+        """
+            Generator of everything in entry_list (and the partitions in it)
+            in order.  The next "window" partitions are listed in the
+            background.
+        """
+        entry_iter = iter(entry_list)
+        reader_list = deque()
+        try:
+            while True:
+                while len(reader_list) < self.window:
+                    entry = next(entry_iter, None)
+                    if entry is None:
+                        break
+
+                    if isinstance(entry, _Partition):
+                        entry = _PartitionReader(self, entry.name, skip, semaphore)
+
+                    reader_list.append(entry)
+
+                if not reader_list:
+                    break
+
+                reader = reader_list.popleft()
+                if not isinstance(reader, _PartitionReader):
+                    yield reader
+                    continue
+
+                try:
+                    for key in reader.iter_keys():
+                        yield key
+                finally:
+                    reader.close()
+        finally:
+            for reader in reader_list:
+                if isinstance(reader, _PartitionReader):
+                    reader.close()
+
+    def _split(self, prefix, skip):
+        """
+            Returns:
+                List|None: The entries to list instead of prefix, or None if
+                    it cannot be split any further.
+        """
+        listing = self._list_level(prefix)
+        if listing is None:
+            return None
+
+        key_list, name_list = self._sort_level(prefix, listing, skip)
+        if not name_list:
+            return None
+
+        entry_list = key_list + [_Partition(name) for name in name_list]
+        return sorted(entry_list, key=lambda entry: entry.name)
+
+    def _sort_level(self, prefix, listing, skip):
+        """
+            Returns:
+                tuple(List, List(basestring)): The keys in a listing of prefix
+                    and the names of the directories in it to partition.
+        """
+        key_list = []
+        name_list = []
+        for entry in listing:
+            # A key named like the directory itself is not a directory in it.
+            if not entry.name.endswith("/") or entry.name == prefix:
+                key_list.append(entry)
+            elif not skip or not skip(entry.name):
+                name_list.append(entry.name)
+
+        return (key_list, name_list)
+
+
+class _Partition(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class _PartitionReader(object):
+    """
+        Lists a partition in a thread of its own and hands over its keys a
+        page at a time through a queue which only has room for a few.
+    """
+    # How often a reader waiting for room checks whether it was closed.
+    POLL_INTERVAL = 1
+
+    def __init__(self, lister, name, skip, semaphore):
+        self.lister = lister
+        self.name = name
+        self.skip = skip
+        self.semaphore = semaphore
+        self.queue = Queue(PartitionedLister.QUEUED_PAGES)
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def iter_keys(self):
+        """
+            Generator of every key in the partition.
+
+            Raises:
+                Whatever listing it raised.
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            if isinstance(item, _Split):
+                for key in self.lister._iter_entries(item.entry_list, self.skip, self.semaphore):
+                    yield key
+
+                return
+
+            if isinstance(item, tuple):
+                raise item[0], item[1], item[2]
+
+            for key in item:
+                yield key
+
+    def close(self):
+        """
+            Stops listing, if it is not done already.
+        """
+        self.closed.set()
+
+    def _run(self):
+        try:
+            with self.lister.create_storage() as storage:
+                key_iter = storage.iter_directory_contents(self.name, True, page_size=PartitionedLister.PAGE_SIZE)
+                is_first = True
+                while not self.closed.is_set():
+                    with self.semaphore:
+                        page = list(itertools.islice(key_iter, PartitionedLister.PAGE_SIZE))
+                        entry_list = None
+                        if is_first and len(page) == PartitionedLister.PAGE_SIZE:
+                            # It is listed faster if split into what is in it.
+                            entry_list = self.lister._split(self.name, self.skip)
+
+                    if entry_list is not None:
+                        self._put(_Split(entry_list))
+                        return
+
+                    is_first = False
+                    if page:
+                        self._put(page)
+
+                    if len(page) < PartitionedLister.PAGE_SIZE:
+                        break
+
+            self._put(None)
+        except Exception:
+            self._put(sys.exc_info())
+
+    def _put(self, item):
+        while not self.closed.is_set():
+            try:
+                self.queue.put(item, timeout=_PartitionReader.POLL_INTERVAL)
+                return
+            except Full:
+                pass
+
+
+class _Split(object):
+    def __init__(self, entry_list):
+        self.entry_list = entry_list
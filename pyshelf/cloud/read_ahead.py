@@ -0,0 +1,102 @@
+import sys
+import threading
+from Queue import Queue, Empty, Full
+
+
+class ReadAhead(object):
+    """
+        Reads a download on a worker of its own so that the next chunks
+        are already coming from S3 while the current one is being sent
+        to the client.  Otherwise every read waits on the network and
+        every write waits on the client, one after the other.
+
+        At most "depth" chunks are read ahead so the memory used per
+        download is roughly (depth + 1) * chunk_size.  Like the
+        pyshelf.worker_pool.WorkerPool the worker is a thread, which is
+        a greenlet under gunicorn's gevent workers.
+    """
+    # How often a blocked worker checks if the download was stopped.
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, chunk_size=64 * 1024, depth=4):
+        """
+            Args:
+                chunk_size(int): Bytes read at a time.  Larger chunks mean
+                    fewer reads (and strings) per download.
+                depth(int): The most chunks read ahead.  0 reads each chunk
+                    only once it is asked for.
+        """
+        self.chunk_size = max(chunk_size, 1)
+        self.depth = max(depth, 0)
+
+    def iter_chunks(self, read):
+        """
+            Generator of the chunks of a download, in order.  Closing it
+            early stops the reading.
+
+            Args:
+                read(function): Given the most bytes to return it returns the
+                    next chunk of the download, or "" once it is done.
+
+            Returns:
+                generator
+        """
+        if not self.depth:
+            return self._read_chunks(read)
+
+        return self._read_ahead(read)
+
+    def _read_chunks(self, read):
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return
+
+            yield chunk
+
+    def _read_ahead(self, read):
+        chunk_queue = Queue(self.depth)
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    chunk_queue.put(item, timeout=ReadAhead.POLL_INTERVAL)
+                    return True
+                except Full:
+                    pass
+
+            return False
+
+        def work():
+            try:
+                for chunk in self._read_chunks(read):
+                    if not put((True, chunk)):
+                        return
+            except Exception:
+                put((False, sys.exc_info()))
+                return
+
+            put((True, None))
+
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                success, value = chunk_queue.get()
+                if not success:
+                    raise value[0], value[1], value[2]
+
+                if value is None:
+                    return
+
+                yield value
+        finally:
+            stopped.set()
+            # Makes room in case the worker is waiting to put a chunk.
+            try:
+                chunk_queue.get_nowait()
+            except Empty:
+                pass
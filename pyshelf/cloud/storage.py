@@ -1,26 +1,94 @@
+import os
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
-from pyshelf.cloud.stream_iterator import StreamIterator
-from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, BucketNotFoundError, DuplicateArtifactError
+from boto.exception import S3ResponseError
+from pyshelf.cloud import connection_pool as connection_pools
+from pyshelf.cloud.base_storage import BaseStorage
+from pyshelf.cloud.hashing_stream import HashingStream
+from pyshelf.cloud.stream_iterator import StreamIterator, MultiRangeIterator, FileStreamIterator, \
+    ParallelStreamIterator
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, BucketNotFoundError, CopyNotSupportedError, \
+    DuplicateArtifactError
 
 
-class Storage(object):
-    def __init__(self, access_key, secret_key, bucket_name, logger):
+class Storage(BaseStorage):
+    """
+        Stores artifacts in S3.
+    """
+    def __init__(self, access_key, secret_key, bucket_name, logger, connection_pool=None, bucket_cache=None,
+                 multipart_uploader=None, disk_cache=None, parallel_downloader=None, conditional_writes=False,
+                 key_cache=None, read_ahead=None, call_runner=None):
+        """
+            Args:
+                access_key(basestring)
+                secret_key(basestring)
+                bucket_name(basestring)
+                logger(logging.Logger)
+                connection_pool(pyshelf.cloud.connection_pool.ConnectionPool|None): If
+                    provided connections are leased from the pool instead of
+                    being created for every "with" block.
+                bucket_cache(pyshelf.cloud.bucket_cache.BucketCache|None): If
+                    provided the bucket is not looked up for every operation.
+                multipart_uploader(pyshelf.cloud.multipart_uploader.MultipartUploader|None):
+                    If provided large artifacts are uploaded in parts.
+                disk_cache(pyshelf.cloud.disk_cache.DiskCache|None): If provided
+                    artifacts are read through a cache on local disk.
+                parallel_downloader(pyshelf.cloud.parallel_downloader.ParallelDownloader|None):
+                    If provided large artifacts are downloaded in parallel.
+                conditional_writes(boolean): If True S3 is trusted to refuse
+                    overwriting an artifact (If-None-Match) so it does not have
+                    to be looked for before every upload.
+                key_cache(pyshelf.cloud.key_cache.KeyCache|None): If provided
+                    artifacts which were looked up recently are not looked up
+                    again.
+                read_ahead(pyshelf.cloud.read_ahead.ReadAhead|None): If provided
+                    downloads are read ahead of the client.
+                call_runner(pyshelf.cloud.call_runner.CallRunner|None): If
+                    provided the lookups (and the start of downloads) a request
+                    waits on are made through it, so they time out, are
+                    retried and are hedged.
+        """
         self.access_key = access_key
         self.secret_key = secret_key
         self.bucket_name = bucket_name
         self.logger = logger
+        self.connection_pool = connection_pool
+        self.bucket_cache = bucket_cache
+        self.multipart_uploader = multipart_uploader
+        self.disk_cache = disk_cache
+        self.parallel_downloader = parallel_downloader
+        self.conditional_writes = conditional_writes
+        self.key_cache = key_cache
+        self.read_ahead = read_ahead
+        self.call_runner = call_runner
         self.key_map = {}
 
     def connect(self):
-        self.logger.debug("Attempting to establish connection")
-        self.conn = S3Connection(self.access_key, self.secret_key)
+        if self.connection_pool:
+            self.logger.debug("Leasing connection from pool")
+            self.conn = self.connection_pool.acquire(self.access_key, self.secret_key)
+        else:
+            self.logger.debug("Attempting to establish connection")
+            self.conn = S3Connection(self.access_key, self.secret_key)
 
-    def close(self):
-        self.logger.debug("Closing connection")
-        self.conn.close()
+    def close(self, discard=False):
+        """
+            Args:
+                discard(boolean): If True a pooled connection will not be
+                    reused.
+        """
+        if self.connection_pool:
+            if discard:
+                self.logger.debug("Discarding pooled connection")
+                self.connection_pool.discard(self.conn)
+            else:
+                self.logger.debug("Returning connection to pool")
+                self.connection_pool.release(self.access_key, self.secret_key, self.conn)
+        else:
+            self.logger.debug("Closing connection")
+            self.conn.close()
 
-    def get_artifact(self, artifact_name):
+    def get_artifact(self, artifact_name, byte_range_list=None, key=None):
         """
             Returns an object that can be used as a generator.
             This should be used when streaming large files
@@ -31,35 +99,223 @@ class Storage(object):
             Args:
                 artifactName(string): Full path to an object that you wish
                     to download.
+                byte_range_list(List(tuple(int, int))|None): If provided only
+                    these ranges of bytes (inclusive) are streamed.  See
+                    pyshelf.byte_range.
+                key(boto.s3.key.Key|None): If the artifact was already looked
+                    up (by get_key) it is not looked up again.
 
             Returns:
                 pyshelf.cloud.stream_iterator.StreamIterator: A object that
                     implements a generator interface so can be passed
                     directly into a response so long as the framework supports it.
         """
+        if key:
+            # It may have been looked up by another storage, whose
+            # connection could already be in use again.
+            key.bucket = self._get_bucket(self.bucket_name)
+            self.key_map[artifact_name] = key
+
         key = self._get_key(artifact_name)
         self.logger.debug(
             "Creating instance of pyshelf.cloud.stream_iterator.StreamIterator. Artifact {0}".format(artifact_name))
-        stream = StreamIterator(key)
-        return stream
+        if byte_range_list and len(byte_range_list) > 1:
+            return MultiRangeIterator(key, byte_range_list)
+
+        byte_range = None
+        if byte_range_list:
+            byte_range = byte_range_list[0]
+
+        create_cache_writer = None
+        if self.disk_cache:
+            fp = self.disk_cache.open(self.bucket_name, key.name, key.etag)
+            if fp:
+                return FileStreamIterator(key, fp, byte_range)
+
+            # Only a complete download can fill the cache.
+            if not byte_range:
+                def create_cache_writer():
+                    return self.disk_cache.create_writer(self.bucket_name, key.name, key.etag, key.size)
+
+        size = key.size
+        if byte_range:
+            size = byte_range[1] - byte_range[0] + 1
+
+        if self.parallel_downloader and self.parallel_downloader.should_download(size):
+            def download(byte_range):
+                return self.parallel_downloader.download(self.access_key, self.secret_key, key, byte_range)
+
+            return ParallelStreamIterator(key, download, byte_range, create_cache_writer)
+
+        return StreamIterator(key, byte_range, create_cache_writer, self.read_ahead, self._open_key)
+
+    def get_key(self, artifact_name):
+        """
+            Gets information about an artifact (size, etag, etc)
+            without downloading it.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+
+            Returns:
+                boto.s3.key.Key
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+        """
+        return self._get_key(artifact_name)
+
+    def get_download_url(self, artifact_name, expires_in):
+        """
+            Creates a presigned URL for the artifact.  It is signed
+            locally so S3 is not asked for anything.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+                expires_in(int): Seconds the URL works for.
+
+            Returns:
+                string
+        """
+        return self.conn.generate_url(expires_in, "GET", bucket=self.bucket_name, key=artifact_name)
+
+    def get_upload_url(self, artifact_name, expires_in):
+        """
+            Creates a presigned URL to PUT the artifact to.  It is signed
+            locally so S3 is not asked for anything.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+                expires_in(int): Seconds the URL works for.
 
-    def upload_artifact(self, artifact_name, file_storage):
+            Returns:
+                string
+        """
+        return self.conn.generate_url(expires_in, "PUT", bucket=self.bucket_name, key=artifact_name)
+
+    def upload_artifact(self, artifact_name, fp, size=None):
         """
             Uploads an artifact. If directory does not exist in path it will be created.
+            Artifacts large enough are uploaded in parts concurrently.
+
+            fp is read exactly once.  It is hashed as it is read, so the
+            body of a request can be streamed straight through.  Only up
+            to the multipart threshold is ever held in memory.
 
             Args:
                 artifact_name(string): Full path to upload artifact to.
-                file_storage(werkzeug.datastructures.FileStorage): File to be uploaded.
+                fp(file): File like object to be uploaded, for instance a
+                    werkzeug.datastructures.FileStorage or the request stream.
+                size(int|None): Size of the artifact in bytes if it is known.
 
+            Returns:
+                pyshelf.cloud.hashing_stream.HashingStream: Holds the hashes of
+                    what was uploaded.
         """
         bucket = self._get_bucket(self.bucket_name)
-
-        if bucket.get_key(artifact_name) is not None:
+        headers = None
+        if self.conditional_writes:
+            headers = {"If-None-Match": "*"}
+        elif bucket.get_key(artifact_name) is not None:
             raise DuplicateArtifactError(artifact_name)
 
         key = Key(bucket, artifact_name)
         self.logger.debug("Commencing upload of {0}".format(artifact_name))
-        key.set_contents_from_file(file_storage)
+        if size is None:
+            size = self._get_size(fp)
+
+        stream = HashingStream(fp)
+        try:
+            if not self.multipart_uploader:
+                self._upload_from_string(key, stream, stream.read(), headers)
+            elif self.multipart_uploader.should_upload(size):
+                self._upload_in_parts(bucket, artifact_name, stream, size, headers)
+            else:
+                # Reading up to the threshold tells us if an artifact of
+                # unknown size needs to be uploaded in parts.
+                head = stream.read_fully(self.multipart_uploader.threshold)
+                if self.multipart_uploader.should_upload(len(head)):
+                    self._upload_in_parts(bucket, artifact_name, stream, size, headers, head)
+                else:
+                    self._upload_from_string(key, stream, head, headers)
+        except S3ResponseError as e:
+            # 412 means it already exists, 409 that someone else is
+            # uploading it right now.
+            if self.conditional_writes and e.status in (409, 412):
+                raise DuplicateArtifactError(artifact_name)
+
+            self._raise_bucket_error(e)
+        finally:
+            self._forget_key(artifact_name)
+
+        return stream
+
+    def copy_artifact(self, source_name, artifact_name, source=None):
+        """
+            Copies an artifact inside of S3, possibly from another bucket.
+            Artifacts large enough are copied in parts concurrently.
+
+            The credentials of this bucket are used for the copy so they
+            must be able to read the source bucket.
+
+            Args:
+                source_name(string): Full path to the artifact to copy.
+                artifact_name(string): Full path to copy it to.
+                source(pyshelf.cloud.storage.Storage|None): Storage of the
+                    bucket to copy from, if it is not this one.  It must be
+                    connected.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+                pyshelf.cloud.cloud_exceptions.DuplicateArtifactError
+                pyshelf.cloud.cloud_exceptions.CopyNotSupportedError
+        """
+        source = source or self
+        if not isinstance(source, Storage):
+            raise CopyNotSupportedError(source.bucket_name, self.bucket_name)
+
+        bucket = self._get_bucket(self.bucket_name)
+        if bucket.get_key(artifact_name) is not None:
+            raise DuplicateArtifactError(artifact_name)
+
+        # A copy in parts can still be refused if the artifact shows up
+        # while it is being copied, just like an upload.
+        headers = None
+        if self.conditional_writes:
+            headers = {"If-None-Match": "*"}
+
+        try:
+            if self.multipart_uploader:
+                # Only its size is needed to decide how to copy it.
+                source_key = source.get_key(source_name)
+                if self.multipart_uploader.should_upload(source_key.size):
+                    self.multipart_uploader.copy(self.access_key, self.secret_key, bucket, artifact_name, source_key,
+                                                 headers)
+                    return
+
+            bucket.copy_key(artifact_name, source.bucket_name, source_name)
+        except S3ResponseError as e:
+            if e.status == 404 and e.error_code == "NoSuchKey":
+                raise ArtifactNotFoundError(source_name)
+
+            if self.conditional_writes and e.status in (409, 412):
+                raise DuplicateArtifactError(artifact_name)
+
+            self._raise_bucket_error(e)
+        finally:
+            self._forget_key(artifact_name)
+
+    def delete_artifact(self, artifact_name):
+        """
+            S3 does not say if there was anything to delete so this never
+            raises ArtifactNotFoundError.
+
+            Args:
+                artifact_name(string): Full path to the artifact.
+        """
+        bucket = self._get_bucket(self.bucket_name)
+        bucket.delete_key(artifact_name)
+        self._forget_key(artifact_name)
 
     def get_artifact_as_string(self, path):
         """
@@ -72,7 +328,16 @@ class Storage(object):
                 path(string): The path to the artifact you want to get.
         """
         key = self._get_key(path)
-        return key.get_contents_as_string()
+        try:
+            if not self.call_runner:
+                return key.get_contents_as_string()
+
+            def get(conn):
+                return conn.get_bucket(self.bucket_name, validate=False).new_key(key.name).get_contents_as_string()
+
+            return self._call("GET", get, hedge=True)
+        except S3ResponseError as e:
+            self._raise_key_error(e, path)
 
     def set_artifact_from_string(self, path, data):
         """
@@ -82,76 +347,319 @@ class Storage(object):
                 path(string): The path to the artifact to update/create.
                 data(string): Data to set contents of artifact from.
         """
-        try:
-            key = self._get_key(path)
-        except ArtifactNotFoundError:
-            bucket = self._get_bucket(self.bucket_name)
-            key = Key(bucket, path)
+        # Writing replaces whatever is there so there is no need to
+        # look for it first.
+        key = self.key_map.get(path)
+        if key is None:
+            key = Key(self._get_bucket(self.bucket_name), path)
+
         key.set_contents_from_string(data)
+        if self.key_cache:
+            self.key_cache.invalidate(self.bucket_name, path)
 
-    def get_etag(self, path):
+    def iter_directory_contents(self, path, recursive, cursor=None, page_size=None):
         """
-            Gets md5Hash of file.
+            Generator of the contents of a directory.  S3 is only asked for
+            the next page once the previous one has been gone through so
+            nothing more than a page is held onto.
 
             Args:
-                path(string): The path to the artifact.
+                path(string): The path of the directory.
+                recursive(boolean):
+                cursor(string|None): Only what comes after this (the name of
+                    a key or a directory) is listed.
+                page_size(int|None): How many entries to get from S3 at once.
 
             Returns:
-                string: md5Hash of artifact.
+                generator of s3.boto.key.Key (or s3.boto.prefix.Prefix for
+                    directories when not recursive)
         """
-        key = self._get_key(path)
-        return key.etag[1:-1]
+        if path == "/":
+            path = ""
+
+        delimiter = ""
+        if not recursive:
+            delimiter = "/"
+
+        def list_page(bucket):
+            return bucket.get_all_keys(
+                prefix=path,
+                delimiter=delimiter,
+                marker=marker,
+                max_keys=page_size or Storage.PAGE_SIZE
+            )
+
+        bucket = self._get_bucket(self.bucket_name)
+        marker = cursor or ""
+        while True:
+            try:
+                if self.call_runner:
+                    result_list = self._call(
+                        "LIST", lambda conn: list_page(conn.get_bucket(self.bucket_name, validate=False)), hedge=True)
+                    for entry in result_list:
+                        # The connection it was listed with is already back
+                        # in the pool.
+                        entry.bucket = bucket
+                else:
+                    result_list = list_page(bucket)
+            except S3ResponseError as e:
+                self._raise_bucket_error(e)
+
+            for key in result_list:
+                yield key
+
+            if not result_list.is_truncated or not len(result_list):
+                break
+
+            # S3 only includes the next marker when there is a delimiter.
+            marker = result_list.next_marker or result_list[-1].name
 
-    def get_directory_contents(self, path, recursive):
+    def _upload_from_string(self, key, stream, data, headers=None):
         """
-            Gets the contents of a directory.
+            Uploads in a single request.  Boto would otherwise read the
+            data again to find its md5.
 
             Args:
-                path(string): The path of the directory.
-                recursive(boolean):
+                key(boto.s3.key.Key)
+                stream(pyshelf.cloud.hashing_stream.HashingStream): What data was read from.
+                data(basestring): Everything there was to read.
+                headers(dict|None)
+        """
+        key.set_contents_from_string(data, headers=headers, md5=key.get_md5_from_hexdigest(stream.md5))
 
-            Returns:
-                list of s3.boto.key.Key
+    def _upload_in_parts(self, bucket, artifact_name, stream, size, headers=None, head=""):
+        if headers and bucket.get_key(artifact_name) is not None:
+            # S3 would only refuse once every part was uploaded.  One
+            # more request is nothing next to that.
+            raise DuplicateArtifactError(artifact_name)
+
+        self.multipart_uploader.upload(
+            self.access_key,
+            self.secret_key,
+            bucket,
+            artifact_name,
+            stream,
+            size,
+            head,
+            headers
+        )
+
+    def _get_size(self, fp):
         """
-        if path == "/":
-            path = ""
+            Args:
+                fp(file)
 
-        if recursive:
-            result_list = self._get_bucket(self.bucket_name).list(prefix=path)
-        else:
-            result_list = self._get_bucket(self.bucket_name).list(prefix=path, delimiter="/")
+            Returns:
+                int|None: Bytes left to read from fp, if that can be found out.
+        """
+        try:
+            position = fp.tell()
+            fp.seek(0, os.SEEK_END)
+            size = fp.tell() - position
+            fp.seek(position)
+        except (AttributeError, IOError):
+            size = None
 
-        keys = list(result_list)
-        return keys
+        return size
 
     def _get_key(self, artifact_name):
         if artifact_name in self.key_map:
             return self.key_map[artifact_name]
 
         bucket = self._get_bucket(self.bucket_name)
-        self.logger.debug("Attempting to get artifact {0}".format(artifact_name))
-        key = bucket.get_key(artifact_name)
-        if key is None:
-            self.logger.error("Artifact {0} does not exist in bucket {0}".format(artifact_name, self.bucket_name))
-            raise ArtifactNotFoundError(artifact_name)
+        cached_key = self.key_cache and self.key_cache.get(self.bucket_name, artifact_name)
+        if cached_key:
+            # Nothing is requested until it is downloaded.
+            key = bucket.new_key(artifact_name)
+            key.size = cached_key.size
+            key.etag = cached_key.etag
+            key.last_modified = cached_key.last_modified
+            key.content_type = cached_key.content_type
+        else:
+            self.logger.debug("Attempting to get artifact {0}".format(artifact_name))
+            if self.call_runner:
+                def head(conn):
+                    return conn.get_bucket(self.bucket_name, validate=False).get_key(artifact_name)
+
+                key = self._call("HEAD", head, hedge=True)
+                if key:
+                    # The connection it was looked up with is already back
+                    # in the pool.
+                    key.bucket = bucket
+            else:
+                key = bucket.get_key(artifact_name)
+
+            if key is None:
+                self.logger.error("Artifact {0} does not exist in bucket {0}".format(artifact_name, self.bucket_name))
+                raise ArtifactNotFoundError(artifact_name)
+
+            if self.key_cache:
+                self.key_cache.add(self.bucket_name, key)
 
         self.key_map[artifact_name] = key
         return key
 
+    def _forget_key(self, artifact_name):
+        """
+            Called after anything is written to (or deleted from)
+            artifact_name, so it is looked up again the next time.
+        """
+        self.key_map.pop(artifact_name, None)
+        if self.key_cache:
+            self.key_cache.invalidate(self.bucket_name, artifact_name)
+
     def _get_bucket(self, bucket_name):
+        if self.bucket_cache and self.bucket_cache.exists(self.access_key, bucket_name):
+            # Does not make a request since we already know it exists.
+            return self.conn.get_bucket(bucket_name, validate=False)
+
         self.logger.debug("Attempting to get bucket {0}".format(bucket_name))
-        bucket = self.conn.lookup(self.bucket_name)
+        if self.call_runner:
+            bucket = None
+            if self._call("HEAD bucket", lambda conn: conn.lookup(bucket_name) is not None):
+                bucket = self.conn.get_bucket(bucket_name, validate=False)
+        else:
+            bucket = self.conn.lookup(self.bucket_name)
+
         if bucket is None:
             self.logger.error("Bucket {0} does not exist".format(bucket_name))
+            if self.bucket_cache:
+                self.bucket_cache.invalidate(self.access_key, bucket_name)
             raise BucketNotFoundError(bucket_name)
+
+        if self.bucket_cache:
+            self.bucket_cache.add(self.access_key, bucket_name)
+
         return bucket
 
-    def __enter__(self):
-        """ For use in "with" syntax"""
-        self.connect()
-        return self
+    def _call(self, name, func, hedge=False):
+        """
+            Makes a call through the call runner on a connection of its own.
+
+            Args:
+                name(basestring): Kind of call, see
+                    pyshelf.cloud.call_runner.CallRunner.call.
+                func(function): Given the connection it makes the call.
+                hedge(boolean)
+
+            Returns:
+                Whatever func returned.
+        """
+        def attempt():
+            conn = self._acquire()
+            try:
+                result = func(conn)
+            except Exception:
+                self._release(conn, discard=True)
+                raise
+
+            self._release(conn)
+            return result
+
+        return self.call_runner.call(name, attempt, hedge=hedge)
+
+    def _open_key(self, key, headers):
+        """
+            Starts the download of an artifact through the call runner.
+            The download gets a connection of its own which it keeps until
+            it is done.
+
+            Args:
+                key(boto.s3.key.Key): A key which has already been looked up.
+                headers(dict|None): Sent with the GET.
+
+            Returns:
+                tuple(boto.s3.key.Key, function|None): The opened key and a
+                    function to call once done with it, with True if it was
+                    read to the end.
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError: If the
+                    artifact was deleted since it was looked up (or cached).
+        """
+        if not self.call_runner:
+            try:
+                key.open_read(headers=headers)
+            except S3ResponseError as e:
+                self._raise_key_error(e, key.name)
+
+            return key, None
+
+        def attempt():
+            conn = self._acquire()
+            try:
+                opened_key = conn.get_bucket(self.bucket_name, validate=False).new_key(key.name)
+                opened_key.open_read(headers=headers)
+            except Exception:
+                self._release(conn, discard=True)
+                raise
+
+            return opened_key, conn
+
+        def discard(opened):
+            opened_key, conn = opened
+            opened_key.close(fast=True)
+            self._release(conn, discard=True)
+
+        try:
+            opened_key, conn = self.call_runner.call("GET", attempt, discard, hedge=True)
+        except S3ResponseError as e:
+            self._raise_key_error(e, key.name)
+
+        def done(finished):
+            if not finished:
+                # The rest of the response would have to be read before the
+                # connection could be used again.
+                opened_key.close(fast=True)
+
+            self._release(conn, discard=not finished)
+
+        return opened_key, done
+
+    def _acquire(self):
+        return connection_pools.acquire(self.connection_pool, self.access_key, self.secret_key)
+
+    def _release(self, conn, discard=False):
+        connection_pools.release(self.connection_pool, self.access_key, self.secret_key, conn, discard)
+
+    def _raise_key_error(self, error, artifact_name):
+        """
+            Turns a 404 for an artifact into an ArtifactNotFoundError and
+            forgets it.  Anything else goes on to _raise_bucket_error.
+
+            Args:
+                error(boto.exception.S3ResponseError)
+                artifact_name(string)
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.ArtifactNotFoundError
+                pyshelf.cloud.cloud_exceptions.BucketNotFoundError
+                boto.exception.S3ResponseError
+        """
+        if error.status == 404 and error.error_code != "NoSuchBucket":
+            self.logger.error("Artifact {0} no longer exists in bucket {1}".format(artifact_name, self.bucket_name))
+            self._forget_key(artifact_name)
+            raise ArtifactNotFoundError(artifact_name)
+
+        self._raise_bucket_error(error)
+
+    def _raise_bucket_error(self, error):
+        """
+            A cached bucket may have been deleted since we last looked
+            it up.  S3 tells us so with a NoSuchBucket error which is
+            turned into a BucketNotFoundError.  Anything else is re-raised.
+
+            Args:
+                error(boto.exception.S3ResponseError)
+
+            Raises:
+                pyshelf.cloud.cloud_exceptions.BucketNotFoundError
+                boto.exception.S3ResponseError
+        """
+        if error.error_code == "NoSuchBucket":
+            self.logger.error("Bucket {0} does not exist".format(self.bucket_name))
+            if self.bucket_cache:
+                self.bucket_cache.invalidate(self.access_key, self.bucket_name)
+            raise BucketNotFoundError(self.bucket_name)
 
-    def __exit__(self, exception_type, exception, traceback):
-        """ For use in "with" syntax"""
-        self.close()
-        return False
+        raise
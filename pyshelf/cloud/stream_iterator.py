@@ -1,19 +1,323 @@
+from pyshelf import byte_range as byte_ranges
+
+
 class StreamIterator(object):
     """
         Just a wrapper for the boto.s3.key.Key generator
         functionality.  This is to provide a clean interface
         so that replacing boto in the future would be easier.
+
+        The download is not started until open is called (or the
+        first chunk is read) so that a request which can be answered
+        without the body (HEAD, 304) never opens it (or the disk cache).
     """
-    def __init__(self, key):
+    def __init__(self, key, byte_range=None, create_cache_writer=None, read_ahead=None, open_key=None):
+        """
+            Args:
+                key(boto.s3.key.Key): A key which has already been looked up.
+                byte_range(tuple(int, int)|None): If provided only these
+                    bytes (inclusive) are requested from the cloud.
+                create_cache_writer(function|None): If provided it is called
+                    once the download is opened and if it returns a
+                    pyshelf.cloud.disk_cache.CacheWriter everything streamed
+                    is also written to the disk cache.
+                read_ahead(pyshelf.cloud.read_ahead.ReadAhead|None): If
+                    provided it decides how the download is read.  Otherwise
+                    it is read in boto's (small) chunks as they are asked for.
+                open_key(function|None): Given the key and the headers to GET
+                    it with it starts the download and returns the opened key
+                    and a function (or None) to call once done with it (with
+                    True if it was read to the end).  Defaults to opening key
+                    itself.
+        """
         self.key = key
-        self.key.open_read()
+        self.byte_range = byte_range
+        self.create_cache_writer = create_cache_writer
+        self.cache_writer = None
+        self.read_ahead = read_ahead
+        self.open_key = open_key
+        self._opened = False
+        self._chunks = None
+        self._done = None
+
+    def open(self):
+        """
+            Starts the download.  Calling it more than once does nothing.
+        """
+        if not self._opened:
+            self._opened = True
+            headers = None
+            if self.byte_range:
+                headers = {"Range": byte_ranges.to_header(self.byte_range)}
+
+            if self.open_key:
+                self.key, self._done = self.open_key(self.key, headers)
+            else:
+                self.key.open_read(headers=headers)
+
+            if self.read_ahead:
+                self._chunks = self.read_ahead.iter_chunks(self.key.read)
+
+            self._open_cache_writer()
 
     def next(self):
+        self.open()
+        try:
+            chunk = self._next_chunk()
+        except StopIteration:
+            if self.cache_writer:
+                self.cache_writer.commit()
+                self.cache_writer = None
+
+            self._finish(True)
+            raise
+
+        if self.cache_writer:
+            self.cache_writer.write(chunk)
+
+        return chunk
+
+    def close(self):
+        """
+            Called once the response is finished, even if the client
+            went away part way through.
+        """
+        if self.cache_writer:
+            self.cache_writer.abort()
+            self.cache_writer = None
+
+        if self._chunks:
+            # Stops whatever has not been read yet.
+            self._chunks.close()
+
+        self._finish(False)
+
+    def _open_cache_writer(self):
+        if self.create_cache_writer:
+            self.cache_writer = self.create_cache_writer()
+
+    def _finish(self, finished):
+        if self._done:
+            done = self._done
+            self._done = None
+            done(finished)
+
+    def _next_chunk(self):
+        if self._chunks:
+            return next(self._chunks)
+
         return self.key.next()
 
     def __iter__(self):
         return self
 
+    @property
+    def is_partial(self):
+        """
+            Returns:
+                boolean: True if only part of the artifact is being streamed.
+        """
+        return self.byte_range is not None
+
+    @property
+    def content_type(self):
+        return self.key.content_type
+
+    @property
+    def content_range(self):
+        """
+            Returns:
+                basestring|None: Value of the Content-Range header if partial.
+        """
+        content_range = None
+        if self.byte_range:
+            content_range = byte_ranges.content_range(self.byte_range, self.key.size)
+
+        return content_range
+
+    @property
+    def content_length(self):
+        """
+            Returns:
+                int: Bytes which will be streamed.
+        """
+        if self.byte_range:
+            return self.byte_range[1] - self.byte_range[0] + 1
+
+        return self.key.size
+
+    @property
+    def etag(self):
+        """
+            Returns:
+                basestring: The quoted etag of the whole artifact.
+        """
+        return self.key.etag
+
+    @property
+    def last_modified(self):
+        """
+            Returns:
+                basestring: HTTP date the artifact was last modified.
+        """
+        return self.key.last_modified
+
     @property
     def headers(self):
         return dict(self.key.resp.getheaders())
+
+
+class ParallelStreamIterator(StreamIterator):
+    """
+        Streams a large artifact which is downloaded as several ranged
+        GETs at once.  See pyshelf.cloud.parallel_downloader.
+    """
+    def __init__(self, key, download, byte_range=None, create_cache_writer=None):
+        """
+            Args:
+                key(boto.s3.key.Key): A key which has already been looked up.
+                download(function): Given the byte range (inclusive) to
+                    download it returns a generator of its chunks, in order.
+                byte_range(tuple(int, int)|None): If provided only these
+                    bytes (inclusive) are streamed.
+                create_cache_writer(function|None): See StreamIterator.
+        """
+        super(ParallelStreamIterator, self).__init__(key, byte_range, create_cache_writer)
+        self.download = download
+
+    def open(self):
+        if not self._opened:
+            self._opened = True
+            self._chunks = self.download(self.byte_range or (0, self.key.size - 1))
+            self._open_cache_writer()
+
+
+class FileStreamIterator(StreamIterator):
+    """
+        Streams an artifact out of the disk cache.  The key is only
+        used for its metadata (etag, size, etc).
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, key, fp, byte_range=None):
+        """
+            Args:
+                key(boto.s3.key.Key): A key which has already been looked up.
+                fp(file): The cached artifact.
+                byte_range(tuple(int, int)|None): If provided only these
+                    bytes (inclusive) are streamed.
+        """
+        super(FileStreamIterator, self).__init__(key, byte_range)
+        self.fp = fp
+        self.remaining = None
+
+    def open(self):
+        if not self._opened:
+            self._opened = True
+            if self.byte_range:
+                self.fp.seek(self.byte_range[0])
+                self.remaining = self.byte_range[1] - self.byte_range[0] + 1
+
+    def next(self):
+        self.open()
+        size = FileStreamIterator.CHUNK_SIZE
+        if self.remaining is not None:
+            size = min(size, self.remaining)
+
+        chunk = self.fp.read(size) if size else ""
+        if not chunk:
+            self.close()
+            raise StopIteration
+
+        if self.remaining is not None:
+            self.remaining -= len(chunk)
+
+        return chunk
+
+    def close(self):
+        self.fp.close()
+
+    @property
+    def headers(self):
+        return {
+            "content-type": self.content_type
+        }
+
+
+class MultiRangeIterator(StreamIterator):
+    """
+        Streams several ranges of the same artifact as a
+        multipart/byteranges body.  Each range is its own ranged
+        GET which is only opened once the previous one is done.
+    """
+    BOUNDARY = "3d6b6a416f9b5e4c"
+
+    def __init__(self, key, byte_range_list, open_range=None):
+        """
+            Args:
+                key(boto.s3.key.Key): A key which has already been looked up.
+                byte_range_list(List(tuple(int, int)))
+                open_range(function|None): Given a byte range (inclusive) it
+                    returns an iterator of its bytes.  Defaults to a ranged
+                    GET from S3.
+        """
+        self.key = key
+        self.byte_range_list = byte_range_list
+        self.open_range = open_range or self._open_range
+        self._generator = self._generate()
+
+    def open(self):
+        pass
+
+    def next(self):
+        return next(self._generator)
+
+    def close(self):
+        self._generator.close()
+
+    @property
+    def is_partial(self):
+        return True
+
+    @property
+    def content_type(self):
+        return "multipart/byteranges; boundary={0}".format(MultiRangeIterator.BOUNDARY)
+
+    @property
+    def content_range(self):
+        # Each part has its own.
+        return None
+
+    @property
+    def content_length(self):
+        length = len("\r\n--{0}--\r\n".format(MultiRangeIterator.BOUNDARY))
+        for byte_range in self.byte_range_list:
+            length += len(self._part_header(byte_range)) + byte_range[1] - byte_range[0] + 1
+
+        return length
+
+    @property
+    def headers(self):
+        return {
+            "content-type": self.content_type
+        }
+
+    def _generate(self):
+        for byte_range in self.byte_range_list:
+            yield self._part_header(byte_range)
+            for chunk in self.open_range(byte_range):
+                yield chunk
+
+        yield "\r\n--{0}--\r\n".format(MultiRangeIterator.BOUNDARY)
+
+    def _open_range(self, byte_range):
+        # A key can only have one open response so each range
+        # gets its own.
+        range_key = self.key.bucket.new_key(self.key.name)
+        return StreamIterator(range_key, byte_range)
+
+    def _part_header(self, byte_range):
+        header = "\r\n--{0}\r\n".format(MultiRangeIterator.BOUNDARY)
+        header += "Content-Type: {0}\r\n".format(self.key.content_type)
+        header += "Content-Range: {0}\r\n\r\n".format(byte_ranges.content_range(byte_range, self.key.size))
+        return header
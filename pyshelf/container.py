@@ -1,6 +1,7 @@
 from uuid import uuid4
 from pyshelf.permissions_validator import PermissionsValidator
 from pyshelf.cloud.factory import Factory
+from pyshelf.cloud.call_budget import CallBudget
 from pyshelf.artifact_manager import ArtifactManager
 from pyshelf.search.container import Container as SearchContainer
 from pyshelf.search_portal import SearchPortal
@@ -44,6 +45,7 @@ class Container(object):
         self._metadata = None
         self._schema_validator = None
         self._path_converter = None
+        self._call_budget = None
 
     @property
     def logger(self):
@@ -77,8 +79,35 @@ class Container(object):
 
         return self._search
 
+    @property
+    def call_budget(self):
+        """
+            None unless s3Calls is configured, in which case the S3 calls
+            the request waits on are limited by it.
+        """
+        call_config = self.app.config.get("s3Calls")
+        if not self._call_budget and call_config is not None:
+            self._call_budget = CallBudget(call_config.get("requestBudget", 30))
+
+        return self._call_budget
+
     def create_bucket_storage(self):
-        return self.cloud_factory.create_storage(self.bucket_name)
+        return self.cloud_factory.create_storage(self.bucket_name, self.call_budget)
+
+    def create_resource_container(self, resource_url):
+        """
+            For requests which also reach into another resource, possibly
+            in another bucket (like _copy).  It shares the request, so the
+            same key is used, and the budget for waiting on S3.
+
+            param basestring resource_url
+        """
+        container = Container(self.app, self.request)
+        container.request_id = self.request_id
+        container._resource_identity = self.resource_identity_factory.from_resource_url(resource_url)
+        container.bucket_name = container._resource_identity.bucket_name
+        container._call_budget = self.call_budget
+        return container
 
     @property
     def link_mapper(self):
@@ -97,7 +126,12 @@ class Container(object):
     @property
     def context_response_mapper(self):
         if not self._context_response_mapper:
-            self._context_response_mapper = ContextResponseMapper(self.link_mapper, self._context)
+            self._context_response_mapper = ContextResponseMapper(
+                self.link_mapper,
+                self._context,
+                self.app.config.get("artifactCacheControl"),
+                self.request
+            )
 
         return self._context_response_mapper
 
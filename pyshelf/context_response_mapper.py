@@ -1,12 +1,30 @@
 from flask import Response
+from werkzeug.wsgi import wrap_file
 import json
-from pyshelf.cloud.stream_iterator import StreamIterator
+from pyshelf.cloud.stream_iterator import StreamIterator, FileStreamIterator
+from pyshelf.archive_iterator import ArchiveIterator
+from pyshelf.glob_iterator import GlobIterator
 
 
 class ContextResponseMapper(object):
-    def __init__(self, link_mapper, context):
+    # Artifacts can never be overwritten so they can be cached forever.
+    # It is private by default because every download requires
+    # authorization.
+    DEFAULT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+    def __init__(self, link_mapper, context, cache_control=None, request=None):
+        """
+            Args:
+                link_mapper(pyshelf.link_mapper.LinkMapper)
+                context(pyshelf.context.Context)
+                cache_control(basestring|None): Cache-Control header sent along
+                    with artifacts.
+                request(flask.Request|None): Needed to send files zero copy.
+        """
         self.link_mapper = link_mapper
         self.context = context
+        self.request = request
+        self.cache_control = cache_control or ContextResponseMapper.DEFAULT_CACHE_CONTROL
 
     def to_response(self, body=None, status_code=None):
         response = None
@@ -16,6 +34,27 @@ class ContextResponseMapper(object):
         # the Response with it.  I cannot "set_data" since that
         # is expected to be a string.
         if isinstance(body, StreamIterator):
+            # A 304 never sends the body so the stream is left unopened.
+            if status_code == 304:
+                body.close()
+                response = Response()
+            elif self.request and isinstance(body, FileStreamIterator) and not body.is_partial:
+                # Lets the server use sendfile if it can.
+                file_wrapper = wrap_file(self.request.environ, body.fp)
+                response = Response(file_wrapper, direct_passthrough=True)
+            else:
+                response = Response(body)
+
+            if status_code != 304:
+                # Otherwise the body is sent chunked, which some proxies
+                # buffer entirely before passing it on.
+                response.headers["Content-Length"] = str(body.content_length)
+
+            self.map_artifact_headers(response, body)
+        elif isinstance(body, ArchiveIterator):
+            response = Response(body)
+            response.headers["Content-Disposition"] = "attachment; filename=\"{0}\"".format(body.file_name)
+        elif isinstance(body, GlobIterator):
             response = Response(body)
         else:
             response = Response()
@@ -40,11 +79,28 @@ class ContextResponseMapper(object):
         content_type = None
         if isinstance(body, dict):
             content_type = "application/json"
-        elif isinstance(body, StreamIterator):
-            content_type = body.headers["content-type"]
+        elif isinstance(body, (StreamIterator, ArchiveIterator, GlobIterator)):
+            content_type = body.content_type
 
         return content_type
 
+    def map_artifact_headers(self, response, stream):
+        """
+            Adds the headers that describe the artifact being streamed.
+
+            Args:
+                response(flask.Response)
+                stream(pyshelf.cloud.stream_iterator.StreamIterator)
+        """
+        response.headers["Accept-Ranges"] = "bytes"
+        response.headers["ETag"] = stream.etag
+        response.headers["Cache-Control"] = self.cache_control
+        if stream.last_modified:
+            response.headers["Last-Modified"] = stream.last_modified
+
+        if stream.content_range:
+            response.headers["Content-Range"] = stream.content_range
+
     def map_links(self, response):
         link_list = self.link_mapper.to_response(self.context.link_list)
         for link in link_list:
@@ -8,3 +8,5 @@ class ErrorCode(object):
     BAD_REQUEST = "bad_request"
     PERMISSION_DENIED = "permission_denied"
     INVALID_REQUEST_DATA_FORMAT = "invalid_request_data_format"
+    RANGE_NOT_SATISFIABLE = "range_not_satisfiable"
+    GATEWAY_TIMEOUT = "gateway_timeout"
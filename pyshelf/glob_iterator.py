@@ -0,0 +1,200 @@
+import json
+import re
+from fnmatch import fnmatchcase
+from pyshelf import artifact_key_filter
+
+
+class GlobIterator(object):
+    """
+        Streams the paths of every artifact matching a glob pattern, for
+        instance builds/*/linux/*.tar.gz, as a JSON document which is
+        built as it is sent.
+
+        S3 is only listed where a match could be:
+
+        * Literal parts of the pattern are never listed, they are added
+          to the prefix.
+        * The literal start of a part with wildcards (like "v1." in
+          "v1.*") is part of the prefix too.
+        * Every part but the last is listed one level at a time (with a
+          "/" delimiter) so directories that do not match are never
+          listed at all.
+        * Only "**", which matches any number of directories, lists
+          everything under it.
+
+        Segments support the same wildcards as fnmatch ("*", "?" and
+        "[...]") but never match across a "/".
+    """
+    CONTENT_TYPE = "application/json"
+    RECURSIVE = "**"
+
+    def __init__(self, storage, path, segment_list, path_converter, can_read=None):
+        """
+            Args:
+                storage(pyshelf.cloud.base_storage.BaseStorage): Not yet
+                    connected.  The iterator connects it when opened and
+                    closes it once every match is sent.
+                path(basestring): The directory the pattern is relative to.
+                segment_list(List(basestring)): The pattern, from split_pattern.
+                path_converter(pyshelf.path_converter.PathConverter): Turns the
+                    matches into resource urls.
+                can_read(function|None): Given the path of an artifact (with a
+                    leading "/") it returns False if it must be left out.
+        """
+        self.storage = storage
+        self.prefix = path.strip("/")
+        if self.prefix:
+            self.prefix += "/"
+
+        self.segment_list = segment_list
+        self.path_converter = path_converter
+        self.can_read = can_read
+        self.content_type = GlobIterator.CONTENT_TYPE
+        self._chunks = None
+        self._connected = False
+
+    @staticmethod
+    def split_pattern(pattern):
+        """
+            Args:
+                pattern(basestring|None)
+
+            Returns:
+                List(basestring)|None: Each part of the pattern.  None if it
+                    is not a valid pattern.
+        """
+        if not pattern:
+            return None
+
+        segment_list = pattern.strip("/").split("/")
+        for segment in segment_list:
+            if segment in ("", ".", "..") or (GlobIterator.RECURSIVE in segment and segment != GlobIterator.RECURSIVE):
+                return None
+
+        return segment_list
+
+    def open(self):
+        """
+            Connects to storage and finds the first match, so that an
+            error is returned as such rather than cutting the body short.
+            Calling it more than once does nothing.
+        """
+        if self._chunks is None:
+            self.storage.connect()
+            self._connected = True
+            try:
+                name_list = self._iter_matches(self.prefix, 0)
+                first = next(name_list, None)
+            except Exception:
+                self.close()
+                raise
+
+            self._chunks = self._generate(first, name_list)
+
+    def next(self):
+        self.open()
+        return next(self._chunks)
+
+    def close(self):
+        """
+            Called once the response is finished, even if the client
+            went away part way through.
+        """
+        if self._chunks is not None:
+            self._chunks.close()
+
+        if self._connected:
+            self._connected = False
+            self.storage.close()
+
+    def __iter__(self):
+        return self
+
+    def _generate(self, first, name_list):
+        yield "{\"artifacts\": ["
+        if first is not None:
+            yield self._format(first)
+            for name in name_list:
+                yield ", " + self._format(name)
+
+        yield "]}"
+
+    def _format(self, name):
+        return json.dumps(self.path_converter.from_cloud(name))
+
+    def _iter_matches(self, prefix, index):
+        """
+            Generator of the names of the artifacts under prefix that
+            match the pattern from index on.
+
+            Args:
+                prefix(basestring): Directory already matched, ending in a "/"
+                    (or "" for the root).
+                index(int): The first segment left to match.
+        """
+        # Literal directories are not listed, they just narrow the prefix.
+        last = len(self.segment_list) - 1
+        while index < last and not self._has_wildcard(self.segment_list[index]):
+            prefix += self.segment_list[index] + "/"
+            index += 1
+
+        segment = self.segment_list[index]
+        if segment == GlobIterator.RECURSIVE:
+            for name in self._iter_recursive(prefix, self.segment_list[index:]):
+                yield name
+
+            return
+
+        list_prefix = prefix + self._get_literal_start(segment)
+        for key in self.storage.iter_directory_contents(list_prefix, False):
+            name = key.name
+            is_directory = name.endswith("/")
+            if not fnmatchcase(name[len(prefix):].rstrip("/"), segment) or artifact_key_filter.is_reserved(name):
+                continue
+
+            if index == last:
+                if not is_directory and self._can_read(name):
+                    yield name
+            elif is_directory:
+                for match in self._iter_matches(name, index + 1):
+                    yield match
+
+    def _iter_recursive(self, prefix, segment_list):
+        """
+            Lists everything under prefix, since "**" can match any
+            number of directories, and keeps what matches segment_list.
+        """
+        for key in self.storage.iter_directory_contents(prefix, True):
+            name = key.name
+            if name.endswith("/") or artifact_key_filter.is_reserved(name):
+                continue
+
+            if self._matches(name[len(prefix):].split("/"), segment_list) and self._can_read(name):
+                yield name
+
+    def _matches(self, part_list, segment_list):
+        if not segment_list:
+            return not part_list
+
+        if segment_list[0] == GlobIterator.RECURSIVE:
+            for i in range(len(part_list) + 1):
+                if self._matches(part_list[i:], segment_list[1:]):
+                    return True
+
+            return False
+
+        return bool(part_list) and fnmatchcase(part_list[0], segment_list[0]) \
+            and self._matches(part_list[1:], segment_list[1:])
+
+    def _can_read(self, name):
+        return not self.can_read or self.can_read("/" + name)
+
+    def _has_wildcard(self, segment):
+        return re.search("[*?[]", segment) is not None
+
+    def _get_literal_start(self, segment):
+        """
+            Returns:
+                basestring: What every name matching segment starts with.
+        """
+        return re.split("[*?[]", segment, 1)[0]
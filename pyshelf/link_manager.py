@@ -1,3 +1,4 @@
+import urllib
 import pyshelf.artifact_key_filter as filters
 
 
@@ -36,6 +37,21 @@ class LinkManager(object):
 
             self._add_link(resource_path, rel_type, title)
 
+    def assign_next_page(self, limit, cursor):
+        """
+            Adds a link to the next page of a listing to
+            pyshelf.context.Context.link_list
+
+            Args:
+                limit(int)
+                cursor(string): Where the next page starts.
+        """
+        if isinstance(cursor, unicode):
+            cursor = cursor.encode("utf-8")
+
+        query = urllib.urlencode([("limit", limit), ("cursor", cursor)])
+        self._add_link("{0}?{1}".format(self.request.path, query), "next", "next page")
+
     def _add_link(self, path, rel_type, title):
 
             self.context.add_link({
@@ -1,3 +1,4 @@
+import copy
 from pyshelf.metadata.keys import Keys
 from datetime import datetime
 
@@ -73,6 +74,53 @@ class Initializer(object):
 
         return metadata
 
+    def create(self, identity, md5, sha256):
+        """
+            Creates the metadata of an artifact that was just uploaded
+            from what was found out while uploading it, which saves
+            loading (or looking up) anything.
+
+            Args:
+                identity(pyshelf.resource_identity.ResourceIdentity)
+                md5(basestring)
+                sha256(basestring|None): Not known if the artifact did
+                    not pass through pyshelf.
+
+            Returns:
+                metadata(schemas/metadata.json)
+        """
+        metadata = {
+            Keys.MD5: self.mapper.create_response_property(Keys.MD5, md5, True),
+            Keys.CREATED_DATE: self.mapper.create_response_property(Keys.CREATED_DATE, self._get_created_date(), True),
+            Keys.PATH: self.mapper.create_response_property(Keys.PATH, identity.resource_path, True),
+            Keys.NAME: self.mapper.create_response_property(Keys.NAME, identity.artifact_name, True)
+        }
+        if sha256:
+            metadata[Keys.SHA256] = self.mapper.create_response_property(Keys.SHA256, sha256, True)
+
+        return metadata
+
+    def create_copy(self, identity, metadata):
+        """
+            Creates the metadata of an artifact that was just copied from
+            the metadata of the artifact it was copied from.  Everything
+            carries over except what is about where it is.
+
+            Args:
+                identity(pyshelf.resource_identity.ResourceIdentity): Of the copy.
+                metadata(schemas/metadata.json): Of the original.
+
+            Returns:
+                metadata(schemas/metadata.json)
+        """
+        metadata = copy.deepcopy(dict(metadata))
+        metadata[Keys.CREATED_DATE] = self.mapper.create_response_property(
+            Keys.CREATED_DATE, self._get_created_date(), True)
+        metadata[Keys.PATH] = self.mapper.create_response_property(Keys.PATH, identity.resource_path, True)
+        metadata[Keys.NAME] = self.mapper.create_response_property(Keys.NAME, identity.artifact_name, True)
+
+        return metadata
+
     def _get_created_date(self):
         created_date = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
         return created_date
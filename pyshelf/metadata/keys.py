@@ -1,5 +1,6 @@
 class Keys(object):
     MD5 = "md5Hash"
+    SHA256 = "sha256Hash"
     PATH = "artifactPath"
     NAME = "artifactName"
     CREATED_DATE = "createdDate"
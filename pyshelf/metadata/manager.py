@@ -48,6 +48,29 @@ class Manager(object):
 
         return data
 
+    def create(self, md5, sha256):
+        """
+            Writes the metadata of an artifact that was just uploaded.
+            It cannot have any yet, so none is loaded.
+
+            Args:
+                md5(basestring)
+                sha256(basestring|None)
+        """
+        self._metadata = Wrapper(self.initializer.create(self.identity, md5, sha256))
+        self.write()
+
+    def create_copy(self, metadata):
+        """
+            Writes the metadata of an artifact that was just copied.
+
+            Args:
+                metadata(schemas/metadata.json): Of the artifact it was
+                    copied from.
+        """
+        self._metadata = Wrapper(self.initializer.create_copy(self.identity, metadata))
+        self.write()
+
     def write(self):
         """
             Updates the cloud to contain the metadata set on this instance.
@@ -1,3 +1,4 @@
+import os.path
 import yaml
 from fnmatch import fnmatch
 from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError
@@ -76,6 +77,39 @@ class PermissionsValidator(object):
 
         return allowed
 
+    def can_read(self, artifact_path):
+        """
+            Determines if the key can read a particular artifact.  This is
+            for requests which cover many artifacts, like _archive.
+
+            Args:
+                artifact_path(string): Cloud path of the artifact, starting with a "/".
+
+            Returns:
+                bool
+        """
+        # The key may not exist in the bucket at all (see _copy).
+        if not self.permissions:
+            return False
+
+        return self._has_access(self.permissions.get("read"), artifact_path, os.path.dirname(artifact_path))
+
+    def can_write(self, artifact_path):
+        """
+            Determines if the key can upload a particular artifact.  This is
+            for requests which cover many artifacts, like _batch.
+
+            Args:
+                artifact_path(string): Cloud path of the artifact, starting with a "/".
+
+            Returns:
+                bool
+        """
+        if not self.permissions:
+            return False
+
+        return self._has_access(self.permissions.get("write"), artifact_path, os.path.dirname(artifact_path))
+
     def _get_access(self, permissions):
         """
             Determines if key associated with request has proper access.
@@ -86,15 +120,32 @@ class PermissionsValidator(object):
             Returns:
                 bool: sufficient permissions.
         """
-        access = False
-        dir_path = self.container.resource_identity.artifact_path
-        artifact_path = self.container.resource_identity.cloud
+        identity = self.container.resource_identity
+        dir_path = identity.artifact_path
+        artifact_path = identity.cloud
+        if identity.type in ("_archive", "_batch", "_glob"):
+            # Each artifact in the directory is checked as it is archived
+            # (or uploaded or matched).
+            dir_path = artifact_path = identity.directory_path
+
+        return self._has_access(permissions, artifact_path, dir_path)
 
+    def _has_access(self, permissions, artifact_path, dir_path):
+        """
+            Args:
+                permissions(List(string)): Patterns the key has access to.
+                artifact_path(string)
+                dir_path(string): Directory the artifact is in.
+
+            Returns:
+                bool
+        """
+        access = False
         # This ensures our directory comparison has a '/' at the end to conform with fnmatch.
         if not dir_path.endswith("/"):
             dir_path = dir_path + "/"
 
-        for p in permissions:
+        for p in permissions or []:
             if fnmatch(artifact_path, p) or fnmatch(dir_path, p):
                 return True
         return access
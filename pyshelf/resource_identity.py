@@ -12,6 +12,7 @@ class ResourceIdentity(object):
 
         self._bucket_name = None
         self._artifact_path = None
+        self.type = None
 
         self._parse(self.resource_url)
         self._search = None
@@ -50,6 +51,17 @@ class ResourceIdentity(object):
 
         return self._artifact_name
 
+    @property
+    def directory_path(self):
+        """
+            For resources that are about a whole directory (like
+            _archive, _batch or _glob) rather than a single artifact.
+
+            Returns:
+                basestring: Path of the directory ending in a "/".
+        """
+        return os.path.join("/", *self._part_list[3:]).rstrip("/") + "/"
+
     @property
     def cloud(self):
         return os.path.join(self.artifact_path, self.artifact_name)
@@ -79,7 +91,8 @@ class ResourceIdentity(object):
     def _parse(self, resource_url):
         part_list = resource_url.split("/")
         # Finds the first occurance of the special type
-        index = self._try_index(part_list, ["_search", "_meta"])
+        type_list = ["_search", "_meta", "_archive", "_batch", "_upload", "_dedupe", "_copy", "_glob"]
+        index = self._try_index(part_list, type_list)
 
         if index:
             self.type = part_list[index]
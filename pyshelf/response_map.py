@@ -1,6 +1,7 @@
 from pyshelf.json_response import JsonResponse
 from pyshelf.cloud.cloud_exceptions import BucketNotFoundError, ArtifactNotFoundError, \
-    DuplicateArtifactError, InvalidNameError, BucketConfigurationNotFound
+    DuplicateArtifactError, InvalidNameError, BucketConfigurationNotFound, RangeNotSatisfiableError, \
+    UploadMismatchError, DeadlineExceededError, CopyNotSupportedError
 from pyshelf.error_code import ErrorCode
 from pyshelf.metadata.error_code import ErrorCode as MetadataErrorCode
 
@@ -99,6 +100,29 @@ def create_401(error_code=ErrorCode.PERMISSION_DENIED, msg="Permission denied"):
     return vnd_error(error)
 
 
+def create_416(size, error_code=ErrorCode.RANGE_NOT_SATISFIABLE, msg="Requested range not satisfiable"):
+    """
+        Creates response with 416 status code.
+
+        args:
+            size(int): Size of the artifact in bytes.
+            error_code(pyshelf.error_code.ErrorCode):
+            msg(string)
+
+        Returns:
+            pyshelf.json_response.JsonResponse
+    """
+    error = {
+        "code": error_code,
+        "message": msg,
+        "status_code": 416
+    }
+
+    response = vnd_error(error)
+    response.headers["Content-Range"] = "bytes */{0}".format(size)
+    return response
+
+
 def create_500(error_code=ErrorCode.INTERNAL_SERVER_ERROR, msg="Internal server error"):
     """
         Creates a 500 response using vnd.error
@@ -119,6 +143,26 @@ def create_500(error_code=ErrorCode.INTERNAL_SERVER_ERROR, msg="Internal server
     return vnd_error(error)
 
 
+def create_504(error_code=ErrorCode.GATEWAY_TIMEOUT, msg="Gateway timeout"):
+    """
+        Creates response with 504 status code.
+
+        args:
+            error_code(pyshelf.error_code.ErrorCode):
+            msg(string)
+
+        Returns:
+            pyshelf.json_response.JsonResponse
+    """
+    error = {
+        "code": error_code,
+        "message": msg,
+        "status_code": 504
+    }
+
+    return vnd_error(error)
+
+
 def create_201():
     """
         Creates a 201 response
@@ -169,6 +213,12 @@ def map_exception(e):
         return create_500()
     elif isinstance(e, BucketConfigurationNotFound):
         return create_404()
+    elif isinstance(e, RangeNotSatisfiableError):
+        return create_416(e.size, e.error_code, e.message)
+    elif isinstance(e, UploadMismatchError) or isinstance(e, CopyNotSupportedError):
+        return create_400(e.error_code, e.message)
+    elif isinstance(e, DeadlineExceededError):
+        return create_504(e.error_code, e.message)
 
     return create_500()
 
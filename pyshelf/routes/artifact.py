@@ -1,36 +1,107 @@
 from flask import request, Blueprint
+from werkzeug.http import is_resource_modified
 from pyshelf.endpoint_decorators import decorators
+from pyshelf.archive_iterator import ArchiveIterator
+from pyshelf.glob_iterator import GlobIterator
 import pyshelf.response_map as response_map
 
 artifact = Blueprint("artifact", __name__)
 
+FORM_MIMETYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
+
 
 @artifact.route("/<bucket_name>/artifact/", methods=["GET"], defaults={"path": "/"})
 @artifact.route("/<bucket_name>/artifact/<path:path>", methods=["GET"])
 @decorators.foundation
 def get_path(container, bucket_name, path):
-    stream = container.artifact_manager.get_artifact(path)
+    limit = container.request.args.get("limit", type=int)
+    if limit is not None and limit < 1:
+        limit = None
+
+    # A conditional request is cheaper to answer here than to redirect
+    # and the signature of the URL only allows a GET.
+    request_headers = container.request.headers
+    if container.request.method == "GET" and not limit and not container.request.args.get("cursor") \
+            and not request_headers.get("If-None-Match") and not request_headers.get("If-Modified-Since"):
+        url = container.artifact_manager.get_download_url(path)
+        if url:
+            response = container.context_response_mapper.to_response(None, 307)
+            response.headers["Location"] = url
+            return response
+
+    stream = container.artifact_manager.get_artifact(
+        path,
+        container.request.headers.get("Range"),
+        container.request.headers.get("If-Range"),
+        limit,
+        container.request.args.get("cursor")
+    )
     status_code = 204
     if stream:
-        status_code = 200
+        if not is_resource_modified(container.request.environ, stream.etag, last_modified=stream.last_modified):
+            status_code = 304
+        else:
+            status_code = 200
+            if stream.is_partial:
+                status_code = 206
+
+            # The body of a HEAD is thrown away so don't bother downloading it.
+            # Everything else it needs comes from the (cached) key.
+            if container.request.method != "HEAD":
+                stream.open()
 
     response = container.context_response_mapper.to_response(stream, status_code)
     return response
 
 
-@artifact.route("/<bucket_name>/artifact/<path:path>", methods=["HEAD"])
+@artifact.route("/<bucket_name>/artifact/_archive", methods=["GET"], defaults={"path": ""})
+@artifact.route("/<bucket_name>/artifact/<path:path>/_archive", methods=["GET"])
 @decorators.foundation
-def get_links(container, bucket_name, path):
-    container.link_manager.assign_single(container.request.path)
-    response = container.context_response_mapper.to_response(None, 204)
+def get_archive(container, bucket_name, path):
+    archive_format = container.request.args.get("format", "tar")
+    if archive_format not in ArchiveIterator.CONTENT_TYPE_MAP:
+        msg = "Archive format must be one of {0}".format(", ".join(sorted(ArchiveIterator.CONTENT_TYPE_MAP)))
+        return response_map.create_400(msg=msg)
+
+    archive = container.artifact_manager.get_archive(path, archive_format)
+    response = container.context_response_mapper.to_response(archive, 200)
+    return response
+
+
+@artifact.route("/<bucket_name>/artifact/_glob", methods=["GET"], defaults={"path": ""})
+@artifact.route("/<bucket_name>/artifact/<path:path>/_glob", methods=["GET"])
+@decorators.foundation_headers
+def get_glob(container, bucket_name, path):
+    segment_list = GlobIterator.split_pattern(container.request.args.get("pattern"))
+    if not segment_list:
+        return response_map.create_400(msg="A glob pattern relative to the directory must be provided.")
+
+    glob = container.artifact_manager.get_glob(path, segment_list)
+    response = container.context_response_mapper.to_response(glob, 200)
     return response
 
 
 @artifact.route("/<bucket_name>/artifact/<path:path>", methods=["POST"])
 @decorators.foundation_headers
 def upload_artifact(container, bucket_name, path):
-    file_storage = request.files['file']
-    container.artifact_manager.upload_artifact(path, file_storage)
+    # Any other body is the artifact itself.  It is streamed straight
+    # to the cloud instead of being spooled to disk first.
+    is_raw = request.mimetype == "application/octet-stream" \
+        or (request.mimetype not in FORM_MIMETYPES and request.content_length)
+    if is_raw:
+        # Without a Content-Length werkzeug reads the body as empty, unless
+        # the server says where it ends (chunked requests for instance).
+        if request.content_length is None and not request.environ.get("wsgi.input_terminated"):
+            return response_map.create_400(msg="An artifact sent as the body requires a Content-Length.")
+
+        if request.content_length == 0:
+            return response_map.create_400(msg="An artifact sent as the body cannot be empty.")
+
+        container.artifact_manager.upload_artifact(path, request.stream, request.content_length)
+    else:
+        # A form without a file (or no body at all) is a 400.
+        file_storage = request.files['file']
+        container.artifact_manager.upload_artifact(path, file_storage)
     response = response_map.create_201()
     response = container.context_response_mapper.to_response(response.data, response.status_code)
     response.headers["Location"] = container.request.path
@@ -38,6 +109,79 @@ def upload_artifact(container, bucket_name, path):
     return response
 
 
+@artifact.route("/<bucket_name>/artifact/<path:path>/_upload", methods=["POST"])
+@decorators.foundation_headers
+def reserve_upload(container, bucket_name, path):
+    reservation = container.artifact_manager.reserve_upload(path)
+    if not reservation:
+        return response_map.create_400(msg="Bucket {0} does not accept direct uploads.".format(bucket_name))
+
+    reservation["finalize"] = "{0}/{1}".format(container.request.path, reservation.pop("token"))
+    response = container.context_response_mapper.to_response(reservation, 200)
+    return response
+
+
+@artifact.route("/<bucket_name>/artifact/<path:path>/_upload/<token>", methods=["POST"])
+@decorators.foundation_headers
+def finalize_upload(container, bucket_name, path, token):
+    data = container.request.get_json(silent=True, force=True)
+    if not isinstance(data, dict):
+        data = {}
+
+    container.artifact_manager.finalize_upload(path, token, data.get("size"), data.get("md5Hash"))
+    response = response_map.create_201()
+    response = container.context_response_mapper.to_response(response.data, response.status_code)
+    response.headers["Location"] = container.path_converter.from_cloud(path)
+
+    return response
+
+
+@artifact.route("/<bucket_name>/artifact/<path:path>/_dedupe", methods=["POST"])
+@decorators.foundation_headers
+@decorators.validate_request("schemas/request-dedupe.json")
+def deduplicate_upload(container, bucket_name, path, data):
+    if not container.artifact_manager.deduplicate_upload(path, data.get("md5Hash"), data.get("sha256Hash")):
+        # Nothing to copy so it has to be uploaded.
+        return response_map.create_404()
+
+    response = response_map.create_201()
+    response = container.context_response_mapper.to_response(response.data, response.status_code)
+    response.headers["Location"] = container.path_converter.from_cloud(path)
+
+    return response
+
+
+@artifact.route("/<bucket_name>/artifact/<path:path>/_copy", methods=["POST"])
+@decorators.foundation_headers
+@decorators.validate_request("schemas/request-copy.json")
+def copy_artifact(container, bucket_name, path, data):
+    if not container.artifact_manager.copy_artifact(path, data["source"]):
+        # The key is allowed to write here but not to read the source.
+        return response_map.create_401()
+
+    response = response_map.create_201()
+    response = container.context_response_mapper.to_response(response.data, response.status_code)
+    response.headers["Location"] = container.path_converter.from_cloud(path)
+
+    return response
+
+
+@artifact.route("/<bucket_name>/artifact/_batch", methods=["POST"], defaults={"path": ""})
+@artifact.route("/<bucket_name>/artifact/<path:path>/_batch", methods=["POST"])
+@decorators.foundation_headers
+def upload_batch(container, bucket_name, path):
+    file_storage_list = []
+    if request.mimetype == "multipart/form-data":
+        file_storage_list = request.files.getlist("file")
+
+    if not file_storage_list:
+        return response_map.create_400(msg="Artifacts must be sent as multipart/form-data parts named file.")
+
+    result_list = container.artifact_manager.upload_artifacts(path, file_storage_list)
+    response = container.context_response_mapper.to_response({"results": result_list}, 200)
+    return response
+
+
 @artifact.route("/<bucket_name>/artifact/<path:path>/_meta", methods=["GET", "HEAD"])
 @decorators.foundation
 def get_artifact_meta_route(container, bucket_name, path):
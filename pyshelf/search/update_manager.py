@@ -143,8 +143,20 @@ class UpdateManager(object):
                 ....
             }
         """
-        for key, val in data.iteritems():
-            self.update(key, val)
+        # Every property is replaced by an update anyway so the
+        # documents are indexed whole, in a single request.
+        operations = (
+            {
+                "_op_type": "index",
+                "_id": key,
+                "_index": self.index,
+                "_type": Metadata._doc_type.name,
+                "_source": self._create_metadata(val).to_dict()
+            } for key, val in data.iteritems()
+        )
+
+        bulk(self.connection, operations)
+        self.logger.debug("Updated {0} metadata documents in ES".format(len(data)))
 
     def update(self, key, metadata):
         """
@@ -160,6 +172,18 @@ class UpdateManager(object):
         meta_doc.save(using=self.connection)
         self.logger.debug("Updated metadata document {0} in ES".format(key))
 
+    def _create_metadata(self, metadata):
+        """
+            Args:
+                metadata(dict): collection of metadata for document.
+
+            Returns:
+                pyshelf.search.metadata.Metadata
+        """
+        meta_doc = Metadata()
+        meta_doc.update_all(metadata)
+        return meta_doc
+
     def _get_metadata(self, key):
         """
             Attempts to get existing metadata and creates one if it does not exist.
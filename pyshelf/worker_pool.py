@@ -0,0 +1,143 @@
+import sys
+import threading
+from Queue import Queue
+
+
+class WorkerPool(object):
+    """
+        Runs a function over many items using a bounded number of
+        workers.  Workers are threads, which under gunicorn's gevent
+        workers (threading is monkey patched) end up being greenlets.
+
+        Workers only live as long as a single call to imap so nothing
+        is left running after a request is finished.
+    """
+    def __init__(self, size):
+        """
+            Args:
+                size(int): The most items worked on at the same time.
+        """
+        self.size = max(1, size)
+
+    def imap(self, func, iterable, window=None, discard=None):
+        """
+            Generator that yields func(item) for each item, in the same
+            order as iterable.  Items are only pulled from iterable as
+            room is made, so at most "window" items are being worked on
+            or waiting to be yielded at any time.
+
+            If func raises, the exception is raised from here once its
+            turn comes around and nothing else is started.  Closing the
+            generator early also stops any work that hasn't started.
+
+            Args:
+                func(function): Called with a single item.
+                iterable(iterable)
+                window(int|None): Defaults to the size of the pool.
+                discard(function|None): Called with every result which is
+                    never yielded because the generator was closed early or
+                    func raised, for instance to close what func opened.
+
+            Returns:
+                generator
+        """
+        if window is None:
+            window = self.size
+
+        window = max(window, 1)
+        task_queue = Queue()
+        results = {}
+        condition = threading.Condition()
+        cancelled = threading.Event()
+
+        def work():
+            while True:
+                task = task_queue.get()
+                if task is None:
+                    return
+
+                index, item = task
+                if cancelled.is_set():
+                    continue
+
+                try:
+                    result = (True, func(item))
+                except Exception:
+                    result = (False, sys.exc_info())
+
+                with condition:
+                    is_wanted = not cancelled.is_set()
+                    if is_wanted:
+                        results[index] = result
+                        condition.notify_all()
+
+                if not is_wanted:
+                    # Finished after nobody was waiting for it any more.
+                    self._discard(discard, [result])
+
+        thread_list = []
+        for i in range(self.size):
+            thread = threading.Thread(target=work)
+            thread.daemon = True
+            thread.start()
+            thread_list.append(thread)
+
+        try:
+            item_iter = iter(iterable)
+            submitted = 0
+            index = 0
+            exhausted = False
+            while True:
+                while not exhausted and submitted - index < window:
+                    try:
+                        item = next(item_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    task_queue.put((submitted, item))
+                    submitted += 1
+
+                if index == submitted:
+                    break
+
+                with condition:
+                    while index not in results:
+                        condition.wait()
+
+                    success, value = results.pop(index)
+
+                index += 1
+                if not success:
+                    raise value[0], value[1], value[2]
+
+                yield value
+        finally:
+            with condition:
+                cancelled.set()
+                leftover_list = results.values()
+                results.clear()
+
+            for thread in thread_list:
+                task_queue.put(None)
+
+            self._discard(discard, leftover_list)
+
+    def _discard(self, discard, result_list):
+        if discard:
+            for success, value in result_list:
+                if success:
+                    discard(value)
+
+    def map(self, func, iterable):
+        """
+            Same as imap except it waits for everything and returns a list.
+
+            Args:
+                func(function): Called with a single item.
+                iterable(iterable)
+
+            Returns:
+                list
+        """
+        return list(self.imap(func, iterable))
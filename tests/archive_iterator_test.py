@@ -0,0 +1,91 @@
+import tarfile
+import time
+import pyproctor
+from StringIO import StringIO
+from mock import Mock
+from pyshelf.archive_iterator import ArchiveIterator
+from pyshelf.worker_pool import WorkerPool
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError
+
+
+class ArchiveIteratorTest(pyproctor.TestBase):
+    def setUp(self):
+        super(ArchiveIteratorTest, self).setUp()
+        self.storage = MemoryStorage(MemoryStore(), "test", Mock())
+        self.storage.set_artifact_from_string("dir/test", "hello world")
+        self.storage.set_artifact_from_string("dir/sub/test2", "hello" * 1000)
+        self.storage.set_artifact_from_string("dir/_metadata_test.yaml", "md5Hash: abc")
+        self.storage.set_artifact_from_string("dir/_private/test3", "secret")
+        self.storage.set_artifact_from_string("other", "not in the archive")
+
+    def create(self, path, archive_format):
+        archive = ArchiveIterator(self.storage, path, "name", archive_format, WorkerPool(2))
+        archive.open()
+        return archive
+
+    def read(self, archive, mode):
+        data = "".join(archive)
+        archive.close()
+        tar = tarfile.open(fileobj=StringIO(data), mode=mode)
+        return dict((member.name, tar.extractfile(member).read()) for member in tar.getmembers())
+
+    def test_tar(self):
+        member_map = self.read(self.create("dir", "tar"), "r:")
+        self.assertEqual({
+            "name/test": "hello world",
+            "name/sub/test2": "hello" * 1000
+        }, member_map)
+
+    def test_tar_gz(self):
+        member_map = self.read(self.create("dir/sub/", "tar.gz"), "r:gz")
+        self.assertEqual({"name/test2": "hello" * 1000}, member_map)
+
+    def test_root(self):
+        member_map = self.read(self.create("", "tar"), "r:")
+        self.assertEqual(["name/dir/sub/test2", "name/dir/test", "name/other"], sorted(member_map))
+
+    def test_empty(self):
+        with self.assertRaises(ArtifactNotFoundError):
+            self.create("dir/_private", "tar")
+
+        with self.assertRaises(ArtifactNotFoundError):
+            self.create("nada", "tar")
+
+    def test_can_read(self):
+        def can_read(path):
+            return "sub" in path
+
+        archive = ArchiveIterator(self.storage, "dir", "name", "tar", WorkerPool(2), can_read=can_read)
+        archive.open()
+        self.assertEqual({"name/sub/test2": "hello" * 1000}, self.read(archive, "r:"))
+
+    def test_artifacts_not_looked_up_again(self):
+        get_key = Mock(side_effect=self.storage.get_key)
+        self.storage.get_key = get_key
+        self.read(self.create("dir", "tar"), "r:")
+        self.assertFalse(get_key.called)
+
+    def test_close_early(self):
+        stream_list = []
+        get_artifact = self.storage.get_artifact
+
+        def open_artifact(artifact_name, byte_range_list=None, key=None):
+            stream = get_artifact(artifact_name, byte_range_list, key)
+            stream.close = Mock()
+            stream_list.append(stream)
+            return stream
+
+        self.storage.get_artifact = open_artifact
+        archive = self.create("", "tar")
+        next(archive)
+        # Waits for the next one to be opened ahead of time.
+        while len(stream_list) < 2:
+            time.sleep(0.01)
+
+        archive.close()
+        # The artifact opened ahead of time is closed, not only the one
+        # being sent.
+        self.assertEqual(2, len(stream_list))
+        for stream in stream_list:
+            self.assertTrue(stream.close.called)
@@ -0,0 +1,53 @@
+import pyproctor
+from mock import Mock
+from pyshelf.artifact_manager import ArtifactManager
+from pyshelf.metadata.keys import Keys as MetadataKeys
+from pyshelf.search.formatter import Formatter
+from pyshelf.search_parser import SearchParser
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+import tests.metadata_utils as meta_utils
+
+
+class ArtifactManagerTest(pyproctor.TestBase):
+    def setUp(self):
+        super(ArtifactManagerTest, self).setUp()
+        self.storage = MemoryStorage(MemoryStore(), "test", Mock())
+        self.storage.set_artifact_from_string("test", "hello world")
+        self.container = Mock()
+        self.container.bucket_name = "test"
+        self.container.search_parser = SearchParser()
+        self.container.create_bucket_storage.return_value = self.storage
+        self.container.cloud_factory.get_existence_filter.return_value = None
+        self.container.permissions_validator.can_read.return_value = True
+        self.artifact_manager = ArtifactManager(self.container)
+
+    def set_search_results(self, metadata_list):
+        """
+            Answers searches the way pyshelf.search.manager.Manager does,
+            through the real Formatter.
+        """
+        def search(criteria, key_list):
+            hit_list = []
+            for metadata in metadata_list:
+                hit = Mock()
+                hit.to_dict.return_value = {"property_list": metadata.values()}
+                hit_list.append(hit)
+
+            search_results = Mock()
+            search_results.hits = hit_list
+            return Formatter(criteria, search_results, key_list).get_formatted_results()
+
+        self.container.search.manager.search.side_effect = search
+
+    def test_deduplicate_upload_without_sha256(self):
+        # Like every artifact uploaded before sha256Hash was added.
+        self.set_search_results([meta_utils.get_meta()])
+        self.assertNotIn(MetadataKeys.SHA256, meta_utils.get_meta())
+        self.assertTrue(self.artifact_manager.deduplicate_upload("copy", md5=meta_utils.MD5))
+        self.assertEqual("hello world", self.storage.get_artifact_as_string("copy"))
+        self.container.metadata.manager.create.assert_called_once_with(meta_utils.MD5, None)
+
+    def test_deduplicate_upload_not_found(self):
+        self.set_search_results([])
+        self.assertFalse(self.artifact_manager.deduplicate_upload("copy", md5=meta_utils.MD5))
+        self.assertFalse(self.container.metadata.manager.create.called)
@@ -0,0 +1,41 @@
+import pyproctor
+from pyshelf import byte_range
+from pyshelf.cloud.cloud_exceptions import RangeNotSatisfiableError
+
+
+class ByteRangeTest(pyproctor.TestBase):
+    def test_parse(self):
+        self.assertEqual([(0, 4)], byte_range.parse("bytes=0-4", 11))
+
+    def test_parse_open_ended(self):
+        self.assertEqual([(6, 10)], byte_range.parse("bytes=6-", 11))
+
+    def test_parse_suffix(self):
+        self.assertEqual([(8, 10)], byte_range.parse("bytes=-3", 11))
+
+    def test_parse_clamps_to_size(self):
+        self.assertEqual([(5, 10)], byte_range.parse("bytes=5-100", 11))
+
+    def test_parse_multiple(self):
+        self.assertEqual([(0, 1), (5, 6)], byte_range.parse("bytes=0-1,5-6", 11))
+
+    def test_parse_ignores_invalid(self):
+        self.assertEqual(None, byte_range.parse("bytes=abc", 11))
+        self.assertEqual(None, byte_range.parse("lines=0-1", 11))
+
+    def test_parse_not_satisfiable(self):
+        with self.assertRaises(RangeNotSatisfiableError):
+            byte_range.parse("bytes=11-20", 11)
+
+    def test_if_range_etag(self):
+        self.assertTrue(byte_range.if_range_matches("\"abc\"", "\"abc\"", None))
+        self.assertFalse(byte_range.if_range_matches("\"abd\"", "\"abc\"", None))
+        self.assertFalse(byte_range.if_range_matches("W/\"abc\"", "\"abc\"", None))
+
+    def test_if_range_date(self):
+        date = "Sun, 20 Dec 2015 23:12:21 GMT"
+        self.assertTrue(byte_range.if_range_matches(date, "\"abc\"", date))
+        self.assertFalse(byte_range.if_range_matches("Sun, 20 Dec 2015 23:12:22 GMT", "\"abc\"", date))
+
+    def test_content_range(self):
+        self.assertEqual("bytes 0-4/11", byte_range.content_range((0, 4), 11))
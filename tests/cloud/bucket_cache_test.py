@@ -0,0 +1,22 @@
+import pyproctor
+from pyshelf.cloud.bucket_cache import BucketCache
+
+
+class BucketCacheTest(pyproctor.TestBase):
+    def test_exists(self):
+        cache = BucketCache(60)
+        self.assertFalse(cache.exists("key", "bucket"))
+        cache.add("key", "bucket")
+        self.assertTrue(cache.exists("key", "bucket"))
+        self.assertFalse(cache.exists("other-key", "bucket"))
+
+    def test_expires(self):
+        cache = BucketCache(-1)
+        cache.add("key", "bucket")
+        self.assertFalse(cache.exists("key", "bucket"))
+
+    def test_invalidate(self):
+        cache = BucketCache(60)
+        cache.add("key", "bucket")
+        cache.invalidate("key", "bucket")
+        self.assertFalse(cache.exists("key", "bucket"))
@@ -0,0 +1,72 @@
+import socket
+import time
+import pyproctor
+from mock import Mock
+from pyshelf.cloud.call_budget import CallBudget
+from pyshelf.cloud.call_runner import CallRunner
+from pyshelf.cloud.latency_tracker import LatencyTracker
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, DeadlineExceededError
+
+
+class CallRunnerTest(pyproctor.TestBase):
+    def create_runner(self, budget=10, operation_timeout=1, retries=2, latency_tracker=None, hedge_percentile=None):
+        return CallRunner(Mock(), CallBudget(budget), operation_timeout, retries, 0, latency_tracker, hedge_percentile)
+
+    def test_call(self):
+        runner = self.create_runner()
+        self.assertEqual("result", runner.call("HEAD", lambda: "result"))
+
+    def test_call_retries(self):
+        attempt = Mock(side_effect=[socket.error("Connection reset"), "result"])
+        runner = self.create_runner()
+        self.assertEqual("result", runner.call("HEAD", attempt))
+        self.assertEqual(2, attempt.call_count)
+
+    def test_call_gives_up(self):
+        attempt = Mock(side_effect=socket.error("Connection reset"))
+        runner = self.create_runner(retries=1)
+        with self.assertRaises(socket.error):
+            runner.call("HEAD", attempt)
+
+        self.assertEqual(2, attempt.call_count)
+
+    def test_call_does_not_retry(self):
+        attempt = Mock(side_effect=ArtifactNotFoundError("a"))
+        runner = self.create_runner()
+        with self.assertRaises(ArtifactNotFoundError):
+            runner.call("HEAD", attempt)
+
+        self.assertEqual(1, attempt.call_count)
+
+    def test_call_times_out(self):
+        discard = Mock()
+
+        def attempt():
+            time.sleep(0.2)
+            return "late"
+
+        runner = self.create_runner(budget=0.15, operation_timeout=0.1)
+        with self.assertRaises(DeadlineExceededError):
+            runner.call("HEAD", attempt, discard)
+
+        self.assertEqual(0, runner.call_budget.remaining())
+        time.sleep(0.3)
+        discard.assert_called_with("late")
+
+    def test_call_hedges(self):
+        latency_tracker = LatencyTracker(min_samples=1)
+        latency_tracker.add("GET", 0.01)
+        discard = Mock()
+        result_list = ["slow", "fast"]
+
+        def attempt():
+            result = result_list.pop(0)
+            if result == "slow":
+                time.sleep(0.2)
+
+            return result
+
+        runner = self.create_runner(latency_tracker=latency_tracker, hedge_percentile=99)
+        self.assertEqual("fast", runner.call("GET", attempt, discard, hedge=True))
+        time.sleep(0.3)
+        discard.assert_called_with("slow")
@@ -0,0 +1,67 @@
+import pyproctor
+from pyproctor import MonkeyPatcher
+from mock import Mock
+from pyshelf.cloud import connection_pool as connection_pools
+from pyshelf.cloud.connection_pool import ConnectionPool
+
+
+class ConnectionPoolTest(pyproctor.TestBase):
+    def setUp(self):
+        super(ConnectionPoolTest, self).setUp()
+        self.create_connection = Mock(side_effect=lambda access_key, secret_key: Mock())
+        MonkeyPatcher.patch(ConnectionPool, "_create_connection", self.create_connection)
+        self.pool = ConnectionPool(max_size=1, idle_timeout=60)
+
+    def test_reuses_released_connection(self):
+        conn = self.pool.acquire("a", "b")
+        self.pool.release("a", "b", conn)
+        self.assertIs(conn, self.pool.acquire("a", "b"))
+        self.assertEqual(1, self.create_connection.call_count)
+
+    def test_keyed_by_credentials(self):
+        conn = self.pool.acquire("a", "b")
+        self.pool.release("a", "b", conn)
+        self.assertIsNot(conn, self.pool.acquire("c", "d"))
+        self.assertEqual(2, self.create_connection.call_count)
+
+    def test_leased_connection_is_not_shared(self):
+        first = self.pool.acquire("a", "b")
+        second = self.pool.acquire("a", "b")
+        self.assertIsNot(first, second)
+
+    def test_closes_when_full(self):
+        first = self.pool.acquire("a", "b")
+        second = self.pool.acquire("a", "b")
+        self.pool.release("a", "b", first)
+        self.pool.release("a", "b", second)
+        self.assertFalse(first.close.called)
+        self.assertTrue(second.close.called)
+
+    def test_evicts_idle_connections(self):
+        self.pool.idle_timeout = -1
+        conn = self.pool.acquire("a", "b")
+        self.pool.release("a", "b", conn)
+        self.assertIsNot(conn, self.pool.acquire("a", "b"))
+        self.assertTrue(conn.close.called)
+
+    def test_discard(self):
+        conn = self.pool.acquire("a", "b")
+        self.pool.discard(conn)
+        self.assertTrue(conn.close.called)
+        self.assertIsNot(conn, self.pool.acquire("a", "b"))
+
+    def test_acquire_release(self):
+        conn = connection_pools.acquire(self.pool, "a", "b")
+        connection_pools.release(self.pool, "a", "b", conn)
+        self.assertIs(conn, connection_pools.acquire(self.pool, "a", "b"))
+        connection_pools.release(self.pool, "a", "b", conn, discard=True)
+        self.assertTrue(conn.close.called)
+        self.assertIsNot(conn, self.pool.acquire("a", "b"))
+
+    def test_acquire_release_without_pool(self):
+        conn = Mock()
+        MonkeyPatcher.patch(connection_pools, "S3Connection", Mock(return_value=conn))
+        self.assertIs(conn, connection_pools.acquire(None, "a", "b"))
+        connection_pools.S3Connection.assert_called_once_with("a", "b")
+        connection_pools.release(None, "a", "b", conn)
+        self.assertTrue(conn.close.called)
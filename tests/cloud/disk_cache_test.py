@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import pyproctor
+from mock import Mock, patch
+from pyshelf.cloud.disk_cache import DiskCache
+
+
+class DiskCacheTest(pyproctor.TestBase):
+    def setUp(self):
+        super(DiskCacheTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.cache = DiskCache(self.directory, 10, Mock())
+
+    def tearDown(self):
+        super(DiskCacheTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def fill(self, key_name, data):
+        writer = self.cache.create_writer("bucket", key_name, "\"etag\"", len(data))
+        writer.write(data)
+        writer.commit()
+
+    def read(self, key_name):
+        fp = self.cache.open("bucket", key_name, "\"etag\"")
+        if fp is None:
+            return None
+
+        with fp:
+            return fp.read()
+
+    def test_miss(self):
+        self.assertIsNone(self.read("a"))
+
+    def test_fill(self):
+        self.fill("a", "hello")
+        self.assertEqual("hello", self.read("a"))
+
+    def test_abort(self):
+        writer = self.cache.create_writer("bucket", "a", "\"etag\"", 5)
+        writer.write("hel")
+        writer.abort()
+        self.assertIsNone(self.read("a"))
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_concurrent_fill(self):
+        writer = self.cache.create_writer("bucket", "a", "\"etag\"", 5)
+        self.assertIsNone(self.cache.create_writer("bucket", "a", "\"etag\"", 5))
+        writer.abort()
+
+    def test_too_large(self):
+        self.assertIsNone(self.cache.create_writer("bucket", "a", "\"etag\"", 11))
+
+    def test_broken_cache(self):
+        with patch("os.open", side_effect=OSError(24, "Too many open files")):
+            self.assertIsNone(self.cache.create_writer("bucket", "a", "\"etag\"", 5))
+
+    def test_lists_only_when_too_large(self):
+        self.fill("a", "aaaa")
+        with patch("os.listdir", side_effect=os.listdir) as listdir:
+            self.fill("b", "bbbb")
+            self.assertEqual(0, listdir.call_count)
+            self.fill("c", "cccc")
+            self.assertEqual(1, listdir.call_count)
+
+    def test_evicts_least_recently_used(self):
+        self.fill("a", "aaaa")
+        self.fill("b", "bbbb")
+        path_a = self.cache._get_path("bucket", "a", "\"etag\"")
+        path_b = self.cache._get_path("bucket", "b", "\"etag\"")
+        os.utime(path_a, (1, 1))
+        os.utime(path_b, (2, 2))
+        self.read("a")
+        self.fill("c", "cccc")
+        self.assertEqual("aaaa", self.read("a"))
+        self.assertIsNone(self.read("b"))
+        self.assertEqual("cccc", self.read("c"))
@@ -0,0 +1,113 @@
+import pyproctor
+from mock import Mock
+from pyshelf.cloud.existence_filter import BloomFilter, ExistenceFilter, ScalableBloomFilter
+
+
+class BloomFilterTest(pyproctor.TestBase):
+    def test_contains(self):
+        bloom_filter = BloomFilter(1000)
+        name_list = ["artifact-{0}".format(i) for i in range(1000)]
+        for name in name_list:
+            bloom_filter.add(name)
+
+        for name in name_list:
+            self.assertIn(name, bloom_filter)
+
+        false_positives = len([i for i in range(10000) if "missing-{0}".format(i) in bloom_filter])
+        self.assertLess(false_positives, 300)
+        self.assertAlmostEqual(0.01, bloom_filter.false_positive_rate, delta=0.005)
+
+    def test_unicode(self):
+        bloom_filter = BloomFilter(10)
+        bloom_filter.add(u"caf\xe9")
+        self.assertIn(u"caf\xe9", bloom_filter)
+
+
+class ScalableBloomFilterTest(pyproctor.TestBase):
+    def test_grows(self):
+        bloom_filter = ScalableBloomFilter(100)
+        name_list = ["artifact-{0}".format(i) for i in range(2000)]
+        for name in name_list:
+            bloom_filter.add(name)
+
+        for name in name_list:
+            self.assertIn(name, bloom_filter)
+
+        self.assertEqual(2000, bloom_filter.count)
+        self.assertLess(bloom_filter.false_positive_rate, 0.01)
+        false_positives = len([i for i in range(10000) if "missing-{0}".format(i) in bloom_filter])
+        self.assertLess(false_positives, 200)
+
+
+class ExistenceFilterTest(pyproctor.TestBase):
+    def setUp(self):
+        self.name_list = ["_keys/key", "a", "dir/_metadata_b.yaml", "dir/b", "dir/nested/c", "dir/nested/d", "dir2/e"]
+        self.lister = Mock()
+        self.lister.iter_keys.side_effect = lambda prefix, skip: [self.create_key(name) for name in self.name_list]
+        self.existence_filter = ExistenceFilter("bucket", lambda: self.lister, Mock())
+
+    def create_key(self, name):
+        key = Mock()
+        key.name = name
+        return key
+
+    def test_not_ready(self):
+        self.assertTrue(self.existence_filter.might_exist("missing"))
+        self.assertFalse(self.existence_filter.get_stats()["ready"])
+
+    def test_refresh(self):
+        self.existence_filter.refresh()
+        for path in ["a", "/dir/b", "dir", "dir/", "dir/nested", "dir/nested/c", "dir/nested/d", "dir2"]:
+            self.assertTrue(self.existence_filter.might_exist(path))
+
+        self.assertFalse(self.existence_filter.might_exist("missing"))
+        self.assertFalse(self.existence_filter.might_exist("dir/missing"))
+        # Private paths are left to S3 (and permissions) to turn away.
+        self.assertTrue(self.existence_filter.might_exist("_keys/missing"))
+        self.assertTrue(self.existence_filter.might_exist("/"))
+
+    def test_add(self):
+        self.existence_filter.refresh()
+        self.existence_filter.add("new/dir/artifact")
+        self.assertTrue(self.existence_filter.might_exist("new/dir/artifact"))
+        self.assertTrue(self.existence_filter.might_exist("new/dir"))
+        self.assertTrue(self.existence_filter.might_exist("new"))
+
+    def test_add_during_refresh(self):
+        def iter_keys(prefix, skip):
+            # Uploaded after the listing got past it.
+            self.existence_filter.add("z")
+            return [self.create_key("a")]
+
+        self.lister.iter_keys.side_effect = iter_keys
+        self.existence_filter.refresh()
+        self.assertTrue(self.existence_filter.might_exist("z"))
+
+    def test_failed_refresh_keeps_filter(self):
+        self.existence_filter.refresh()
+        self.lister.iter_keys.side_effect = Exception("S3 is down")
+        with self.assertRaises(Exception):
+            self.existence_filter.refresh()
+
+        self.assertTrue(self.existence_filter.might_exist("a"))
+        self.assertFalse(self.existence_filter.might_exist("missing"))
+
+    def test_stats(self):
+        self.existence_filter.refresh()
+        self.existence_filter.might_exist("a")
+        self.existence_filter.might_exist("missing")
+        self.existence_filter.might_exist("missing", record=False)
+        self.existence_filter.might_exist("uploaded-elsewhere")
+        self.existence_filter.add_unknown("uploaded-elsewhere")
+        self.existence_filter.add_false_positive("other")
+        self.assertTrue(self.existence_filter.might_exist("uploaded-elsewhere", record=False))
+        stats = self.existence_filter.get_stats()
+        self.assertTrue(stats["ready"])
+        # Each directory is only added once.
+        self.assertEqual(9, stats["names"])
+        self.assertEqual(3, stats["lookups"])
+        self.assertEqual(2, stats["misses"])
+        self.assertEqual(1, stats["unknown"])
+        self.assertEqual(1, stats["falsePositives"])
+        self.assertEqual(0.5, stats["observedFalsePositiveRate"])
+        self.assertLess(stats["estimatedFalsePositiveRate"], 0.01)
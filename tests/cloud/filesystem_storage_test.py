@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import pyproctor
+from StringIO import StringIO
+from mock import Mock
+from pyshelf.cloud.filesystem_storage import FilesystemStorage
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, BucketNotFoundError, DuplicateArtifactError
+
+
+class FilesystemStorageTest(pyproctor.TestBase):
+    def setUp(self):
+        super(FilesystemStorageTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.storage = FilesystemStorage(self.directory, "test", Mock())
+        self.storage.upload_artifact("test", StringIO("hello world"))
+        self.storage.upload_artifact("dir/dir2/test2", StringIO("hello"))
+
+    def tearDown(self):
+        super(FilesystemStorageTest, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def test_get_artifact(self):
+        self.assertEqual("hello world", "".join(self.storage.get_artifact("test")))
+
+    def test_get_artifact_range(self):
+        self.assertEqual("world", "".join(self.storage.get_artifact("test", [(6, 10)])))
+
+    def test_get_key(self):
+        key = self.storage.get_key("dir/dir2/test2")
+        self.assertEqual(5, key.size)
+        self.assertEqual("dir/dir2/test2", key.name)
+
+    def test_get_key_directory(self):
+        with self.assertRaises(ArtifactNotFoundError):
+            self.storage.get_key("dir")
+
+    def test_get_key_outside_of_bucket(self):
+        with self.assertRaises(ArtifactNotFoundError):
+            self.storage.get_key("../test")
+
+    def test_upload_artifact(self):
+        stream = self.storage.upload_artifact("new", StringIO("contents"))
+        self.assertEqual("contents", self.storage.get_artifact_as_string("new"))
+        self.assertEqual(self.storage.get_etag("new"), stream.md5)
+        self.assertEqual([], os.listdir(os.path.join(self.directory, FilesystemStorage.TEMP_DIRECTORY)))
+
+    def test_upload_duplicate(self):
+        with self.assertRaises(DuplicateArtifactError):
+            self.storage.upload_artifact("test", StringIO("again"))
+
+        self.assertEqual("hello world", self.storage.get_artifact_as_string("test"))
+
+    def test_set_artifact_from_string(self):
+        self.storage.set_artifact_from_string("test", "replaced")
+        self.assertEqual("replaced", self.storage.get_artifact_as_string("test"))
+
+    def test_directory_contents(self):
+        name_list = [key.name for key in self.storage.get_directory_contents("", False)]
+        self.assertEqual(["dir/", "test"], name_list)
+
+    def test_directory_contents_recursive(self):
+        name_list = [key.name for key in self.storage.get_directory_contents("", True)]
+        self.assertEqual(["dir/dir2/test2", "test"], name_list)
+
+    def test_directory_page(self):
+        self.assertEqual((["dir/"], "dir/"), self.storage.get_directory_page("", 1))
+        self.assertEqual((["test"], None), self.storage.get_directory_page("", 1, "dir/"))
+
+    def test_bucket_not_found(self):
+        storage = FilesystemStorage(os.path.join(self.directory, "nope"), "nope", Mock())
+        with self.assertRaises(BucketNotFoundError):
+            with storage:
+                pass
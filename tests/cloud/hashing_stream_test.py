@@ -0,0 +1,29 @@
+import hashlib
+import pyproctor
+from StringIO import StringIO
+from pyshelf.cloud.hashing_stream import HashingStream
+
+
+class TrickleStream(object):
+    """ Returns at most 2 bytes per read, like a socket might. """
+    def __init__(self, data):
+        self.fp = StringIO(data)
+
+    def read(self, size=-1):
+        return self.fp.read(min(size, 2) if size >= 0 else 2)
+
+
+class HashingStreamTest(pyproctor.TestBase):
+    def test_hashes(self):
+        stream = HashingStream(StringIO("hello world"))
+        self.assertEqual("hello", stream.read(5))
+        self.assertEqual(" world", stream.read())
+        self.assertEqual(hashlib.md5("hello world").hexdigest(), stream.md5)
+        self.assertEqual(hashlib.sha256("hello world").hexdigest(), stream.sha256)
+        self.assertEqual(11, stream.size)
+
+    def test_read_fully(self):
+        stream = HashingStream(TrickleStream("hello world"))
+        self.assertEqual("hello", stream.read_fully(5))
+        self.assertEqual(" world", stream.read_fully(100))
+        self.assertEqual("", stream.read_fully(100))
@@ -0,0 +1,50 @@
+import pyproctor
+from mock import Mock
+from pyshelf.cloud.key_cache import KeyCache
+
+
+class KeyCacheTest(pyproctor.TestBase):
+    def add(self, cache, name):
+        key = Mock(size=11, etag="\"etag\"", last_modified="Sun, 20 Dec 2015 23:12:21 GMT", content_type="text/plain")
+        # Mock uses the name argument for itself.
+        key.name = name
+        cache.add("bucket", key)
+
+    def test_get(self):
+        cache = KeyCache()
+        self.assertIsNone(cache.get("bucket", "a"))
+        self.add(cache, "a")
+        cached_key = cache.get("bucket", "a")
+        self.assertEqual("a", cached_key.name)
+        self.assertEqual(11, cached_key.size)
+        self.assertEqual("\"etag\"", cached_key.etag)
+        self.assertEqual("text/plain", cached_key.content_type)
+        self.assertIsNone(cache.get("other-bucket", "a"))
+
+    def test_expires(self):
+        cache = KeyCache(ttl=-1)
+        self.add(cache, "a")
+        self.assertIsNone(cache.get("bucket", "a"))
+
+    def test_evicts_least_recently_used(self):
+        cache = KeyCache(max_size=2)
+        self.add(cache, "a")
+        self.add(cache, "b")
+        cache.get("bucket", "a")
+        self.add(cache, "c")
+        self.assertIsNotNone(cache.get("bucket", "a"))
+        self.assertIsNone(cache.get("bucket", "b"))
+        self.assertIsNotNone(cache.get("bucket", "c"))
+
+    def test_invalidate(self):
+        cache = KeyCache()
+        self.add(cache, "a")
+        cache.invalidate("bucket", "a")
+        self.assertIsNone(cache.get("bucket", "a"))
+
+    def test_reserved_not_cached(self):
+        cache = KeyCache()
+        self.add(cache, "_keys/token")
+        self.add(cache, "dir/_metadata_a.yaml")
+        self.assertIsNone(cache.get("bucket", "_keys/token"))
+        self.assertIsNone(cache.get("bucket", "dir/_metadata_a.yaml"))
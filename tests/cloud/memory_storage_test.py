@@ -0,0 +1,67 @@
+import pyproctor
+from StringIO import StringIO
+from mock import Mock
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+from pyshelf.cloud.cloud_exceptions import ArtifactNotFoundError, CopyNotSupportedError, DuplicateArtifactError
+
+
+class MemoryStorageTest(pyproctor.TestBase):
+    def setUp(self):
+        super(MemoryStorageTest, self).setUp()
+        self.store = MemoryStore()
+        self.storage = MemoryStorage(self.store, "test", Mock())
+        self.storage.upload_artifact("test", StringIO("hello world"))
+        self.storage.upload_artifact("dir/dir2/test2", StringIO("hello"))
+
+    def test_get_artifact(self):
+        self.assertEqual("hello world", "".join(self.storage.get_artifact("test")))
+
+    def test_get_artifact_range(self):
+        self.assertEqual("world", "".join(self.storage.get_artifact("test", [(6, 10)])))
+
+    def test_get_key_missing(self):
+        with self.assertRaises(ArtifactNotFoundError):
+            self.storage.get_key("dir")
+
+    def test_upload_artifact(self):
+        stream = self.storage.upload_artifact("new", StringIO("contents"))
+        self.assertEqual("contents", self.storage.get_artifact_as_string("new"))
+        self.assertEqual(self.storage.get_etag("new"), stream.md5)
+
+    def test_upload_duplicate(self):
+        with self.assertRaises(DuplicateArtifactError):
+            self.storage.upload_artifact("test", StringIO("again"))
+
+        self.assertEqual("hello world", self.storage.get_artifact_as_string("test"))
+
+    def test_shared_store(self):
+        other = MemoryStorage(self.store, "test", Mock())
+        self.assertEqual("hello", other.get_artifact_as_string("dir/dir2/test2"))
+        other = MemoryStorage(self.store, "other", Mock())
+        with self.assertRaises(ArtifactNotFoundError):
+            other.get_key("test")
+
+    def test_directory_contents(self):
+        self.storage.set_artifact_from_string("dir/test3", "three")
+        name_list = [key.name for key in self.storage.get_directory_contents("dir/", False)]
+        self.assertEqual(["dir/dir2/", "dir/test3"], name_list)
+
+    def test_directory_contents_recursive(self):
+        name_list = [key.name for key in self.storage.get_directory_contents("", True)]
+        self.assertEqual(["dir/dir2/test2", "test"], name_list)
+
+    def test_directory_page(self):
+        self.assertEqual((["dir/"], "dir/"), self.storage.get_directory_page("", 1))
+        self.assertEqual((["test"], None), self.storage.get_directory_page("", 1, "dir/"))
+
+    def test_copy_artifact_from_other_bucket(self):
+        other = MemoryStorage(self.store, "other", Mock())
+        other.copy_artifact("test", "copy", self.storage)
+        self.assertEqual("hello world", other.get_artifact_as_string("copy"))
+        with self.assertRaises(DuplicateArtifactError):
+            other.copy_artifact("dir/dir2/test2", "copy", self.storage)
+
+    def test_copy_artifact_from_other_backend(self):
+        source = Mock(bucket_name="elsewhere")
+        with self.assertRaises(CopyNotSupportedError):
+            self.storage.copy_artifact("test", "copy", source)
@@ -0,0 +1,150 @@
+import pyproctor
+from StringIO import StringIO
+from pyproctor import MonkeyPatcher
+from mock import Mock, call
+from boto.s3.multipart import MultiPartUpload
+from pyshelf.cloud.hashing_stream import HashingStream
+from pyshelf.cloud.multipart_uploader import MultipartUploader
+
+
+class MultipartUploaderTest(pyproctor.TestBase):
+    MB = 1024 * 1024
+
+    def setUp(self):
+        super(MultipartUploaderTest, self).setUp()
+        self.connection_pool = Mock()
+        self.uploader = MultipartUploader(Mock(), self.connection_pool, threshold=8 * self.MB,
+                                          part_size=5 * self.MB, concurrency=2, copy_part_size=5 * self.MB)
+        self.bucket = Mock()
+        self.bucket.name = "test"
+        self.mp = self.bucket.initiate_multipart_upload.return_value
+        self.mp.id = "upload-id"
+
+    def part_key(self, etag):
+        key = Mock()
+        key.etag = etag
+        return key
+
+    def read_parts(self, data, part_size, head=""):
+        return list(self.uploader._read_parts(HashingStream(StringIO(data)), part_size, head))
+
+    def test_should_upload(self):
+        self.assertFalse(self.uploader.should_upload(None))
+        self.assertFalse(self.uploader.should_upload(8 * self.MB - 1))
+        self.assertTrue(self.uploader.should_upload(8 * self.MB))
+
+    def test_read_parts(self):
+        self.assertEqual([(1, "hell"), (2, "o wo"), (3, "rld")], self.read_parts("hello world", 4))
+
+    def test_read_parts_exact(self):
+        # No empty part after the last full one.
+        self.assertEqual([(1, "hell"), (2, "o wo")], self.read_parts("hello wo", 4))
+
+    def test_read_parts_empty(self):
+        self.assertEqual([(1, "")], self.read_parts("", 4))
+
+    def test_read_parts_head(self):
+        self.assertEqual([(1, "hell"), (2, "o wo"), (3, "rld")], self.read_parts("o world", 4, "hell"))
+
+    def test_read_parts_head_longer_than_part(self):
+        self.assertEqual([(1, "hell"), (2, "o wo"), (3, "rld")], self.read_parts("ld", 4, "hello wor"))
+
+    def test_read_parts_head_only(self):
+        self.assertEqual([(1, "hell"), (2, "o")], self.read_parts("", 4, "hello"))
+
+    def test_get_part_size(self):
+        self.assertEqual(5 * self.MB, self.uploader._get_part_size(5 * self.MB, None))
+        self.assertEqual(5 * self.MB, self.uploader._get_part_size(5 * self.MB, 50000 * self.MB))
+
+    def test_get_part_size_too_many_parts(self):
+        # Grows so that there are never more than 10,000 parts.
+        size = 50000 * self.MB + 1
+        part_size = self.uploader._get_part_size(5 * self.MB, size)
+        self.assertEqual(5 * self.MB + 1, part_size)
+        self.assertEqual(MultipartUploader.MAX_PART_COUNT, len(list(self.uploader._get_ranges(size, part_size))))
+
+    def test_to_xml(self):
+        xml = self.uploader._to_xml([(1, "\"a&b\""), (2, "\"c\"")])
+        self.assertEqual(
+            "<CompleteMultipartUpload>\n"
+            "  <Part>\n"
+            "    <PartNumber>1</PartNumber>\n"
+            "    <ETag>\"a&amp;b\"</ETag>\n"
+            "  </Part>\n"
+            "  <Part>\n"
+            "    <PartNumber>2</PartNumber>\n"
+            "    <ETag>\"c\"</ETag>\n"
+            "  </Part>\n"
+            "</CompleteMultipartUpload>", xml)
+
+    def test_upload(self):
+        data_list = []
+
+        def upload_part_from_file(mp, fp, part_num):
+            data_list.append((part_num, fp.read()))
+            return self.part_key("\"{0}\"".format(part_num))
+
+        MonkeyPatcher.patch(MultiPartUpload, "upload_part_from_file", upload_part_from_file)
+        data = "a" * (11 * self.MB)
+        self.uploader.upload("a", "s", self.bucket, "test", HashingStream(StringIO(data[self.MB:])), len(data),
+                             data[:self.MB])
+        self.assertEqual([(1, data[:5 * self.MB]), (2, data[5 * self.MB:10 * self.MB]), (3, data[10 * self.MB:])],
+                         sorted(data_list))
+        xml = self.uploader._to_xml([(1, "\"1\""), (2, "\"2\""), (3, "\"3\"")])
+        self.bucket.complete_multipart_upload.assert_called_once_with("test", "upload-id", xml, None)
+        self.assertFalse(self.mp.cancel_upload.called)
+
+    def test_upload_part_failure(self):
+        def upload_part_from_file(mp, fp, part_num):
+            if part_num == 2:
+                raise IOError("part failed")
+
+            return self.part_key("\"{0}\"".format(part_num))
+
+        MonkeyPatcher.patch(MultiPartUpload, "upload_part_from_file", upload_part_from_file)
+        data = "a" * (11 * self.MB)
+        with self.assertRaises(IOError):
+            self.uploader.upload("a", "s", self.bucket, "test", HashingStream(StringIO(data)), len(data))
+
+        self.mp.cancel_upload.assert_called_once_with()
+        self.assertFalse(self.bucket.complete_multipart_upload.called)
+        # The connection the part failed on is not reused.
+        self.assertEqual(1, self.connection_pool.discard.call_count)
+
+    def test_upload_complete_failure(self):
+        MonkeyPatcher.patch(MultiPartUpload, "upload_part_from_file", lambda mp, fp, part_num: self.part_key("e"))
+        self.bucket.complete_multipart_upload.side_effect = IOError("complete failed")
+        with self.assertRaises(IOError):
+            self.uploader.upload("a", "s", self.bucket, "test", HashingStream(StringIO("hello world")))
+
+        self.mp.cancel_upload.assert_called_once_with()
+
+    def test_copy(self):
+        copy_part_from_key = Mock(side_effect=lambda bucket_name, key_name, part_num, start, end:
+                                  self.part_key("\"{0}\"".format(part_num)))
+        MonkeyPatcher.patch(MultiPartUpload, "copy_part_from_key", copy_part_from_key)
+        source_key = Mock()
+        source_key.name = "source"
+        source_key.bucket.name = "b2"
+        source_key.size = 12 * self.MB
+        source_key.content_type = "text/plain"
+        source_key.metadata = {"a": "b"}
+        headers = {"If-None-Match": "*"}
+        self.uploader.copy("a", "s", self.bucket, "copy", source_key, headers)
+        self.bucket.initiate_multipart_upload.assert_called_once_with(
+            "copy", {"Content-Type": "text/plain"}, metadata={"a": "b"})
+        self.assertEqual([
+            call("b2", "source", 1, 0, 5 * self.MB - 1),
+            call("b2", "source", 2, 5 * self.MB, 10 * self.MB - 1),
+            call("b2", "source", 3, 10 * self.MB, 12 * self.MB - 1)
+        ], sorted(copy_part_from_key.call_args_list))
+        xml = self.uploader._to_xml([(1, "\"1\""), (2, "\"2\""), (3, "\"3\"")])
+        self.bucket.complete_multipart_upload.assert_called_once_with("copy", "upload-id", xml, headers)
+        self.assertEqual(3, self.connection_pool.release.call_count)
+
+    def test_get_ranges(self):
+        self.assertEqual([(1, 0, 3), (2, 4, 7), (3, 8, 8)], list(self.uploader._get_ranges(9, 4)))
+        self.assertEqual([(1, 0, 3), (2, 4, 7)], list(self.uploader._get_ranges(8, 4)))
+
+    def test_get_ranges_empty(self):
+        self.assertEqual([(1, None, None)], list(self.uploader._get_ranges(0, 4)))
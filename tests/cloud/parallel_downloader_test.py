@@ -0,0 +1,26 @@
+import pyproctor
+from pyproctor import MonkeyPatcher
+from mock import Mock
+from pyshelf.cloud.parallel_downloader import ParallelDownloader
+
+
+class ParallelDownloaderTest(pyproctor.TestBase):
+    def setUp(self):
+        super(ParallelDownloaderTest, self).setUp()
+        self.data = "hello world"
+        self.download_chunk = Mock(side_effect=lambda a, s, b, k, chunk: self.data[chunk[0]:chunk[1] + 1])
+        MonkeyPatcher.patch(ParallelDownloader, "_download_chunk", self.download_chunk)
+        self.downloader = ParallelDownloader(Mock(), threshold=8, chunk_size=4, concurrency=2)
+        self.key = Mock()
+
+    def test_should_download(self):
+        self.assertFalse(self.downloader.should_download(7))
+        self.assertTrue(self.downloader.should_download(8))
+
+    def test_download(self):
+        chunk_list = list(self.downloader.download("a", "s", self.key, (0, 10)))
+        self.assertEqual(["hell", "o wo", "rld"], chunk_list)
+
+    def test_download_range(self):
+        chunk_list = list(self.downloader.download("a", "s", self.key, (3, 8)))
+        self.assertEqual(["lo w", "or"], chunk_list)
@@ -0,0 +1,98 @@
+import time
+import pyproctor
+from mock import Mock
+from pyproctor import MonkeyPatcher
+from pyshelf.cloud.partitioned_lister import PartitionedLister
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+
+
+class PartitionedListerTest(pyproctor.TestBase):
+    def setUp(self):
+        super(PartitionedListerTest, self).setUp()
+        self.store = MemoryStore()
+        storage = MemoryStorage(self.store, "test", Mock())
+        self.name_list = [
+            "a",
+            "a-b/c",
+            "a/b/c",
+            "a/b/d",
+            "a/c",
+            "a0",
+            "_keys/key",
+            "z/y/x"
+        ]
+        for name in self.name_list:
+            storage.set_artifact_from_string(name, "hello world")
+
+    def create_storage(self):
+        return MemoryStorage(self.store, "test", Mock())
+
+    def list_names(self, lister, prefix="", skip=None):
+        return [key.name for key in lister.iter_keys(prefix, skip)]
+
+    def test_iter_keys(self):
+        lister = PartitionedLister(self.create_storage, 2)
+        self.assertEqual(sorted(self.name_list), self.list_names(lister))
+
+    def test_iter_keys_depth(self):
+        lister = PartitionedLister(self.create_storage, 2, 3, 1)
+        self.assertEqual(sorted(self.name_list), self.list_names(lister))
+
+    def test_iter_keys_prefix(self):
+        lister = PartitionedLister(self.create_storage, 2)
+        self.assertEqual(["a/b/c", "a/b/d", "a/c"], self.list_names(lister, "a/"))
+
+    def test_iter_keys_skip(self):
+        lister = PartitionedLister(self.create_storage, 2)
+        name_list = self.list_names(lister, skip=lambda name: name.startswith("_"))
+        self.assertNotIn("_keys/key", name_list)
+        self.assertEqual(7, len(name_list))
+
+    def test_iter_keys_large_partitions(self):
+        MonkeyPatcher.patch(PartitionedLister, "PAGE_SIZE", 4)
+        storage = self.create_storage()
+        name_list = ["a/b/e", "a/b/f/g", "a/flat/1", "a/flat/2", "a/flat/3", "a/flat/4", "a/flat/5", "a/h"]
+        for name in name_list:
+            storage.set_artifact_from_string(name, "hello world")
+
+        split = Mock(side_effect=PartitionedLister._split)
+        MonkeyPatcher.patch(PartitionedLister, "_split", lambda lister, prefix, skip: split(lister, prefix, skip))
+        lister = PartitionedLister(self.create_storage, 2, 1, 1)
+        expected = sorted(name for name in self.name_list + name_list if name.startswith("a/"))
+        self.assertEqual(expected, self.list_names(lister, "a/"))
+        # a/b/ is split into what is in it and a/flat/ has too much in it to be.
+        self.assertEqual(["a/b/", "a/flat/"], sorted(call[0][1] for call in split.call_args_list))
+
+    def test_iter_keys_unsplittable(self):
+        MonkeyPatcher.patch(PartitionedLister, "PAGE_SIZE", 2)
+        lister = PartitionedLister(self.create_storage, 2)
+        # The top level has too much in it to split into partitions.
+        self.assertEqual(sorted(self.name_list), self.list_names(lister))
+
+    def test_iter_keys_bounded(self):
+        MonkeyPatcher.patch(PartitionedLister, "PAGE_SIZE", 2)
+        storage = self.create_storage()
+        for i in range(100):
+            storage.set_artifact_from_string("flat/{0:03d}".format(i), "hello world")
+
+        listed = []
+
+        def create_storage():
+            storage = self.create_storage()
+            iter_directory_contents = storage.iter_directory_contents
+
+            def list_keys(path, recursive, cursor=None, page_size=None):
+                for key in iter_directory_contents(path, recursive, cursor, page_size):
+                    listed.append(key.name)
+                    yield key
+
+            storage.iter_directory_contents = list_keys
+            return storage
+
+        lister = PartitionedLister(create_storage, 2, 1, 1)
+        key_iter = lister.iter_keys("flat/")
+        self.assertEqual("flat/000", next(key_iter).name)
+        time.sleep(0.1)
+        # Only a few pages are listed ahead of what is yielded.
+        self.assertLess(len(listed), 20)
+        key_iter.close()
@@ -0,0 +1,32 @@
+import pyproctor
+from StringIO import StringIO
+from pyshelf.cloud.read_ahead import ReadAhead
+
+
+class ReadAheadTest(pyproctor.TestBase):
+    def test_iter_chunks(self):
+        read_ahead = ReadAhead(4, 2)
+        chunk_list = list(read_ahead.iter_chunks(StringIO("hello world").read))
+        self.assertEqual(["hell", "o wo", "rld"], chunk_list)
+
+    def test_iter_chunks_without_read_ahead(self):
+        read_ahead = ReadAhead(4, 0)
+        chunk_list = list(read_ahead.iter_chunks(StringIO("hello world").read))
+        self.assertEqual(["hell", "o wo", "rld"], chunk_list)
+
+    def test_iter_chunks_error(self):
+        def read(size):
+            raise IOError("Connection reset")
+
+        chunks = ReadAhead(4, 2).iter_chunks(read)
+        with self.assertRaises(IOError):
+            next(chunks)
+
+    def test_close_stops_reading(self):
+        fp = StringIO("a" * 1000)
+        chunks = ReadAhead(1, 2).iter_chunks(fp.read)
+        self.assertEqual("a", next(chunks))
+        chunks.close()
+        # Only what fits in the queue (and the chunk the worker is
+        # holding) could have been read.
+        self.assertLess(fp.tell(), 10)
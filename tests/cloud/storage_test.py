@@ -0,0 +1,55 @@
+import pyproctor
+from mock import Mock
+from boto.resultset import ResultSet
+from pyshelf.cloud.storage import Storage
+
+
+class StorageTest(pyproctor.TestBase):
+    def setUp(self):
+        super(StorageTest, self).setUp()
+        self.call_runner = Mock()
+        self.call_runner.call.side_effect = lambda name, attempt, *args, **kwargs: attempt()
+        self.connection_pool = Mock()
+        self.pooled_conn = self.connection_pool.acquire.return_value
+        self.bucket_cache = Mock()
+        self.bucket_cache.exists.return_value = True
+        self.storage = Storage("a", "s", "test", Mock(), connection_pool=self.connection_pool,
+                               bucket_cache=self.bucket_cache, call_runner=self.call_runner)
+        self.storage.connect()
+
+    def call_names(self):
+        return [call[0][0] for call in self.call_runner.call.call_args_list]
+
+    def test_iter_directory_contents_call_runner(self):
+        entry = Mock()
+        entry.name = "dir/a"
+        pooled_bucket = self.pooled_conn.get_bucket.return_value
+        result_list = ResultSet()
+        result_list.append(entry)
+        result_list.is_truncated = False
+        pooled_bucket.get_all_keys.return_value = result_list
+        entry_list = list(self.storage.iter_directory_contents("dir/", False))
+        self.assertEqual([entry], entry_list)
+        self.assertEqual(["LIST"], self.call_names())
+        self.assertEqual(self.storage.conn.get_bucket.return_value, entry.bucket)
+        self.connection_pool.release.assert_called_once_with("a", "s", self.pooled_conn)
+
+    def test_get_artifact_as_string_call_runner(self):
+        self.pooled_conn.get_bucket.return_value.get_key.return_value.name = "test"
+        pooled_key = self.pooled_conn.get_bucket.return_value.new_key.return_value
+        pooled_key.get_contents_as_string.return_value = "hello world"
+        self.assertEqual("hello world", self.storage.get_artifact_as_string("test"))
+        self.assertEqual(["HEAD", "GET"], self.call_names())
+        self.pooled_conn.get_bucket.return_value.new_key.assert_called_with("test")
+
+    def test_copy_artifact_in_parts_conditional_writes(self):
+        multipart_uploader = Mock()
+        multipart_uploader.should_upload.return_value = True
+        self.storage.multipart_uploader = multipart_uploader
+        self.storage.conditional_writes = True
+        bucket = self.storage.conn.get_bucket.return_value
+        bucket.get_key.return_value = None
+        source_key = Mock()
+        self.storage.key_map["source"] = source_key
+        self.storage.copy_artifact("source", "copy")
+        multipart_uploader.copy.assert_called_once_with("a", "s", bucket, "copy", source_key, {"If-None-Match": "*"})
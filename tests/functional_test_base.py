@@ -17,6 +17,7 @@ from pyshelf.error_code import ErrorCode
 from pyproctor import MonkeyPatcher
 from mock import Mock
 from pyshelf.metadata.initializer import Initializer
+from pyshelf.cloud.factory import Factory as CloudFactory
 
 
 class FunctionalTestBase(TestBase):
@@ -76,7 +77,9 @@ class FunctionalTestBase(TestBase):
         "elasticsearch": {
             "connectionString": "http://localhost:9200/metadata",
             "upperSearchResultLimit": 100
-        }
+        },
+        # moto ignores If-None-Match so it would happily overwrite artifacts.
+        "conditionalWrites": False
     }
 
     def setUp(self):
@@ -141,6 +144,9 @@ class FunctionalTestBase(TestBase):
     def setup_moto(self):
         self.moto_s3 = mock_s3()
         self.moto_s3.start()
+        # Pooled connections and cached buckets would outlive the mock
+        # they were created under.
+        CloudFactory.reset_shared()
         import httpretty
         # EXTREMELY IMPORTANT!  If the port is not
         # appended httpretty does not identify it as http
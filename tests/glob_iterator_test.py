@@ -0,0 +1,68 @@
+import json
+import pyproctor
+from mock import Mock
+from pyshelf.glob_iterator import GlobIterator
+from pyshelf.path_converter import PathConverter
+from pyshelf.artifact_path_builder import ArtifactPathBuilder
+from pyshelf.cloud.memory_storage import MemoryStorage, MemoryStore
+
+
+class GlobIteratorTest(pyproctor.TestBase):
+    def setUp(self):
+        super(GlobIteratorTest, self).setUp()
+        self.storage = MemoryStorage(MemoryStore(), "test", Mock())
+        for name in [
+            "builds/1/linux/a.tar.gz",
+            "builds/1/linux/a.zip",
+            "builds/1/win/a.tar.gz",
+            "builds/2/linux/_private.tar.gz",
+            "builds/v1.0/linux/deep/b.tar.gz",
+            "builds/_private/linux/c.tar.gz",
+            "other/d.tar.gz"
+        ]:
+            self.storage.set_artifact_from_string(name, "hello world")
+
+        self.path_converter = PathConverter(ArtifactPathBuilder("test"))
+
+    def glob(self, path, pattern, can_read=None):
+        glob = GlobIterator(self.storage, path, GlobIterator.split_pattern(pattern), self.path_converter, can_read)
+        glob.open()
+        data = "".join(glob)
+        glob.close()
+        return json.loads(data)["artifacts"]
+
+    def test_glob(self):
+        self.assertEqual(["/test/artifact/builds/1/linux/a.tar.gz"], self.glob("", "builds/*/linux/*.tar.gz"))
+
+    def test_glob_relative(self):
+        self.assertEqual(["/test/artifact/builds/1/linux/a.zip"], self.glob("builds/", "?/*/*.zip"))
+
+    def test_glob_recursive(self):
+        self.assertEqual([
+            "/test/artifact/builds/1/linux/a.tar.gz",
+            "/test/artifact/builds/1/win/a.tar.gz",
+            "/test/artifact/builds/v1.0/linux/deep/b.tar.gz"
+        ], self.glob("", "builds/**/*.tar.gz"))
+
+    def test_glob_can_read(self):
+        def can_read(path):
+            return "win" in path
+
+        self.assertEqual(["/test/artifact/builds/1/win/a.tar.gz"], self.glob("", "*/*/*/*", can_read))
+
+    def test_glob_nothing(self):
+        self.assertEqual([], self.glob("", "builds/3/*"))
+
+    def test_glob_prunes(self):
+        self.storage.iter_directory_contents = Mock(wraps=self.storage.iter_directory_contents)
+        self.glob("", "builds/v1.*/linux/*/*")
+        prefix_list = [call[0][0] for call in self.storage.iter_directory_contents.call_args_list]
+        # Neither builds/ nor builds/1/ are listed.
+        self.assertEqual(["builds/v1.", "builds/v1.0/linux/", "builds/v1.0/linux/deep/"], prefix_list)
+
+    def test_split_pattern(self):
+        self.assertEqual(["a", "*", "**", "b"], GlobIterator.split_pattern("/a/*/**/b"))
+        self.assertIsNone(GlobIterator.split_pattern(""))
+        self.assertIsNone(GlobIterator.split_pattern("a//b"))
+        self.assertIsNone(GlobIterator.split_pattern("../a"))
+        self.assertIsNone(GlobIterator.split_pattern("a**"))
@@ -1,5 +1,6 @@
 from tests.unit_test_base import UnitTestBase
 from pyshelf.metadata.initializer import Initializer
+from pyshelf.metadata.mapper import Mapper
 
 
 class InitializerTest(UnitTestBase):
@@ -13,3 +14,29 @@ class InitializerTest(UnitTestBase):
         i = Initializer(fake_container)
         date = i._get_created_date()
         self.assertIsInstance(date, basestring)
+
+    def test_create(self):
+        fake_container = type('FakeContainer', (object,), {})()
+        fake_container.mapper = Mapper()
+        identity = type('FakeIdentity', (object,), {"resource_path": "/b/artifact/a", "artifact_name": "a"})()
+        i = Initializer(fake_container)
+        metadata = i.create(identity, "md5", "sha256")
+        self.assertFalse(i.needs_update(metadata))
+        self.assertEqual("md5", metadata["md5Hash"]["value"])
+        self.assertEqual("sha256", metadata["sha256Hash"]["value"])
+        self.assertEqual("/b/artifact/a", metadata["artifactPath"]["value"])
+
+    def test_create_copy(self):
+        fake_container = type('FakeContainer', (object,), {})()
+        fake_container.mapper = Mapper()
+        identity = type('FakeIdentity', (object,), {"resource_path": "/b/artifact/a", "artifact_name": "a"})()
+        i = Initializer(fake_container)
+        original = i.create(identity, "md5", "sha256")
+        original["tag"] = {"name": "tag", "value": "release", "immutable": False}
+        identity = type('FakeIdentity', (object,), {"resource_path": "/c/artifact/d/e", "artifact_name": "e"})()
+        metadata = i.create_copy(identity, original)
+        self.assertEqual("md5", metadata["md5Hash"]["value"])
+        self.assertEqual("release", metadata["tag"]["value"])
+        self.assertEqual("/c/artifact/d/e", metadata["artifactPath"]["value"])
+        self.assertEqual("e", metadata["artifactName"]["value"])
+        self.assertEqual("/b/artifact/a", original["artifactPath"]["value"])
@@ -61,3 +61,9 @@ class ResourceIdentityTest(pyproctor.TestBase):
         path = "_meta/lol/_meta"
         identity = ResourceIdentity(path)
         self.assertEqual([''], identity._part_list)
+
+    def test_directory_path(self):
+        identity = ResourceIdentity(ResourceIdentityTest.TEST_PATH + "/_archive")
+        self.assertEqual("_archive", identity.type)
+        self.assertEqual("/blah1/blah2/blah3/", identity.directory_path)
+        self.assertEqual("/", ResourceIdentity("/lol-test/artifact/_archive").directory_path)
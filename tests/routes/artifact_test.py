@@ -1,5 +1,8 @@
+import json
 from StringIO import StringIO
 from tests.functional_test_base import FunctionalTestBase
+import tests.metadata_utils as meta_utils
+from pyshelf.cloud.stream_iterator import MultiRangeIterator
 
 
 class ArtifactTest(FunctionalTestBase):
@@ -14,6 +17,83 @@ class ArtifactTest(FunctionalTestBase):
             .expect(200, "hello world", headers={"Link": link}) \
             .get(headers=self.auth)
 
+    def artifact_get_range(self, status_code, body, request_headers, headers=None):
+        request_headers.update(self.auth)
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="test") \
+            .expect(status_code, body, headers=headers) \
+            .get(headers=request_headers)
+
+    def test_artifact_get_range(self):
+        self.artifact_get_range(206, "hello", {"Range": "bytes=0-4"}, headers={
+            "Content-Range": "bytes 0-4/11",
+            "Content-Length": "5",
+            "Accept-Ranges": "bytes"
+        })
+
+    def test_artifact_get_suffix_range(self):
+        self.artifact_get_range(206, "world", {"Range": "bytes=-5"}, headers={"Content-Range": "bytes 6-10/11"})
+
+    def test_artifact_get_multiple_ranges(self):
+        body = "\r\n--{0}\r\n" \
+            "Content-Type: application/octet-stream\r\n" \
+            "Content-Range: bytes 0-1/11\r\n\r\n" \
+            "he" \
+            "\r\n--{0}\r\n" \
+            "Content-Type: application/octet-stream\r\n" \
+            "Content-Range: bytes 9-10/11\r\n\r\n" \
+            "ld" \
+            "\r\n--{0}--\r\n".format(MultiRangeIterator.BOUNDARY)
+
+        self.artifact_get_range(206, body, {"Range": "bytes=0-1,9-"}, headers={
+            "Content-Type": "multipart/byteranges; boundary={0}".format(MultiRangeIterator.BOUNDARY)
+        })
+
+    def test_artifact_get_range_not_satisfiable(self):
+        self.artifact_get_range(416, None, {"Range": "bytes=20-30"}, headers={"Content-Range": "bytes */11"})
+
+    def test_artifact_get_range_if_range_mismatch(self):
+        self.artifact_get_range(200, "hello world", {"Range": "bytes=0-4", "If-Range": "\"not-the-etag\""})
+
+    def test_artifact_get_cache_headers(self):
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="test") \
+            .expect(200, "hello world", headers={
+                "ETag": "\"5eb63bbbe01eeed093cb22bb8f5acdc3\"",
+                "Cache-Control": "private, max-age=31536000, immutable"
+            }) \
+            .get(headers=self.auth)
+
+    def test_artifact_get_presigned(self):
+        bucket_config = self.app.config["buckets"][0]
+        bucket_config["presignedDownloads"] = {"expiresIn": 60}
+        try:
+            response = self.test_client.get("/test/artifact/test", headers=self.auth)
+        finally:
+            del bucket_config["presignedDownloads"]
+
+        self.assertEqual(307, response.status_code)
+        self.assertIn("/test?", response.headers["Location"])
+        self.assertIn("Signature=", response.headers["Location"])
+
+    def test_artifact_get_presigned_directory(self):
+        bucket_config = self.app.config["buckets"][0]
+        bucket_config["presignedDownloads"] = {"expiresIn": 60}
+        try:
+            self.artifact_get_list("dir/dir2/dir3/dir4")
+        finally:
+            del bucket_config["presignedDownloads"]
+
+    def test_artifact_get_not_modified(self):
+        self.artifact_get_range(304, None, {"If-None-Match": "\"5eb63bbbe01eeed093cb22bb8f5acdc3\""}, headers={
+            "ETag": "\"5eb63bbbe01eeed093cb22bb8f5acdc3\""
+        })
+
+    def test_artifact_get_modified(self):
+        self.artifact_get_range(200, "hello world", {"If-None-Match": "\"not-the-etag\""})
+
     def test_artifact_no_permissions(self):
         self.route_tester \
             .artifact() \
@@ -64,6 +144,40 @@ class ArtifactTest(FunctionalTestBase):
             }) \
             .get(headers=self.auth)
 
+    def test_artifact_get_artifact_list_page(self):
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="dir/dir2/dir3/?limit=1") \
+            .expect(204, headers={
+                "Link": [
+                    "</test/artifact/dir/dir2/dir3/nest-test>; rel=\"item\"; title=\"artifact\"",
+                    "</test/artifact/dir/dir2/dir3/?limit=1&cursor=dir%2Fdir2%2Fdir3%2Fnest-test>; "
+                    "rel=\"next\"; title=\"next page\""
+                ]
+            }) \
+            .get(headers=self.auth)
+
+    def test_artifact_get_artifact_list_past_last_page(self):
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="dir/dir2/dir3/dir4/?limit=1&cursor=dir/dir2/dir3/dir4/test5") \
+            .expect(204, headers={"Link": []}) \
+            .get(headers=self.auth)
+
+    def test_artifact_glob(self):
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="dir/dir2/_glob?pattern=dir3/*") \
+            .expect(200, {"artifacts": ["/test/artifact/dir/dir2/dir3/nest-test"]}) \
+            .get(headers=self.auth)
+
+    def test_artifact_glob_invalid(self):
+        self.route_tester \
+            .artifact() \
+            .route_params(bucket_name="test", path="dir/dir2/_glob?pattern=../*") \
+            .expect(400) \
+            .get(headers=self.auth)
+
     def artifact_head_request(self, path, status_code, headers=None):
         self.route_tester \
             .artifact() \
@@ -81,6 +195,16 @@ class ArtifactTest(FunctionalTestBase):
                 ]
             })
 
+    def test_artifact_head(self):
+        self.artifact_head_request("test", 200, headers={
+            "Content-Length": "11",
+            "ETag": "\"5eb63bbbe01eeed093cb22bb8f5acdc3\"",
+            "Link": [
+                "</test/artifact/test>; rel=\"self\"; title=\"artifact\"",
+                "</test/artifact/test/_meta>; rel=\"related\"; title=\"metadata\""
+            ]
+        })
+
     def test_head_no_permissions(self):
         self.artifact_head_request("dir/test", 401)
 
@@ -95,6 +219,59 @@ class ArtifactTest(FunctionalTestBase):
             }) \
             .post(data={"file": (StringIO("file contents"), "test.txt")}, headers=self.auth)
 
+    def test_artifact_upload_raw_body(self):
+        headers = {"Content-Type": "application/octet-stream"}
+        headers.update(self.auth)
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="test-2") \
+            .expect(201, headers={
+                "Link": [
+                    "</test/artifact/test-2>; rel=\"self\"; title=\"artifact\"",
+                    "</test/artifact/test-2/_meta>; rel=\"related\"; title=\"metadata\""
+                ]
+            }) \
+            .post(data="file contents", headers=headers)
+
+    def test_artifact_upload_empty_body(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="test-2") \
+            .expect(400) \
+            .post(headers=self.auth)
+
+    def test_artifact_upload_raw_body_empty(self):
+        headers = {"Content-Type": "application/octet-stream"}
+        headers.update(self.auth)
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="test-2") \
+            .expect(400) \
+            .post(data="", headers=headers)
+
+    def test_artifact_upload_raw_body_without_length(self):
+        headers = {"Content-Type": "application/octet-stream"}
+        headers.update(self.auth)
+        # Like a chunked request, which werkzeug reads as empty.
+        response = self.test_client.post("/test/artifact/test-2", input_stream=StringIO("file contents"),
+                                         headers=headers, environ_overrides={"CONTENT_LENGTH": ""})
+        self.assertEqual(400, response.status_code)
+
+    def test_artifact_upload_in_parts(self):
+        # Parts can be no smaller than 5MB so this is two of them.
+        contents = "0123456789" * 600 * 1024
+        self.app.config["multipartUpload"] = {"threshold": 1024 * 1024, "partSize": 5 * 1024 * 1024}
+        try:
+            self.route_tester.artifact() \
+                .route_params(bucket_name="test", path="test-2") \
+                .expect(201) \
+                .post(data={"file": (StringIO(contents), "test.txt")}, headers=self.auth)
+        finally:
+            del self.app.config["multipartUpload"]
+
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="test-2") \
+            .expect(200, contents) \
+            .get(headers=self.auth)
+        self.assert_metadata_matches("/test/artifact/test-2")
+
     def test_artifact_upload_and_immediate_search_with_bucket_alias(self):
         self.route_tester.artifact() \
             .route_params(bucket_name="b2", path="nick-drake") \
@@ -130,6 +307,125 @@ class ArtifactTest(FunctionalTestBase):
             .expect(403, self.RESPONSE_DUPLICATE) \
             .post(data={"file": (StringIO("file contents"), "test.txt")}, headers=self.auth)
 
+    def test_artifact_upload_batch(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="_batch") \
+            .expect(200, {
+                "results": [
+                    {
+                        "path": "/test/artifact/batch-1",
+                        "status": 201
+                    },
+                    {
+                        "path": "/test/artifact/test",
+                        "status": 403,
+                        "code": "duplicate_artifact",
+                        "message": "Artifact by name test already exists in current directory"
+                    },
+                    {
+                        "path": "/test/artifact/dir/test",
+                        "status": 401,
+                        "code": "permission_denied",
+                        "message": "Permission denied"
+                    }
+                ]
+            }) \
+            .post(data={"file": [
+                (StringIO("one"), "batch-1"),
+                (StringIO("two"), "test"),
+                (StringIO("three"), "dir/test")
+            ]}, headers=self.auth)
+
+    def test_artifact_upload_direct(self):
+        bucket_config = self.app.config["buckets"][0]
+        bucket_config["presignedUploads"] = {}
+        try:
+            response = self.test_client.post("/test/artifact/direct/_upload", headers=self.auth)
+            self.assertEqual(200, response.status_code)
+            reservation = json.loads(response.data)
+            self.assertEqual("PUT", reservation["method"])
+            self.assertIn("Signature=", reservation["url"])
+        finally:
+            del bucket_config["presignedUploads"]
+
+        # Stands in for the client sending it to the presigned URL.
+        token = reservation["finalize"].split("/")[-1]
+        self.create_key(self.test_bucket, "_uploads/{0}/direct".format(token), contents="hello direct")
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="direct/_upload/" + token) \
+            .expect(201, headers={"Location": "/test/artifact/direct"}) \
+            .post(data={"size": 12}, headers=self.auth)
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="direct") \
+            .expect(200, "hello direct") \
+            .get(headers=self.auth)
+        self.assertEqual(None, self.test_bucket.get_key("_uploads/{0}/direct".format(token)))
+
+    def test_artifact_upload_direct_kept_on_failure(self):
+        token = "0" * 32
+        self.create_key(self.test_bucket, "_uploads/{0}/test".format(token), contents="hello direct")
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="test/_upload/" + token) \
+            .expect(403, self.RESPONSE_DUPLICATE) \
+            .post(headers=self.auth)
+        # So that finalizing can be tried again.
+        self.assertIsNotNone(self.test_bucket.get_key("_uploads/{0}/test".format(token)))
+
+    def test_artifact_upload_direct_not_configured(self):
+        response = self.test_client.post("/test/artifact/direct/_upload", headers=self.auth)
+        self.assertEqual(400, response.status_code)
+
+    def test_artifact_upload_dedupe(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="dedupe/_dedupe") \
+            .expect(201, headers={"Location": "/test/artifact/dedupe"}) \
+            .post(data={"md5Hash": meta_utils.MD5}, headers=self.auth)
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="dedupe") \
+            .expect(200, "hello world") \
+            .get(headers=self.auth)
+        # The artifact it was copied from has no sha256Hash.
+        self.assert_metadata_matches("/test/artifact/dedupe")
+
+    def test_artifact_upload_dedupe_not_found(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="dedupe/_dedupe") \
+            .expect(404, self.RESPONSE_404) \
+            .post(data={"md5Hash": "0" * 32}, headers=self.auth)
+
+    def test_artifact_upload_dedupe_invalid_hash(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="test", path="dedupe/_dedupe") \
+            .expect(400) \
+            .post(data={"md5Hash": "*"}, headers=self.auth)
+
+    def test_artifact_copy(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="b2", path="copy/_copy") \
+            .expect(201, headers={"Location": "/b2/artifact/copy"}) \
+            .post(data={"source": "/test/artifact/test"}, headers=self.auth)
+        self.route_tester.artifact() \
+            .route_params(bucket_name="b2", path="copy") \
+            .expect(200, "hello world") \
+            .get(headers=self.auth)
+        self.route_tester.metadata_item() \
+            .route_params(bucket_name="b2", path="copy", item="tag") \
+            .expect(200, meta_utils.get_meta()["tag"]) \
+            .get(headers=self.auth)
+        self.assert_metadata_matches("/b2/artifact/copy")
+
+    def test_artifact_copy_source_permissions(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="b2", path="copy/_copy") \
+            .expect(401, self.RESPONSE_401) \
+            .post(data={"source": "/test/artifact/dir/unreadable"}, headers=self.auth)
+
+    def test_artifact_copy_not_found(self):
+        self.route_tester.artifact() \
+            .route_params(bucket_name="b2", path="copy/_copy") \
+            .expect(404, self.RESPONSE_404) \
+            .post(data={"source": "/test/artifact/missing"}, headers=self.auth)
+
     def test_illegal_artifact_upload(self):
         self.route_tester \
             .artifact() \
@@ -0,0 +1,62 @@
+import pyproctor
+import threading
+import time
+from pyshelf.worker_pool import WorkerPool
+
+
+class WorkerPoolTest(pyproctor.TestBase):
+    def test_map_keeps_order(self):
+        pool = WorkerPool(3)
+        self.assertEqual([0, 2, 4, 6, 8], pool.map(lambda x: x * 2, range(5)))
+
+    def test_raises_error(self):
+        def double(x):
+            if x == 3:
+                raise ValueError("Nope")
+
+            return x * 2
+
+        pool = WorkerPool(2)
+        with self.assertRaises(ValueError):
+            pool.map(double, range(10))
+
+    def test_window_bounds_pulled_items(self):
+        pulled = []
+        lock = threading.Lock()
+
+        def items():
+            for i in range(100):
+                with lock:
+                    pulled.append(i)
+                yield i
+
+        pool = WorkerPool(2)
+        result = pool.imap(lambda x: x, items(), window=4)
+        self.assertEqual(0, next(result))
+        result.close()
+        self.assertTrue(len(pulled) <= 5)
+
+    def test_discards_unused_results(self):
+        worked_on = []
+        discarded = []
+        release = threading.Event()
+
+        def work(x):
+            worked_on.append(x)
+            if x:
+                release.wait()
+
+            return x
+
+        pool = WorkerPool(2)
+        result = pool.imap(work, range(10), window=4, discard=discarded.append)
+        self.assertEqual(0, next(result))
+        while 1 not in worked_on:
+            time.sleep(0.01)
+
+        result.close()
+        # Whatever was still being worked on is discarded once it finishes.
+        release.set()
+        time.sleep(0.1)
+        self.assertIn(1, discarded)
+        self.assertEqual(sorted(worked_on)[1:], sorted(discarded))